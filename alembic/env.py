@@ -4,6 +4,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
+from app.models.refresh_token_model import RefreshToken  # noqa: F401 - registers the table on Base.metadata
 from app.models.user_model import Base  # adjust "myapp.models" to the actual location of your Base
 
 
@@ -0,0 +1,59 @@
+"""move login state to user_login_state
+
+Revision ID: 7c1f4e2a9b3d
+Revises: 25d814bc83ed
+Create Date: 2026-10-17 10:12:31.418203
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1f4e2a9b3d'
+down_revision: Union[str, None] = '25d814bc83ed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LOGIN_STATE_FILLFACTOR = 70
+
+
+def upgrade() -> None:
+    op.create_table('user_login_state',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('failed_login_attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('is_locked', sa.Boolean(), server_default='false', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    # Free space per page lets the frequent login-state updates stay HOT
+    op.execute(f"ALTER TABLE user_login_state SET (fillfactor = {LOGIN_STATE_FILLFACTOR})")
+    op.execute(
+        """
+        INSERT INTO user_login_state (user_id, last_login_at, failed_login_attempts, is_locked)
+        SELECT id, last_login_at, COALESCE(failed_login_attempts, 0), COALESCE(is_locked, false)
+        FROM users
+        """
+    )
+    op.drop_column('users', 'is_locked')
+    op.drop_column('users', 'failed_login_attempts')
+    op.drop_column('users', 'last_login_at')
+
+
+def downgrade() -> None:
+    op.add_column('users', sa.Column('last_login_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('users', sa.Column('failed_login_attempts', sa.Integer(), nullable=True))
+    op.add_column('users', sa.Column('is_locked', sa.Boolean(), nullable=True))
+    op.execute(
+        """
+        UPDATE users
+        SET last_login_at = s.last_login_at,
+            failed_login_attempts = s.failed_login_attempts,
+            is_locked = s.is_locked
+        FROM user_login_state AS s
+        WHERE s.user_id = users.id
+        """
+    )
+    op.drop_table('user_login_state')
@@ -0,0 +1,39 @@
+"""add generated search_vector column with a GIN index for full-text user search
+
+Revision ID: a9d4e2b7c315
+Revises: f3c8a1d5e927
+Create Date: 2026-10-17 23:12:36.402817
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d4e2b7c315'
+down_revision: Union[str, None] = 'f3c8a1d5e927'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept verbatim rather than imported from the model, so this revision does not change if the model does
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(bio, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    # A stored generated column is computed by Postgres on every insert and update; adding it rewrites the table once
+    op.add_column('users', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed(SEARCH_VECTOR, persisted=True), nullable=True))
+    # GIN index over search_vector for the @@ full-text match
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_search_vector', 'users', ['search_vector'], unique=False, postgresql_using='gin',
+                        postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_search_vector', table_name='users', postgresql_concurrently=True)
+    op.drop_column('users', 'search_vector')
@@ -0,0 +1,32 @@
+"""add lower() text_pattern_ops indexes on users nickname and email for autocomplete
+
+Revision ID: c6f2a8e41d07
+Revises: a9d4e2b7c315
+Create Date: 2026-10-18 01:27:09.655120
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f2a8e41d07'
+down_revision: Union[str, None] = 'a9d4e2b7c315'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Btree indexes on lower(nickname) and lower(email) for case-insensitive prefix LIKE
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_nickname_lower_pattern', 'users', [sa.text('lower(nickname) text_pattern_ops')],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index('ix_users_email_lower_pattern', 'users', [sa.text('lower(email) text_pattern_ops')],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_email_lower_pattern', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_nickname_lower_pattern', table_name='users', postgresql_concurrently=True)
@@ -0,0 +1,26 @@
+"""add user token_version
+
+Revision ID: d2a7f3b81c4e
+Revises: b4e8d0c6f215
+Create Date: 2026-10-17 15:12:44.108230
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2a7f3b81c4e'
+down_revision: Union[str, None] = 'b4e8d0c6f215'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # A constant server default keeps this a metadata-only change on PostgreSQL 11+
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
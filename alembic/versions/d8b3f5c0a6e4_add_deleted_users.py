@@ -0,0 +1,29 @@
+"""add deleted_users tombstones for token revocation
+
+Revision ID: d8b3f5c0a6e4
+Revises: c6f2a8e41d07
+Create Date: 2026-10-18 09:14:52.207391
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8b3f5c0a6e4'
+down_revision: Union[str, None] = 'c6f2a8e41d07'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('deleted_users',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('deleted_users')
@@ -0,0 +1,34 @@
+"""add pg_trgm GIN indexes on users nickname and email
+
+Revision ID: f3c8a1d5e927
+Revises: e5b19c7d2a60
+Create Date: 2026-10-17 21:05:47.118230
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c8a1d5e927'
+down_revision: Union[str, None] = 'e5b19c7d2a60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # GIN trigram indexes on nickname and email for substring ILIKE and the % operator
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_nickname_trgm', 'users', ['nickname'], unique=False, postgresql_using='gin',
+                        postgresql_ops={'nickname': 'gin_trgm_ops'}, postgresql_concurrently=True)
+        op.create_index('ix_users_email_trgm', 'users', ['email'], unique=False, postgresql_using='gin',
+                        postgresql_ops={'email': 'gin_trgm_ops'}, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    # The extension is left installed; other objects may depend on it
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_email_trgm', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_users_nickname_trgm', table_name='users', postgresql_concurrently=True)
@@ -1,21 +1,324 @@
+from builtins import Exception, ValueError, bool, dict, float, int, len, list, max, min, range, str, sum
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Tuple
+from uuid import uuid4
+from sqlalchemy import event, exc, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 Base = declarative_base()
+logger = logging.getLogger(__name__)
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts_total = 0
+        self.timeouts_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.timeouts_total += 1
+            raise
+        waited = time.perf_counter() - started
+        self.checkouts_total += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+        return connection
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            # A negative max_overflow means overflow is unbounded
+            "max_connections": self.size() + self._max_overflow if self._max_overflow >= 0 else None,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "checkouts_total": self.checkouts_total,
+            "timeouts_total": self.timeouts_total,
+            "avg_wait_ms": self._wait_seconds_total / self.checkouts_total * 1000 if self.checkouts_total else 0.0,
+            "max_wait_ms": self._wait_seconds_max * 1000,
+            "recycle_seconds": self._recycle,
+            "pre_ping": self._pre_ping,
+        }
+
+# Session.info key marking a session whose writes are committed once, by whoever opened it
+UNIT_OF_WORK = "unit_of_work"
+
+# Session.info key set once the session has checked out a connection and begun a transaction
+USED_CONNECTION = "used_connection"
+
+@event.listens_for(Session, "after_begin")
+def _mark_used_connection(session, transaction, connection):
+    session.info[USED_CONNECTION] = True
+
+# Session.info key set once the session has written: flushed ORM changes or ran an INSERT/UPDATE/DELETE
+WROTE = "wrote"
+
+@event.listens_for(Session, "after_flush")
+def _mark_flushed_write(session, flush_context):
+    session.info[WROTE] = True
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_executed_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE] = True
+
+class RequestDatabaseUsage:
+    """
+    Counts requests and how many of them checked out a database connection.
+
+    Sessions only check out a pooled connection on their first statement, so requests rejected
+    by authentication, or served without a query, never touch the pool.
+    """
+
+    def __init__(self):
+        self.requests_total = 0
+        self.db_requests_total = 0
+
+    def record(self, used_db: bool) -> None:
+        self.requests_total += 1
+        if used_db:
+            self.db_requests_total += 1
+
+    def stats(self) -> dict:
+        return {
+            "requests_total": self.requests_total,
+            "requests_without_db": self.requests_total - self.db_requests_total,
+        }
+
+request_db_usage = RequestDatabaseUsage()
+
+def _session_factory(engine, readonly: bool = False):
+    if readonly:
+        # asyncpg opens these transactions with BEGIN READ ONLY, so it costs no extra round trip
+        engine = engine.execution_options(postgresql_readonly=True)
+    return sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False, future=True)
+
+async def commit_or_flush(session: AsyncSession) -> None:
+    """
+    Commit a service-level write, or only flush it when the session belongs to a unit of work.
+
+    Request sessions from get_db are units of work: services flush so later statements see
+    their changes, and the dependency commits once when the handler returns.
+    """
+    if session.info.get(UNIT_OF_WORK):
+        await session.flush()
+    else:
+        await session.commit()
+
+@asynccontextmanager
+async def snapshot_session(session: AsyncSession) -> AsyncIterator[AsyncSession]:
+    """
+    A second session on the same database as `session`, on its own pooled connection, that sees
+    exactly the same data.
+
+    `session` must not have begun its transaction yet. It is begun REPEATABLE READ and exports its
+    snapshot, which the second session's REPEATABLE READ transaction imports, so statements run
+    concurrently on both sessions read one consistent state.
+    """
+    repeatable_read = {"isolation_level": "REPEATABLE READ"}
+    connection = await session.connection(execution_options=repeatable_read)
+    snapshot = (await connection.execute(text("SELECT pg_export_snapshot()"))).scalar_one()
+    async with AsyncSession(bind=session.bind, expire_on_commit=False) as other:
+        await other.connection(execution_options=repeatable_read)
+        # A utility statement, so the server-generated snapshot id cannot be a bind parameter
+        await other.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot}'"))
+        yield other
+
+def parse_lsn(lsn: str) -> int:
+    """Convert a textual WAL location such as '16/B374D848' to a comparable integer."""
+    high, _, low = lsn.partition("/")
+    return (int(high, 16) << 32) + int(low, 16)
+
+# Replay position and lag of a replica; a server that is not in recovery reports its own position
+_REPLICA_STATUS = text("""
+    SELECT
+        COALESCE(pg_last_wal_replay_lsn(), pg_current_wal_lsn())::text,
+        CASE
+            WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END
+""")
+
+class Replica:
+    """A read replica engine with the replay position and lag seen by the last health check."""
+
+    def __init__(self, url: str, engine):
+        self.url = url
+        self.engine = engine
+        self.session_factory = _session_factory(engine, readonly=True)
+        self.healthy = False
+        self.replay_lsn = 0
+        self.lag_seconds: Optional[float] = None
+        self.sessions_total = 0
+
+    def in_use(self) -> int:
+        return self.engine.sync_engine.pool.checkedout()
+
+    async def check(self, max_lag_seconds: float) -> bool:
+        try:
+            async with self.engine.connect() as connection:
+                lsn, lag = (await connection.execute(_REPLICA_STATUS)).one()
+            self.replay_lsn = parse_lsn(lsn)
+            self.lag_seconds = float(lag)
+            self.healthy = self.lag_seconds <= max_lag_seconds
+        except Exception as e:
+            logger.warning(f"Read replica {self.engine.url.host} failed its health check: {e}")
+            self.healthy = False
+            self.lag_seconds = None
+        return self.healthy
+
+    def stats(self) -> dict:
+        return {
+            "host": self.engine.url.host,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "replay_lsn": self.replay_lsn,
+            "in_use": self.in_use(),
+            "sessions_total": self.sessions_total,
+        }
+
+class ReplicaSet:
+    """
+    Chooses a read replica for each read-only session.
+
+    Replicas whose lag exceeds `max_lag_seconds`, or that failed their last health check, are
+    skipped. Callers that need their own writes pass the LSN of their last write, and only
+    replicas that have replayed past it qualify. When no replica qualifies the caller falls
+    back to the primary.
+    """
+
+    SELECTIONS = ("round_robin", "least_connections")
+
+    def __init__(self, replicas: List[Replica], selection: str = "round_robin", max_lag_seconds: float = 5.0):
+        if selection not in self.SELECTIONS:
+            raise ValueError(f"Unknown replica selection {selection!r}; expected one of {', '.join(self.SELECTIONS)}")
+        self.replicas = replicas
+        self.selection = selection
+        self.max_lag_seconds = max_lag_seconds
+        self._next = 0
+        self._task: Optional[asyncio.Task] = None
+        self.primary_fallbacks_total = 0
+
+    def choose(self, min_lsn: Optional[int] = None) -> Optional[Replica]:
+        candidates = [
+            replica for replica in self.replicas
+            if replica.healthy and (min_lsn is None or replica.replay_lsn >= min_lsn)
+        ]
+        if not candidates:
+            self.primary_fallbacks_total += 1
+            return None
+        if self.selection == "least_connections":
+            replica = min(candidates, key=Replica.in_use)
+        else:
+            replica = candidates[self._next % len(candidates)]
+            self._next += 1
+        replica.sessions_total += 1
+        return replica
+
+    async def check(self) -> int:
+        """Health-check every replica. Returns how many are usable."""
+        results = await asyncio.gather(*(replica.check(self.max_lag_seconds) for replica in self.replicas))
+        return sum(results)
+
+    async def _monitor(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.check()
+
+    def start(self, interval: float) -> asyncio.Task:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._monitor(interval))
+        return self._task
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+    def stats(self) -> dict:
+        return {
+            "selection": self.selection,
+            "max_lag_seconds": self.max_lag_seconds,
+            "primary_fallbacks_total": self.primary_fallbacks_total,
+            "replicas": [replica.stats() for replica in self.replicas],
+        }
 
 class Database:
     """Handles database connections and sessions."""
     _engine = None
     _session_factory = None
+    _read_session_factory = None
+    _pgbouncer = False
+    _engine_options: dict = {}
+    _replicas: Optional[ReplicaSet] = None
 
     @classmethod
-    def initialize(cls, database_url: str, echo: bool = False):
-        """Initialize the async engine and sessionmaker."""
+    def initialize(
+        cls,
+        database_url: str,
+        echo: bool = False,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = 1800,
+        pool_pre_ping: bool = True,
+        statement_cache_size: int = 100,
+        pgbouncer: bool = False,
+    ):
+        """
+        Initialize the async engine and sessionmaker.
+
+        With `pgbouncer` set, prepared statement caching is disabled and statements get unique
+        names, since a transaction-pooling PgBouncer may run each statement on a different server
+        connection.
+        """
         if cls._engine is None:  # Ensure engine is created once
-            cls._engine = create_async_engine(database_url, echo=echo, future=True)
-            cls._session_factory = sessionmaker(
-                bind=cls._engine, class_=AsyncSession, expire_on_commit=False, future=True
+            if pgbouncer:
+                connect_args = {
+                    "statement_cache_size": 0,
+                    "prepared_statement_cache_size": 0,
+                    "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+                }
+            else:
+                connect_args = {
+                    "statement_cache_size": statement_cache_size,
+                    "prepared_statement_cache_size": statement_cache_size,
+                }
+            # Replica engines are created with the same options
+            cls._engine_options = dict(
+                echo=echo,
+                future=True,
+                poolclass=InstrumentedQueuePool,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                pool_timeout=pool_timeout,
+                pool_recycle=pool_recycle,
+                pool_pre_ping=pool_pre_ping,
+                connect_args=connect_args,
             )
+            cls._engine = create_async_engine(database_url, **cls._engine_options)
+            cls._pgbouncer = pgbouncer
+            cls._session_factory = _session_factory(cls._engine)
+            cls._read_session_factory = _session_factory(cls._engine, readonly=True)
 
     @classmethod
     def get_session_factory(cls):
@@ -23,3 +326,81 @@ class Database:
         if cls._session_factory is None:
             raise ValueError("Database not initialized. Call `initialize()` first.")
         return cls._session_factory
+
+    @classmethod
+    async def configure_replicas(cls, urls: List[str], selection: str = "round_robin", max_lag_seconds: float = 5.0) -> ReplicaSet:
+        """Create engines for the read replicas at `urls` and run a first health check."""
+        if cls._engine is None:
+            raise ValueError("Database not initialized. Call `initialize()` first.")
+        replicas = [Replica(url, create_async_engine(url, **cls._engine_options)) for url in urls]
+        cls._replicas = ReplicaSet(replicas, selection, max_lag_seconds)
+        await cls._replicas.check()
+        return cls._replicas
+
+    @classmethod
+    def get_replicas(cls) -> Optional[ReplicaSet]:
+        return cls._replicas
+
+    @classmethod
+    def get_read_session_factory(cls, min_lsn: Optional[int] = None) -> Tuple[Callable[[], AsyncSession], Optional[Replica]]:
+        """
+        Returns a factory of read-only sessions and the replica it is bound to.
+
+        The replica is None when the primary is used: no replicas are configured, none is
+        healthy, or none has replayed up to `min_lsn` yet.
+        """
+        replica = cls._replicas.choose(min_lsn) if cls._replicas is not None else None
+        if replica is None:
+            if cls._read_session_factory is None:
+                raise ValueError("Database not initialized. Call `initialize()` first.")
+            return cls._read_session_factory, None
+        return replica.session_factory, replica
+
+    @classmethod
+    async def current_wal_lsn(cls) -> str:
+        """Returns the primary's current WAL position, for read-your-writes tokens."""
+        async with cls._engine.connect() as connection:
+            return (await connection.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar_one()
+
+    @classmethod
+    async def close_replicas(cls) -> None:
+        if cls._replicas is not None:
+            await cls._replicas.close()
+            cls._replicas = None
+
+    @classmethod
+    async def warm_up(cls, connections: Optional[int] = None, statements: Iterable[Tuple] = ()) -> int:
+        """
+        Open `connections` pooled connections (default: the pool size) and run each
+        (statement, parameters) pair of `statements` on each.
+
+        Running the hot statements once compiles them into the engine's statement cache and
+        prepares them on every connection, so the first requests skip both steps. Statements
+        should match no rows. Returns the number of connections opened.
+        """
+        if cls._engine is None:
+            raise ValueError("Database not initialized. Call `initialize()` first.")
+        pool = cls._engine.sync_engine.pool
+        count = pool.size() if connections is None else min(connections, pool.size())
+        statements = [] if cls._pgbouncer else list(statements)
+        async with AsyncExitStack() as stack:
+            # Hold every connection until all are open so each statement is prepared on N distinct connections
+            for _ in range(count):
+                connection = await stack.enter_async_context(cls._engine.connect())
+                for statement, parameters in statements:
+                    await connection.execute(statement, parameters)
+                await connection.rollback()
+        return count
+
+    @classmethod
+    async def dispose(cls) -> None:
+        """Close every pooled connection of the primary engine; the pool reconnects on next use."""
+        if cls._engine is not None:
+            await cls._engine.dispose()
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        """Returns checkout, overflow and wait-time statistics of this worker's pool, and how many requests skipped it."""
+        if cls._engine is None:
+            raise ValueError("Database not initialized. Call `initialize()` first.")
+        return {**cls._engine.sync_engine.pool.stats(), **request_db_usage.stats()}
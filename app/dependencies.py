@@ -1,11 +1,15 @@
-from builtins import Exception, dict, str
-from fastapi import Depends, HTTPException
+from builtins import Exception, ValueError, dict, getattr, str
+from typing import Optional
+from fastapi import Depends, HTTPException, Request
+from sqlalchemy.exc import DBAPIError
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.database import Database
+from app.database import UNIT_OF_WORK, USED_CONNECTION, WROTE, Database, parse_lsn
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
-from app.services.jwt_service import decode_token
+from app.services.jwt_service import decode_token_cached
+from app.services.token_versions import token_versions
+from app.utils.policy import PermissionCheck
 from settings.config import Settings
 from fastapi import Depends
 
@@ -17,36 +21,113 @@ def get_email_service() -> EmailService:
     template_manager = TemplateManager()
     return EmailService(template_manager=template_manager)
 
-async def get_db() -> AsyncSession:
-    """Dependency that provides a database session for each request."""
+def _note_db_use(request: Optional[Request], session: AsyncSession) -> None:
+    if request is not None and session.info.get(USED_CONNECTION):
+        request.state.used_db = True
+
+async def get_db(request: Request = None) -> AsyncSession:
+    """
+    Dependency that provides a database session for each request.
+
+    The session is a unit of work: service writes are flushed as they happen and committed once
+    when the handler returns. Any exception rolls the whole request back. No pooled connection
+    is checked out until the first statement runs.
+    """
     async_session_factory = Database.get_session_factory()
     async with async_session_factory() as session:
+        session.info[UNIT_OF_WORK] = True
         try:
             yield session
+            await session.commit()
+            if request is not None and session.info.get(WROTE):
+                # Tells record_last_write_lsn that this request committed a write
+                request.state.wrote = True
+        except HTTPException:
+            await session.rollback()
+            raise
         except Exception as e:
+            await session.rollback()
             raise HTTPException(status_code=500, detail=str(e))
-        
+        finally:
+            _note_db_use(request, session)
+
+# Carries the primary's WAL position after a client's last write (see record_last_write_lsn in main)
+LAST_WRITE_LSN_HEADER = "X-Last-Write-LSN"
+LAST_WRITE_LSN_COOKIE = "last_write_lsn"
+
+def last_write_lsn(request: Request) -> Optional[int]:
+    """The LSN of the caller's last write from the request header or cookie, if any."""
+    value = request.headers.get(LAST_WRITE_LSN_HEADER) or request.cookies.get(LAST_WRITE_LSN_COOKIE)
+    if not value:
+        return None
+    try:
+        # Cookie values containing '/' come back quoted
+        return parse_lsn(value.strip('"'))
+    except ValueError:
+        return None
+
+async def get_read_db(request: Request) -> AsyncSession:
+    """
+    Dependency that provides a session for read-only endpoints.
+
+    All statements of the request share one READ ONLY transaction, on a healthy read replica when
+    one is configured and has replayed the caller's last write, and on the primary otherwise.
+    """
+    async_session_factory, replica = Database.get_read_session_factory(last_write_lsn(request))
+    async with async_session_factory() as session:
+        try:
+            yield session
+        except HTTPException:
+            raise
+        except DBAPIError as e:
+            if replica is not None and e.connection_invalidated:
+                # Fail over right away instead of waiting for the next health check
+                replica.healthy = False
+            raise HTTPException(status_code=500, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        finally:
+            _note_db_use(request, session)
+
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login/")
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def get_current_user(token: str = Depends(oauth2_scheme), request: Request = None):
+    """Resolve the caller from the bearer token once per request and keep it on request.state."""
+    current_user = getattr(request.state, "auth", None) if request is not None else None
+    if current_user is not None:
+        return current_user
     credentials_exception = HTTPException(
         status_code=401,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_token(token)
+    payload = decode_token_cached(token)
     if payload is None:
         raise credentials_exception
     user_id: str = payload.get("sub")
     user_role: str = payload.get("role")
     if user_id is None or user_role is None:
         raise credentials_exception
-    return {"user_id": user_id, "role": user_role}
+    # Revocation check against the in-process version cache; no query on the request path
+    uid = payload.get("uid")
+    if uid is not None and not token_versions.is_current(uid, payload.get("ver", 0)):
+        raise credentials_exception
+    current_user = {"user_id": user_id, "role": user_role}
+    if request is not None:
+        request.state.auth = current_user
+    return current_user
+
+def require_permission(*permissions: str):
+    """
+    Dependency factory allowing callers whose role grants all of `permissions`.
+
+    The requirement is compiled to a bitmask against the active policy, so each check is one AND.
+    """
+    check = PermissionCheck(permissions)
 
-def require_role(role: str):
-    def role_checker(current_user: dict = Depends(get_current_user)):
-        if current_user["role"] not in role:
+    def permission_checker(current_user: dict = Depends(get_current_user)):
+        if not check.allows(current_user["role"]):
             raise HTTPException(status_code=403, detail="Operation not permitted")
         return current_user
-    return role_checker
+    return permission_checker
@@ -1,12 +1,24 @@
-from builtins import Exception
-from fastapi import FastAPI
+from builtins import Exception, getattr
+import logging
+from fastapi import FastAPI, Request
 from starlette.responses import JSONResponse
 from starlette.middleware.cors import CORSMiddleware  # Import the CORSMiddleware
-from app.database import Database
-from app.dependencies import get_settings
-from app.routers import user_routes
+from app.database import Database, request_db_usage
+from app.dependencies import LAST_WRITE_LSN_COOKIE, LAST_WRITE_LSN_HEADER, get_settings
+from app.routers import internal_routes, user_routes, well_known_routes
+from app.services.jwt_service import configure_key_ring
+from app.services.login_buffer import last_login_buffer
+from app.services.token_versions import token_versions
+from app.services.user_autocomplete import user_autocomplete
+from app.services.user_counts import user_counts
+from app.services.user_service import UserService
 from app.utils.api_description import getDescription
+from app.utils.admission import configure_login_admission
 from app.utils.common import setup_logging
+from app.utils.policy import configure_policy
+from app.utils.security import configure_password_executor, configure_password_hasher, shutdown_password_executor
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(
     title="User Management",
@@ -30,17 +42,125 @@ app.add_middleware(
     allow_headers=["*"],  # Allowed HTTP headers
 )
 
+class DatabaseUsageMiddleware:
+    """
+    Count requests and whether each one checked out a database connection.
+
+    A plain ASGI middleware rather than @app.middleware("http"), so counting adds no extra task
+    or response streaming per request. The session dependencies flag request.state.used_db,
+    which Starlette keeps in scope["state"].
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = scope.setdefault("state", {})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_db_usage.record(state.get("used_db", False))
+
+app.add_middleware(DatabaseUsageMiddleware)
+
+@app.middleware("http")
+async def record_last_write_lsn(request: Request, call_next):
+    """
+    Hand writers the primary's WAL position after a successful write.
+
+    get_read_db keeps routing a client that sends it back to the primary until a replica has
+    replayed that far, so users always read their own writes. Only requests whose get_db session
+    committed a write pay for the extra round trip, and only when replicas are configured.
+    """
+    response = await call_next(request)
+    if (
+        getattr(request.state, "wrote", False)
+        and response.status_code < 400
+        and Database.get_replicas() is not None
+        and get_settings().read_your_writes_enabled
+    ):
+        try:
+            lsn = await Database.current_wal_lsn()
+        except Exception as e:
+            # The write is committed; without the token the client may briefly read a stale replica
+            logger.warning(f"Could not read the WAL position after a write: {e}")
+            return response
+        response.headers[LAST_WRITE_LSN_HEADER] = lsn
+        response.set_cookie(LAST_WRITE_LSN_COOKIE, lsn, max_age=300, httponly=True, samesite="lax")
+    return response
+
 @app.on_event("startup")
 async def startup_event():
     settings = get_settings()
-    Database.initialize(settings.database_url, settings.debug)
+    Database.initialize(
+        settings.database_url,
+        settings.debug,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=settings.db_pool_pre_ping,
+        statement_cache_size=settings.db_statement_cache_size,
+        pgbouncer=settings.db_pgbouncer,
+    )
+    # Open connections and prepare the hot statements before the first request needs them
+    await Database.warm_up(settings.db_pool_warmup_connections, UserService.hot_statements())
+    if settings.database_replica_urls:
+        replicas = await Database.configure_replicas(
+            settings.database_replica_urls, settings.replica_selection, settings.replica_max_lag_seconds
+        )
+        replicas.start(settings.replica_health_interval_seconds)
+    # Parse signing keys once at startup so a bad key fails fast instead of on the first login
+    configure_key_ring(settings.jwt_algorithm, settings.jwt_secret_key, settings.jwt_keys_dir, settings.jwt_active_kid)
+    configure_policy(settings.rbac_policy_file)
+    user_counts.configure(
+        settings.user_count_strategy, settings.user_count_cache_ttl_seconds, settings.user_count_exact_below,
+        settings.user_count_concurrent,
+    )
+    user_autocomplete.configure(settings.user_autocomplete_cache_ttl_seconds, settings.user_autocomplete_limit)
+    configure_password_executor(settings.password_hash_workers, settings.password_hash_use_processes)
+    if settings.password_hash_algorithm == "argon2id":
+        hasher_params = {
+            "time_cost": settings.argon2_time_cost,
+            "memory_cost": settings.argon2_memory_cost,
+            "parallelism": settings.argon2_parallelism,
+        }
+    else:
+        hasher_params = {"rounds": settings.bcrypt_rounds}
+    configure_password_hasher(settings.password_hash_algorithm, settings.password_hash_target_ms, **hasher_params)
+    configure_login_admission(
+        settings.login_max_concurrent_verifications,
+        settings.login_max_queued_verifications,
+        settings.login_queue_timeout_ms / 1000,
+    )
+    if settings.login_write_behind_enabled:
+        last_login_buffer.start(Database.get_session_factory(), settings.login_write_behind_interval_seconds)
+    if settings.token_version_listen_enabled:
+        # Loads revoked token versions, then keeps them current as other workers revoke tokens
+        token_versions.start(Database.get_session_factory(), settings.database_url)
+    else:
+        async with Database.get_session_factory()() as session:
+            await token_versions.load(session)
     setup_logging()
-    
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Flush buffered login timestamps so clean restarts lose nothing
+    if get_settings().login_write_behind_enabled:
+        await last_login_buffer.stop(Database.get_session_factory())
+    await token_versions.stop()
+    await Database.close_replicas()
+    shutdown_password_executor()
 
 @app.exception_handler(Exception)
 async def exception_handler(request, exc):
     return JSONResponse(status_code=500, content={"message": "An unexpected error occurred."})
 
 app.include_router(user_routes.router)
+app.include_router(internal_routes.router)
+app.include_router(well_known_routes.router)
 
 
@@ -0,0 +1,38 @@
+from builtins import str
+from datetime import datetime
+import uuid
+from sqlalchemy import Column, String, DateTime, ForeignKey, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+class RefreshToken(Base):
+    """
+    An opaque refresh token, stored only as a SHA-256 digest in the 'refresh_tokens' table.
+
+    Every refresh consumes the presented token and issues a new one in the same family. Presenting
+    a token that was already consumed means it leaked, so the whole family is revoked.
+
+    Attributes:
+        id (UUID): Unique identifier for the token.
+        user_id (UUID): The user the token was issued to.
+        family_id (UUID): Shared by all tokens descended from one login.
+        token_hash (str): Hex SHA-256 digest of the opaque token.
+        expires_at (datetime): When the token stops being accepted.
+        used_at (datetime): When the token was exchanged for a new one.
+        revoked_at (datetime): When the token's family was revoked.
+        created_at (datetime): Timestamp when the token was issued, set by the server.
+    """
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False, index=True)
+    token_hash: Mapped[str] = Column(String(64), unique=True, nullable=False, index=True)
+    expires_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=False)
+    used_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    revoked_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<RefreshToken {self.id}, family: {self.family_id}>"
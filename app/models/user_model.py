@@ -3,12 +3,25 @@ from datetime import datetime
 from enum import Enum
 import uuid
 from sqlalchemy import (
-    Column, String, Integer, DateTime, Boolean, func, Enum as SQLAlchemyEnum
+    Column, Computed, String, Integer, DateTime, Boolean, ForeignKey, DDL, Index, event, func, select, Enum as SQLAlchemyEnum
 )
-from sqlalchemy.dialects.postgresql import UUID, ENUM
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID, ENUM
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
+# Text search configuration of users.search_vector; queries against it must use the same one
+SEARCH_CONFIG = "english"
+
+# Names weigh more than the bio when ranking full-text matches
+SEARCH_VECTOR = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A') || "
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(bio, '')), 'B')"
+)
+
+# Leave free space in each page so login-state updates can stay HOT (heap-only tuple) updates
+LOGIN_STATE_FILLFACTOR = 70
+
 class UserRole(Enum):
     """Enumeration of user roles within the application, stored as ENUM in the database."""
     ANONYMOUS = "ANONYMOUS"
@@ -16,6 +29,25 @@ class UserRole(Enum):
     MANAGER = "MANAGER"
     ADMIN = "ADMIN"
 
+def _login_state_attribute(name: str) -> hybrid_property:
+    """
+    Exposes a UserLoginState column on User so callers can keep using `user.is_locked`
+    and `User.is_locked == value` as if the column still lived on the users table.
+    """
+    def fget(self):
+        return getattr(self.login_state, name) if self.login_state is not None else None
+
+    def fset(self, value):
+        if self.login_state is None:
+            self.login_state = UserLoginState()
+        setattr(self.login_state, name, value)
+
+    def expr(cls):
+        column = getattr(UserLoginState, name)
+        return select(column).where(UserLoginState.user_id == cls.id).scalar_subquery()
+
+    return hybrid_property(fget, fset, expr=expr)
+
 class User(Base):
     """
     Represents a user within the application, corresponding to the 'users' table in the database.
@@ -37,9 +69,11 @@ class User(Base):
         role (UserRole): Role of the user within the application.
         is_professional (bool): Flag indicating professional status.
         professional_status_updated_at (datetime): Timestamp of last professional status update.
-        last_login_at (datetime): Timestamp of the last login.
-        failed_login_attempts (int): Count of failed login attempts.
-        is_locked (bool): Flag indicating if the account is locked.
+        last_login_at (datetime): Timestamp of the last login, stored in user_login_state.
+        failed_login_attempts (int): Count of failed login attempts, stored in user_login_state.
+        is_locked (bool): Flag indicating if the account is locked, stored in user_login_state.
+        token_version (int): Embedded in issued access tokens; bumping it revokes every outstanding token.
+        search_vector (tsvector): Names and bio for full-text search, generated and kept current by Postgres.
         created_at (datetime): Timestamp when the user was created, set by the server.
         updated_at (datetime): Timestamp of the last update, set by the server.
 
@@ -52,6 +86,14 @@ class User(Base):
     """
     __tablename__ = "users"
     __mapper_args__ = {"eager_defaults": True}
+    __table_args__ = (
+        # Matches the (created_at, id) ordering used for keyset pagination
+        Index("ix_users_created_at_id", "created_at", "id"),
+        # Trigram indexes serve substring (ILIKE '%...%') and similarity searches, which btree indexes cannot
+        Index("ix_users_nickname_trgm", "nickname", postgresql_using="gin", postgresql_ops={"nickname": "gin_trgm_ops"}),
+        Index("ix_users_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_users_search_vector", "search_vector", postgresql_using="gin"),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     nickname: Mapped[str] = Column(String(50), unique=True, nullable=False, index=True)
@@ -65,15 +107,27 @@ class User(Base):
     role: Mapped[UserRole] = Column(SQLAlchemyEnum(UserRole, name='UserRole', create_constraint=True), nullable=False)
     is_professional: Mapped[bool] = Column(Boolean, default=False)
     professional_status_updated_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
-    last_login_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
-    failed_login_attempts: Mapped[int] = Column(Integer, default=0)
-    is_locked: Mapped[bool] = Column(Boolean, default=False)
     created_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     verification_token = Column(String, nullable=True)
     email_verified: Mapped[bool] = Column(Boolean, default=False, nullable=False)
     hashed_password: Mapped[str] = Column(String(255), nullable=False)
+    token_version: Mapped[int] = Column(Integer, default=0, server_default="0", nullable=False)
+    # Deferred: only full-text search reads it, and it is never loaded onto User objects
+    search_vector = mapped_column(TSVECTOR, Computed(SEARCH_VECTOR, persisted=True), deferred=True)
+    login_state = relationship(
+        "UserLoginState", back_populates="user", uselist=False, lazy="joined",
+        cascade="all, delete-orphan", passive_deletes=True,
+    )
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        if self.login_state is None:
+            self.login_state = UserLoginState()
 
+    last_login_at = _login_state_attribute("last_login_at")
+    failed_login_attempts = _login_state_attribute("failed_login_attempts")
+    is_locked = _login_state_attribute("is_locked")
 
     def __repr__(self) -> str:
         """Provides a readable representation of a user object."""
@@ -95,3 +149,59 @@ class User(Base):
         """Updates the professional status and logs the update time."""
         self.is_professional = status
         self.professional_status_updated_at = func.now()
+
+
+class UserLoginState(Base):
+    """
+    Login bookkeeping for a user, kept in the narrow 'user_login_state' table.
+
+    These columns change on almost every login. Keeping them out of the wide users row means a
+    login rewrites a small tuple, and the reduced fillfactor leaves room for HOT updates.
+
+    Attributes:
+        user_id (UUID): The user this state belongs to.
+        last_login_at (datetime): Timestamp of the last login.
+        failed_login_attempts (int): Count of failed login attempts.
+        is_locked (bool): Flag indicating if the account is locked.
+    """
+    __tablename__ = "user_login_state"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    last_login_at: Mapped[datetime] = Column(DateTime(timezone=True), nullable=True)
+    failed_login_attempts: Mapped[int] = Column(Integer, default=0, server_default="0", nullable=False)
+    is_locked: Mapped[bool] = Column(Boolean, default=False, server_default="false", nullable=False)
+    user = relationship("User", back_populates="login_state")
+
+class DeletedUser(Base):
+    """
+    Tombstone of a deleted user, kept in the 'deleted_users' table.
+
+    Access tokens outlive the row they were issued for. Workers load these ids at startup and
+    after their revocation listener reconnects, so a deletion announced while they were not
+    listening still revokes the user's tokens.
+
+    Attributes:
+        user_id (UUID): The deleted user; no foreign key, since the user row is gone.
+        deleted_at (datetime): When the user was deleted, set by the server.
+    """
+    __tablename__ = "deleted_users"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    deleted_at: Mapped[datetime] = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+# Case-insensitive prefix lookups (lower(column) LIKE 'abc%') for autocomplete. text_pattern_ops
+# compares characters rather than by collation, so LIKE can use the index under any locale.
+Index("ix_users_nickname_lower_pattern", func.lower(User.nickname).label("nickname_lower"), postgresql_ops={"nickname_lower": "text_pattern_ops"})
+Index("ix_users_email_lower_pattern", func.lower(User.email).label("email_lower"), postgresql_ops={"email_lower": "text_pattern_ops"})
+
+event.listen(
+    User.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+event.listen(
+    UserLoginState.__table__,
+    "after_create",
+    DDL(f"ALTER TABLE user_login_state SET (fillfactor = {LOGIN_STATE_FILLFACTOR})").execute_if(dialect="postgresql"),
+)
@@ -0,0 +1,84 @@
+"""
+Operational endpoints that expose per-worker runtime metrics for capacity planning.
+
+Each worker process keeps its own counters, so the values describe the worker that served the
+request rather than the whole deployment.
+"""
+
+from builtins import OSError, ValueError, dict, str
+from fastapi import APIRouter, Depends, HTTPException, status
+from app.database import Database
+from app.dependencies import require_permission
+from app.schemas.internal_schemas import AutocompleteStats, LoginAdmissionStats, PolicySummary, PoolStats, ReplicaSetStats, TokenCacheStats, TokenVersionStats
+from app.services.jwt_service import token_cache
+from app.services.token_versions import token_versions
+from app.services.user_autocomplete import user_autocomplete
+from app.utils.admission import get_login_admission
+from app.utils.policy import INTERNAL_METRICS, POLICY_RELOAD, get_policy, reload_policy
+
+router = APIRouter(prefix="/internal")
+
+@router.get("/login-admission", response_model=LoginAdmissionStats, tags=["Internal Metrics Requires (Admin Role)"])
+async def login_admission_stats(current_user: dict = Depends(require_permission(INTERNAL_METRICS))):
+    """
+    Report queue depth and wait times of the login admission controller in this worker.
+    """
+    return get_login_admission().stats()
+
+@router.get("/token-cache", response_model=TokenCacheStats, tags=["Internal Metrics Requires (Admin Role)"])
+async def token_cache_stats(current_user: dict = Depends(require_permission(INTERNAL_METRICS))):
+    """
+    Report hit rate and evictions of the decoded access token cache in this worker.
+    """
+    return token_cache.stats()
+
+@router.get("/token-versions", response_model=TokenVersionStats, tags=["Internal Metrics Requires (Admin Role)"])
+async def token_version_stats(current_user: dict = Depends(require_permission(INTERNAL_METRICS))):
+    """
+    Report how many revoked users this worker tracks and how many tokens it rejected.
+    """
+    return token_versions.stats()
+
+@router.get("/autocomplete", response_model=AutocompleteStats, tags=["Internal Metrics Requires (Admin Role)"])
+async def autocomplete_stats(current_user: dict = Depends(require_permission(INTERNAL_METRICS))):
+    """
+    Report size and hit rate of the user autocomplete prefix cache in this worker.
+    """
+    return user_autocomplete.stats()
+
+@router.get("/pool", response_model=PoolStats, tags=["Internal Metrics Requires (Admin Role)"])
+async def pool_stats(current_user: dict = Depends(require_permission(INTERNAL_METRICS))):
+    """
+    Report checked-out connections, overflow and checkout wait times of this worker's connection pool.
+    """
+    return Database.pool_stats()
+
+@router.get("/replicas", response_model=ReplicaSetStats, tags=["Internal Metrics Requires (Admin Role)"])
+async def replica_stats(current_user: dict = Depends(require_permission(INTERNAL_METRICS))):
+    """
+    Report health, lag and load of the read replicas as seen by this worker.
+    """
+    replicas = Database.get_replicas()
+    if replicas is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No read replicas configured")
+    return replicas.stats()
+
+@router.get("/policy", response_model=PolicySummary, tags=["Internal Metrics Requires (Admin Role)"])
+async def policy_summary(current_user: dict = Depends(require_permission(INTERNAL_METRICS))):
+    """
+    Show the compiled role/permission matrix active in this worker.
+    """
+    return get_policy().summary()
+
+@router.post("/policy/reload", response_model=PolicySummary, tags=["Internal Metrics Requires (Admin Role)"])
+async def policy_reload(current_user: dict = Depends(require_permission(POLICY_RELOAD))):
+    """
+    Recompile the role/permission policy from its source without a restart.
+
+    Only the worker that serves the request reloads; an invalid policy is rejected and the
+    current one stays active.
+    """
+    try:
+        return reload_policy().summary()
+    except (OSError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
@@ -18,32 +18,82 @@ Key Highlights:
 - Utilizes OAuth2PasswordBearer for securing API endpoints, requiring valid access tokens for operations.
 """
 
-from builtins import dict, int, len, str
+from builtins import bool, dict, getattr, int, len, list, str
 from datetime import timedelta
 from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Response, status, Request
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi import Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Tuple, Optional
-from app.dependencies import get_current_user, get_db, get_email_service, require_role
+from typing import List, Literal, Tuple, Optional
+from app.dependencies import get_current_user, get_db, get_email_service, get_read_db, require_permission
 from app.schemas.pagination_schema import EnhancedPagination
-from app.schemas.token_schema import TokenResponse
+from app.schemas.token_schema import RefreshTokenRequest, TokenResponse
 from app.schemas.user_schemas import LoginRequest, UserBase, UserCreate, UserListResponse, UserResponse, UserUpdate, UserRole
-from app.services.user_service import UserService
+from app.services.user_autocomplete import user_autocomplete
+from app.services.user_service import FUZZY_MATCH, AccountLockedError, UserService
+from app.services.user_repository import UserRepository
+from app.services.refresh_token_service import RefreshTokenService
 from app.services.jwt_service import create_access_token
 from app.utils.link_generation import create_user_links, generate_pagination_links
+from app.utils.pagination import decode_cursor
 from app.dependencies import get_settings
 from app.services.email_service import EmailService
-from app.schemas.user_schemas import UserSearchFilterRequest, UserListResponse, UserSearchQueryRequest
+from app.utils.admission import AdmissionRejected
+from app.utils.policy import USERS_CREATE, USERS_DELETE, USERS_READ, USERS_SEARCH, USERS_UPDATE
+from app.schemas.user_schemas import UserAutocompleteResponse, UserSearchFilterRequest, UserListResponse, UserSearchQueryRequest, UserSuggestion
 import logging
 settings = get_settings()
 logger = logging.getLogger(__name__)
 router = APIRouter()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login/")
 
+CURSOR_DESCRIPTION = "Keyset pagination cursor from a previous page's links; empty for the first page. Overrides skip."
+
+def validate_cursor(cursor: Optional[str]) -> None:
+    if cursor is not None:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def validate_ranked_cursor(cursor: Optional[str], ranked: bool) -> None:
+    """Ranked results (fuzzy or full-text) are ordered by relevance, which a keyset cursor cannot follow."""
+    if ranked and cursor is not None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Ranked search results cannot be paged with a cursor")
+
+HIGHLIGHT_DESCRIPTION = "With a full-text `q` filter, return highlighted snippets of the matching names and bio."
+
+COUNT_DESCRIPTION = "`total` counts the matching users; `none` skips the count query and reports only `has_more`."
+
+def page_links(request: Request, skip: int, limit: int, total: Optional[int], cursor: Optional[str], users) -> list:
+    """Offset links, or cursor links built from the neighbours of a KeysetPage."""
+    return generate_pagination_links(
+        request, skip, limit, total, cursor,
+        getattr(users, "next_cursor", None), getattr(users, "prev_cursor", None), users.has_more,
+    )
+
+# Declared before /users/{user_id}, which would otherwise take "autocomplete" as a user id
+@router.get("/users/autocomplete", response_model=UserAutocompleteResponse, tags=["User Search Requires (Admin Role)"])
+async def autocomplete_users(
+    prefix: str = Query(..., min_length=1, max_length=255, description="Start of a nickname or email, matched case-insensitively."),
+    current_user: dict = Depends(require_permission(USERS_SEARCH)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    Type-ahead suggestions for user lookup: users whose nickname or email starts with `prefix`.
+
+    Returns only `id`, `nickname` and `email`, ordered by nickname, and at most a fixed number of users.
+    Suggestions are served from a short-lived per-worker cache, so repeated and extended prefixes
+    usually skip the database entirely.
+    """
+    suggestions = await user_autocomplete.suggest(db, prefix)
+    return UserAutocompleteResponse(
+        items=[UserSuggestion(id=user_id, nickname=nickname, email=email) for user_id, nickname, email in suggestions]
+    )
+
 @router.get("/users/{user_id}", response_model=UserResponse, name="get_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def get_user(user_id: UUID, request: Request, current_user: dict = Depends(require_permission(USERS_READ)), token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_read_db)):
     """
     Endpoint to fetch a user by their unique identifier (UUID).
 
@@ -56,6 +106,13 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
         db: Dependency that provides an AsyncSession for database access.
         token: The OAuth2 access token obtained through OAuth2PasswordBearer dependency.
     """
+    if settings.user_read_fast_path_enabled:
+        user_data = await UserRepository.get_user_response(db, user_id)
+        if user_data is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        user_data["links"] = create_user_links(user_id, request)
+        return user_data
+
     user = await UserService.get_by_id(db, user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
@@ -85,7 +142,7 @@ async def get_user(user_id: UUID, request: Request, db: AsyncSession = Depends(g
 # experience by adhering to REST principles and providing self-discoverable operations.
 
 @router.put("/users/{user_id}", response_model=UserResponse, name="update_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def update_user(user_id: UUID, user_update: UserUpdate, request: Request, current_user: dict = Depends(require_permission(USERS_UPDATE)), token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     """
     Update user information.
 
@@ -116,7 +173,7 @@ async def update_user(user_id: UUID, user_update: UserUpdate, request: Request,
 
 
 @router.delete("/users/{user_id}", status_code=status.HTTP_204_NO_CONTENT, name="delete_user", tags=["User Management Requires (Admin or Manager Roles)"])
-async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def delete_user(user_id: UUID, current_user: dict = Depends(require_permission(USERS_DELETE)), token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
     """
     Delete a user by their ID.
 
@@ -130,7 +187,7 @@ async def delete_user(user_id: UUID, db: AsyncSession = Depends(get_db), token:
 
 
 @router.post("/users/", response_model=UserResponse, status_code=status.HTTP_201_CREATED, tags=["User Management Requires (Admin or Manager Roles)"], name="create_user")
-async def create_user(user: UserCreate, request: Request, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service), token: str = Depends(oauth2_scheme), current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))):
+async def create_user(user: UserCreate, request: Request, current_user: dict = Depends(require_permission(USERS_CREATE)), token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
     """
     Create a new user.
 
@@ -174,8 +231,8 @@ async def create_user(user: UserCreate, request: Request, db: AsyncSession = Dep
 async def basic_search_users(
     request: Request,
     query: UserSearchQueryRequest = Depends(),  # Use the request schema
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_role(["ADMIN"])),
+    current_user: dict = Depends(require_permission(USERS_SEARCH)),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Basic User Search Endpoint
@@ -190,6 +247,16 @@ async def basic_search_users(
         - `is_locked` (*bool*, optional): Filter by lock status (`True` for locked, `False` for unlocked).
         - `skip` (*int*, optional): Number of records to skip for pagination (default: 0).
         - `limit` (*int*, optional): Maximum number of records to return per page (default: 10).
+        - `cursor` (*str*, optional): Keyset pagination cursor; pass an empty value for the first page and follow
+          the `next`/`prev` links after that. Deep pages are as fast as the first one.
+        - `count` (*str*, optional): `total` (default) or `none` to skip counting; `has_more` still tells whether
+          a next page exists.
+        - `match` (*str*, optional): `substring` (default) or `fuzzy`, which matches username and email by trigram
+          similarity and returns the closest matches first.
+        - `q` (*str*, optional): Full-text search over first name, last name and bio, best matches first. Accepts
+          quoted phrases, `or` and `-word` exclusions.
+        - `highlight` (*bool*, optional): With `q`, return highlighted snippets of the matching text in `snippets`.
+        - Ranked results (`match=fuzzy` or `q`) cannot be paged with a cursor.
 
     **Returns**:
         - Paginated list of users matching the provided filters.
@@ -203,6 +270,14 @@ async def basic_search_users(
             ```
             GET /users-search?role=ADMIN&is_locked=false&skip=0&limit=5
             ```
+        - **Find users whose username resembles a misspelled one**:
+            ```
+            GET /users-search?username=jonh&match=fuzzy
+            ```
+        - **Find users who mention Python in their bio, with highlights**:
+            ```
+            GET /users-search?q=python%20-java&highlight=true
+            ```
 
     **Usage Notes**:
         - This endpoint is designed for quick searches with minimal filter criteria.
@@ -212,6 +287,8 @@ async def basic_search_users(
     **Permissions**:
         - Only administrators (`ADMIN` role) can access this endpoint.
     """
+    validate_cursor(query.cursor)
+    validate_ranked_cursor(query.cursor, query.match == FUZZY_MATCH or bool(query.q))
     total_users, users = await UserService.search_and_filter_users(
         db,
         username=query.username,
@@ -220,10 +297,14 @@ async def basic_search_users(
         is_locked=query.is_locked,
         skip=query.skip,
         limit=query.limit,
+        cursor=query.cursor,
+        with_total=query.count == "total",
+        match=query.match,
+        q=query.q,
     )
 
     user_responses = [UserResponse.model_validate(user) for user in users]
-    pagination_links = generate_pagination_links(request, query.skip, query.limit, total_users)
+    pagination_links = page_links(request, query.skip, query.limit, total_users, query.cursor, users)
 
     # Include query filters in the response
     filters = UserSearchFilterRequest(
@@ -231,17 +312,22 @@ async def basic_search_users(
         email=query.email,
         role=query.role,
         is_locked=query.is_locked,
+        q=query.q,
         skip=query.skip,
         limit=query.limit,
     )
+    snippets = await UserService.search_snippets(db, query.q, users) if query.highlight and query.q else None
 
     return UserListResponse(
         items=user_responses,
         total=total_users,
-        page=(query.skip // query.limit) + 1,
+        total_exact=total_users.exact if total_users is not None else None,
+        has_more=users.has_more,
+        page=(query.skip // query.limit) + 1 if query.cursor is None else None,
         size=len(user_responses),
         links=pagination_links,
         filters=filters,
+        snippets=snippets,
     )
 
 @router.get("/users/", response_model=UserListResponse, tags=["User Management Requires (Admin or Manager Roles)"])
@@ -249,23 +335,28 @@ async def list_users(
     request: Request,
     skip: int = 0,
     limit: int = 10,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_role(["ADMIN", "MANAGER"]))
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Literal["total", "none"] = Query("total", description=COUNT_DESCRIPTION),
+    current_user: dict = Depends(require_permission(USERS_READ)),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    total_users = await UserService.count(db)
-    users = await UserService.list_users(db, skip, limit)
+    validate_cursor(cursor)
+    total_users = await UserService.count(db) if count == "total" else None
+    users = await UserService.list_users(db, skip, limit, cursor)
 
     user_responses = [
         UserResponse.model_validate(user) for user in users
     ]
     
-    pagination_links = generate_pagination_links(request, skip, limit, total_users)
+    pagination_links = page_links(request, skip, limit, total_users, cursor, users)
     
     # Construct the final response with pagination details
     return UserListResponse(
         items=user_responses,
         total=total_users,
-        page=skip // limit + 1,
+        total_exact=total_users.exact if total_users is not None else None,
+        has_more=users.has_more,
+        page=skip // limit + 1 if cursor is None else None,
         size=len(user_responses),
         links=pagination_links,  # Ensure you have appropriate logic to create these links
         filters=None,  # Set filters explicitly if not used
@@ -278,33 +369,63 @@ async def register(user_data: UserCreate, session: AsyncSession = Depends(get_db
         return user
     raise HTTPException(status_code=400, detail="Email already exists")
 
+async def issue_tokens(session: AsyncSession, user, family_id: Optional[UUID] = None) -> dict:
+    """Create an access token and a refresh token (in `family_id`, or a new family) for the user."""
+    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    access_token = create_access_token(
+        data={"sub": user.email, "role": str(user.role.name), "uid": str(user.id), "ver": user.token_version},
+        expires_delta=access_token_expires
+    )
+    refresh_token = await RefreshTokenService.issue(session, user.id, family_id)
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
 @router.post("/login/", response_model=TokenResponse, tags=["Login and Registration"])
 async def login(form_data: OAuth2PasswordRequestForm = Depends(), session: AsyncSession = Depends(get_db)):
     try:
         logger.info(f"Checking username {form_data.username} ")
-        if await UserService.is_account_locked(session, form_data.username):
-            raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
-        logger.info(f"Checking username {form_data.username} ")
-
         user = await UserService.login_user(session, form_data.username, form_data.password)
         logger.info(f"User : {user} ")
         if user:
-            access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-            access_token = create_access_token(
-                data={"sub": user.email, "role": str(user.role.name)},
-                expires_delta=access_token_expires
-            )
-            return {"access_token": access_token, "token_type": "bearer"}
+            return await issue_tokens(session, user)
         raise HTTPException(status_code=401, detail="Incorrect email or password.")
     except HTTPException as e:
         # Re-raise HTTP exceptions as-is
         raise e
+    except AccountLockedError:
+        raise HTTPException(status_code=400, detail="Account locked due to too many failed login attempts.")
+    except AdmissionRejected as e:
+        # Shed load quickly instead of queueing more CPU-bound password checks
+        logger.warning(f"Login rejected by admission control: {e.reason}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many logins in progress. Please retry later.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         # Log unexpected errors and return a generic 500 response
         logger.error(f"Unexpected error during login: {e}")
         raise HTTPException(status_code=500, detail="An unexpected error occurred.")
 
 
+@router.post("/token/refresh", response_model=TokenResponse, tags=["Login and Registration"])
+async def refresh_access_token(body: RefreshTokenRequest, session: AsyncSession = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access token without re-entering the password.
+
+    Refresh tokens are single use: each call returns a new refresh token and the presented one
+    stops working. Presenting a refresh token a second time revokes every token from the same login.
+    """
+    consumed = await RefreshTokenService.consume(session, body.refresh_token)
+    if consumed is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token.")
+    user_id, family_id = consumed
+    user = await UserService.get_by_id(session, user_id)
+    if not user or user.is_locked:
+        await RefreshTokenService.revoke_family(session, family_id)
+        raise HTTPException(status_code=401, detail="Invalid or expired refresh token.")
+    return await issue_tokens(session, user, family_id)
+
+
 @router.get("/verify-email/{user_id}/{token}", status_code=status.HTTP_200_OK, name="verify_email", tags=["Login and Registration"])
 async def verify_email(user_id: UUID, token: str, db: AsyncSession = Depends(get_db), email_service: EmailService = Depends(get_email_service)):
     """
@@ -321,8 +442,11 @@ async def verify_email(user_id: UUID, token: str, db: AsyncSession = Depends(get
 async def advanced_search_users(
     request: Request,
     filters: UserSearchFilterRequest,
-    db: AsyncSession = Depends(get_db),
-    current_user: dict = Depends(require_role(["ADMIN"])),
+    cursor: Optional[str] = Query(None, description=CURSOR_DESCRIPTION),
+    count: Literal["total", "none"] = Query("total", description=COUNT_DESCRIPTION),
+    highlight: bool = Query(False, description=HIGHLIGHT_DESCRIPTION),
+    current_user: dict = Depends(require_permission(USERS_SEARCH)),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     Advanced User Search Endpoint
@@ -337,8 +461,16 @@ async def advanced_search_users(
         - `is_locked` (*bool*, optional): Filter by lock status (`True` for locked, `False` for unlocked).
         - `created_from` (*datetime*, optional): Filter users created on or after this date.
         - `created_to` (*datetime*, optional): Filter users created on or before this date.
+        - `q` (*str*, optional): Full-text search over first name, last name and bio, best matches first.
+          Ranked results cannot be paged with a cursor.
         - `skip` (*int*, optional): Number of records to skip for pagination (default: 0).
         - `limit` (*int*, optional): Maximum number of records to return per page (default: 10).
+        - `cursor` (*str*, query parameter, optional): Keyset pagination cursor; pass an empty value for the
+          first page and follow the `next`/`prev` links after that.
+        - `count` (*str*, query parameter, optional): `total` (default) or `none` to skip counting; `has_more`
+          still tells whether a next page exists.
+        - `highlight` (*bool*, query parameter, optional): With `q`, return highlighted snippets of the matching
+          text in `snippets`.
 
     **Returns**:
         - Paginated list of users matching the provided filters.
@@ -368,22 +500,30 @@ async def advanced_search_users(
     **Permissions**:
         - Only administrators (`ADMIN` role) can access this endpoint.
     """
+    validate_cursor(cursor)
+    validate_ranked_cursor(cursor, bool(filters.q))
     total_users, users = await UserService.advanced_search_users(
         db,
         filters=filters.dict(exclude_none=True),
+        cursor=cursor,
+        with_total=count == "total",
     )
 
     user_responses = [UserResponse.model_validate(user) for user in users]
+    snippets = await UserService.search_snippets(db, filters.q, users) if highlight and filters.q else None
 
     # Correctly pass total_items to generate_pagination_links
-    pagination_links = generate_pagination_links(request, filters.skip, filters.limit, total_users)
+    pagination_links = page_links(request, filters.skip, filters.limit, total_users, cursor, users)
 
     # Include filters in the response
     return UserListResponse(
         items=user_responses,
         total=total_users,
-        page=(filters.skip // filters.limit) + 1,
+        total_exact=total_users.exact if total_users is not None else None,
+        has_more=users.has_more,
+        page=(filters.skip // filters.limit) + 1 if cursor is None else None,
         size=len(user_responses),
         links=pagination_links,
         filters=filters,  # Return filters for better client-side support
+        snippets=snippets,
     )
@@ -0,0 +1,22 @@
+"""
+Public discovery documents served under /.well-known.
+
+The JWKS lets other services verify our access tokens locally with the published public keys,
+instead of sharing a secret or calling back to this API.
+"""
+
+from fastapi import APIRouter, Response
+from app.services.jwt_service import get_key_ring
+
+router = APIRouter(prefix="/.well-known")
+
+@router.get("/jwks.json", tags=["Login and Registration"])
+async def jwks(response: Response):
+    """
+    Return the public keys that verify access tokens, as a JSON Web Key Set.
+
+    Keys are matched to tokens by the `kid` header. During a rotation both the new and the
+    previous key are listed. Responses may be cached briefly by clients.
+    """
+    response.headers["Cache-Control"] = "public, max-age=300"
+    return get_key_ring().jwks()
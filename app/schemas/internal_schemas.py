@@ -0,0 +1,160 @@
+from builtins import bool, float, int, str
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+class LoginAdmissionStats(BaseModel):
+    max_concurrent: int = Field(..., description="Password verifications allowed to run at once in this worker.")
+    max_queue: int = Field(..., description="Logins allowed to wait for a verification slot.")
+    queue_timeout_ms: float = Field(..., description="Longest a login may wait for a slot.")
+    in_flight: int = Field(..., description="Verifications currently running.")
+    queue_depth: int = Field(..., description="Logins currently waiting for a slot.")
+    admitted_total: int = Field(..., description="Logins admitted since the worker started.")
+    rejected_total: int = Field(..., description="Logins rejected because the queue was full.")
+    timed_out_total: int = Field(..., description="Logins rejected because their queue deadline passed.")
+    avg_wait_ms: float = Field(..., description="Average time admitted logins spent queued.")
+    max_wait_ms: float = Field(..., description="Longest time an admitted login spent queued.")
+    avg_service_ms: float = Field(..., description="Average time a verification slot was held.")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "max_concurrent": 4,
+                "max_queue": 32,
+                "queue_timeout_ms": 2000.0,
+                "in_flight": 4,
+                "queue_depth": 7,
+                "admitted_total": 1520,
+                "rejected_total": 12,
+                "timed_out_total": 3,
+                "avg_wait_ms": 85.2,
+                "max_wait_ms": 1710.4,
+                "avg_service_ms": 240.9
+            }
+        }
+
+
+class TokenCacheStats(BaseModel):
+    max_size: int = Field(..., description="Maximum number of decoded tokens kept in this worker.")
+    size: int = Field(..., description="Decoded tokens currently cached.")
+    hits: int = Field(..., description="Authentications served from the cache.")
+    misses: int = Field(..., description="Authentications that required a full token decode.")
+    hit_rate: float = Field(..., description="Share of lookups served from the cache.")
+    expired_evictions: int = Field(..., description="Entries dropped because the token expired.")
+    capacity_evictions: int = Field(..., description="Entries dropped to stay within max_size.")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "max_size": 10000,
+                "size": 812,
+                "hits": 48211,
+                "misses": 1304,
+                "hit_rate": 0.974,
+                "expired_evictions": 492,
+                "capacity_evictions": 0
+            }
+        }
+
+class TokenVersionStats(BaseModel):
+    tracked_users: int = Field(..., description="Users with a bumped token version known to this worker.")
+    deleted_users: int = Field(..., description="Deleted users whose tokens this worker rejects.")
+    rejected_total: int = Field(..., description="Access tokens rejected as revoked.")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "tracked_users": 37,
+                "deleted_users": 4,
+                "rejected_total": 112
+            }
+        }
+
+class AutocompleteStats(BaseModel):
+    entries: int = Field(..., description="Prefixes currently cached.")
+    hits_total: int = Field(..., description="Suggestions served from the cache, including narrowed shorter prefixes.")
+    misses_total: int = Field(..., description="Suggestions that needed a query.")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "entries": 210,
+                "hits_total": 5400,
+                "misses_total": 830
+            }
+        }
+
+class PolicySummary(BaseModel):
+    generation: int = Field(..., description="Increments every time the policy is compiled.")
+    permissions: List[str] = Field(..., description="Known permissions in bit order.")
+    roles: Dict[str, List[str]] = Field(..., description="Permissions granted to each role.")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "generation": 2,
+                "permissions": ["internal:metrics", "policy:reload", "users:create", "users:delete", "users:read", "users:search", "users:update"],
+                "roles": {"MANAGER": ["users:create", "users:delete", "users:read", "users:update"]}
+            }
+        }
+
+class PoolStats(BaseModel):
+    pool_size: int = Field(..., description="Connections kept open in this worker's pool.")
+    max_overflow: int = Field(..., description="Extra connections allowed beyond pool_size.")
+    max_connections: Optional[int] = Field(None, description="Most connections this worker can hold; multiply by workers to size against max_connections. Null when max_overflow is -1 (unbounded).")
+    checked_out: int = Field(..., description="Connections currently in use.")
+    checked_in: int = Field(..., description="Idle connections in the pool.")
+    overflow: int = Field(..., description="Overflow connections currently open.")
+    checkouts_total: int = Field(..., description="Connections handed out since the worker started.")
+    timeouts_total: int = Field(..., description="Checkouts that gave up after db_pool_timeout.")
+    avg_wait_ms: float = Field(..., description="Average time a checkout waited for a connection.")
+    max_wait_ms: float = Field(..., description="Longest time a checkout waited for a connection.")
+    recycle_seconds: int = Field(..., description="Age after which connections are replaced.")
+    pre_ping: bool = Field(..., description="Whether connections are checked for liveness on checkout.")
+    requests_total: int = Field(..., description="Requests served by this worker.")
+    requests_without_db: int = Field(..., description="Requests that completed without checking out a connection, e.g. rejected by authentication.")
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "pool_size": 5,
+                "max_overflow": 10,
+                "max_connections": 15,
+                "checked_out": 3,
+                "checked_in": 2,
+                "overflow": 0,
+                "checkouts_total": 18342,
+                "timeouts_total": 0,
+                "avg_wait_ms": 0.04,
+                "max_wait_ms": 12.7,
+                "recycle_seconds": 1800,
+                "pre_ping": True,
+                "requests_total": 20417,
+                "requests_without_db": 2075
+            }
+        }
+
+class ReplicaStats(BaseModel):
+    host: Optional[str] = Field(None, description="Replica host.")
+    healthy: bool = Field(..., description="Whether the replica passed its last health check within the lag limit.")
+    lag_seconds: Optional[float] = Field(None, description="Replay lag at the last health check; null if it failed.")
+    replay_lsn: int = Field(..., description="Last replayed WAL position, as an integer.")
+    in_use: int = Field(..., description="Connections to the replica currently checked out.")
+    sessions_total: int = Field(..., description="Read sessions routed to the replica.")
+
+class ReplicaSetStats(BaseModel):
+    selection: str = Field(..., description="Replica selection strategy.")
+    max_lag_seconds: float = Field(..., description="Lag beyond which a replica is skipped.")
+    primary_fallbacks_total: int = Field(..., description="Read sessions sent to the primary because no replica qualified.")
+    replicas: List[ReplicaStats]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "selection": "round_robin",
+                "max_lag_seconds": 5.0,
+                "primary_fallbacks_total": 14,
+                "replicas": [
+                    {"host": "replica-1", "healthy": True, "lag_seconds": 0.0, "replay_lsn": 94489280512, "in_use": 2, "sessions_total": 5120}
+                ]
+            }
+        }
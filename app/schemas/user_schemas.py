@@ -1,6 +1,6 @@
 from builtins import ValueError, any, bool, str
 from pydantic import BaseModel, EmailStr, Field, validator, root_validator
-from typing import Optional, List
+from typing import Dict, Literal, Optional, List
 from datetime import datetime
 from enum import Enum
 import uuid
@@ -132,16 +132,28 @@ class UserSearchFilterRequest(BaseModel):
     is_locked: Optional[bool] = Field(None, example=False)
     created_from: Optional[datetime] = Field(None, example="2024-01-01T00:00:00")
     created_to: Optional[datetime] = Field(None, example="2024-12-31T23:59:59")
+    q: Optional[str] = Field(None, example="python developer", description="Full-text search over first name, last name and bio, best matches first.")
     skip: int = Field(0, ge=0, example=0)
     limit: int = Field(10, gt=0, le=100, example=10)
 
 class UserListResponse(BaseModel):
     items: List[UserResponse]
-    total: int
-    page: int
+    total: Optional[int]  # None when the request asked for count=none
+    total_exact: Optional[bool] = Field(True, description="False when `total` is a planner estimate rather than an exact count.")
+    has_more: Optional[bool] = Field(None, description="Whether another page follows this one.")
+    page: Optional[int]  # None for cursor pagination, where page numbers are not known
     size: int
     links: Optional[List[PaginationLink]]  # Accept PaginationLink objects directly
     filters: Optional[UserSearchFilterRequest]  # Add filters for better client-side support
+    snippets: Optional[Dict[str, str]] = Field(None, description="Highlighted matches of the full-text query, by user id, when requested with highlight.")
+
+class UserSuggestion(BaseModel):
+    id: uuid.UUID = Field(..., example=uuid.uuid4())
+    nickname: str = Field(..., example="john_doe")
+    email: str = Field(..., example="john.doe@example.com")
+
+class UserAutocompleteResponse(BaseModel):
+    items: List[UserSuggestion]
 
 class UserSearchQueryRequest(BaseModel):
     username: Optional[str] = Field(None, example="john_doe", description="Search users by username.")
@@ -150,3 +162,8 @@ class UserSearchQueryRequest(BaseModel):
     is_locked: Optional[bool] = Field(None, example=False, description="Filter users by account lock status.")
     skip: int = Field(0, ge=0, example=0, description="Pagination offset.")
     limit: int = Field(10, gt=0, le=100, example=10, description="Number of records to retrieve.")
+    cursor: Optional[str] = Field(None, example="", description="Keyset pagination cursor from a previous page's links; empty for the first page. Overrides skip.")
+    count: Literal["total", "none"] = Field("total", example="none", description="`none` skips the count query; the response then has no total, only has_more.")
+    q: Optional[str] = Field(None, example="python developer", description="Full-text search over first name, last name and bio, best matches first.")
+    highlight: bool = Field(False, example=True, description="With q, return highlighted snippets of the matching text.")
+    match: Literal["substring", "fuzzy"] = Field("substring", example="fuzzy", description="`fuzzy` matches username and email by trigram similarity, most similar first, instead of as substrings.")
@@ -1,9 +1,151 @@
 # app/services/jwt_service.py
-from builtins import dict, str
+from builtins import ValueError, bytes, dict, float, int, isinstance, len, sorted, str
+import hashlib
+import heapq
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from jwt.algorithms import ECAlgorithm, OKPAlgorithm
 from datetime import datetime, timedelta
 from settings.config import settings
 
+# Algorithms signed with a private key whose public half is published in the JWKS
+ASYMMETRIC_KEY_TYPES = {
+    "EdDSA": (ed25519.Ed25519PrivateKey, ed25519.Ed25519PublicKey),
+    "ES256": (ec.EllipticCurvePrivateKey, ec.EllipticCurvePublicKey),
+}
+
+class SigningKey:
+    """A parsed signing key; `private_key` is None for keys kept only to verify older tokens."""
+
+    def __init__(self, kid: str, algorithm: str, private_key, public_key):
+        self.kid = kid
+        self.algorithm = algorithm
+        self.private_key = private_key
+        self.public_key = public_key
+
+    def to_jwk(self) -> dict:
+        if self.algorithm == "EdDSA":
+            jwk = OKPAlgorithm.to_jwk(self.public_key, as_dict=True)
+        else:
+            jwk = ECAlgorithm.to_jwk(self.public_key, as_dict=True)
+        jwk.update({"kid": self.kid, "alg": self.algorithm, "use": "sig"})
+        return jwk
+
+class KeyRing:
+    """
+    Set of keys used to sign and verify access tokens.
+
+    Tokens are signed with the active key and carry its `kid` header. Every key in the ring
+    verifies tokens bearing its `kid`, so a new key can become active while tokens signed
+    with the previous one stay valid until that key is removed.
+
+    Key objects are parsed once when added, never per token.
+    """
+
+    def __init__(self, algorithm: str):
+        self.algorithm = algorithm
+        self._keys: Dict[str, SigningKey] = {}
+        self.active_kid: Optional[str] = None
+
+    @property
+    def is_asymmetric(self) -> bool:
+        return self.algorithm in ASYMMETRIC_KEY_TYPES
+
+    def add_key(self, kid: str, private_key=None, public_key=None, active: bool = False) -> SigningKey:
+        if self.is_asymmetric:
+            private_type, public_type = ASYMMETRIC_KEY_TYPES[self.algorithm]
+            if private_key is not None and not isinstance(private_key, private_type):
+                raise ValueError(f"Key {kid} is not a valid {self.algorithm} private key")
+            if private_key is not None:
+                public_key = private_key.public_key()
+            if not isinstance(public_key, public_type):
+                raise ValueError(f"Key {kid} is not a valid {self.algorithm} key")
+        else:
+            # HMAC: the shared secret both signs and verifies
+            public_key = private_key
+        key = SigningKey(kid, self.algorithm, private_key, public_key)
+        self._keys[kid] = key
+        if active:
+            self.activate(kid)
+        return key
+
+    def signing_kids(self) -> List[str]:
+        return [kid for kid, key in self._keys.items() if key.private_key is not None]
+
+    def activate(self, kid: str) -> None:
+        if kid not in self._keys or self._keys[kid].private_key is None:
+            raise ValueError(f"No private key with kid {kid} to sign with")
+        self.active_kid = kid
+
+    def load_directory(self, path: str) -> None:
+        """
+        Load every `<kid>.pem` file in `path`. Private keys can sign; public keys only verify.
+
+        Keys can be created with e.g. `openssl genpkey -algorithm ed25519 -out keys/2026-10.pem`
+        (EdDSA) or `openssl genpkey -algorithm EC -pkeyopt ec_paramgen_curve:P-256 -out ...` (ES256).
+        """
+        for pem_path in sorted(Path(path).glob("*.pem")):
+            data = pem_path.read_bytes()
+            try:
+                self.add_key(pem_path.stem, private_key=serialization.load_pem_private_key(data, password=None))
+            except ValueError:
+                self.add_key(pem_path.stem, public_key=serialization.load_pem_public_key(data))
+
+    def sign(self, payload: dict) -> str:
+        if self.active_kid is None:
+            raise ValueError("No active signing key configured")
+        key = self._keys[self.active_kid]
+        return jwt.encode(payload, key.private_key, algorithm=self.algorithm, headers={"kid": key.kid})
+
+    def verify(self, token: str) -> dict:
+        kid = jwt.get_unverified_header(token).get("kid")
+        # Tokens issued before kid headers were introduced fall back to the active key
+        key = self._keys.get(kid if kid is not None else self.active_kid)
+        if key is None:
+            raise jwt.InvalidKeyError(f"Unknown signing key {kid}")
+        return jwt.decode(token, key.public_key, algorithms=[self.algorithm])
+
+    def jwks(self) -> dict:
+        """Return the public keys as a JSON Web Key Set; symmetric secrets are never published."""
+        if not self.is_asymmetric:
+            return {"keys": []}
+        return {"keys": [key.to_jwk() for key in self._keys.values()]}
+
+_key_ring: Optional[KeyRing] = None
+
+def configure_key_ring(algorithm: str, secret_key: Optional[str] = None, keys_dir: Optional[str] = None, active_kid: Optional[str] = None) -> KeyRing:
+    """
+    Build the key ring used for access tokens.
+
+    HS256 uses `secret_key`. EdDSA and ES256 load PEM keys from `keys_dir`; the active key is
+    `active_kid`, or the last private key in sorted kid order.
+    """
+    global _key_ring
+    key_ring = KeyRing(algorithm)
+    if key_ring.is_asymmetric:
+        key_ring.load_directory(keys_dir)
+        signing_kids = key_ring.signing_kids()
+        if active_kid is None and signing_kids:
+            active_kid = sorted(signing_kids)[-1]
+        key_ring.activate(active_kid)
+    else:
+        key_ring.add_key(active_kid or "default", private_key=secret_key, active=True)
+    _key_ring = key_ring
+    # Claims cached under the previous ring may come from keys that are no longer trusted
+    token_cache.clear()
+    return key_ring
+
+def get_key_ring() -> KeyRing:
+    """Return the key ring, building it from settings on first use."""
+    if _key_ring is None:
+        return configure_key_ring(settings.jwt_algorithm, settings.jwt_secret_key, settings.jwt_keys_dir, settings.jwt_active_kid)
+    return _key_ring
+
 def create_access_token(*, data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     # Convert role to uppercase before encoding the JWT
@@ -11,12 +153,100 @@ def create_access_token(*, data: dict, expires_delta: timedelta = None):
         to_encode['role'] = to_encode['role'].upper()
     expire = datetime.utcnow() + (expires_delta if expires_delta else timedelta(minutes=settings.access_token_expire_minutes))
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
-    return encoded_jwt
+    return get_key_ring().sign(to_encode)
 
 def decode_token(token: str):
     try:
-        decoded = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
-        return decoded
+        return get_key_ring().verify(token)
     except jwt.PyJWTError:
         return None
+
+class DecodedTokenCache:
+    """
+    Bounded LRU cache of verified token claims, keyed by a SHA-256 digest of the token.
+
+    Entries are dropped once their `exp` passes, so a cached token is never accepted after it
+    would have failed a full decode. Only successfully verified tokens are cached.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[float, dict]]" = OrderedDict()
+        self._expirations: List[Tuple[float, bytes]] = []
+        self.hits = 0
+        self.misses = 0
+        self.expired_evictions = 0
+        self.capacity_evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def _evict_expired(self, now: float) -> None:
+        while self._expirations and self._expirations[0][0] <= now:
+            exp, key = heapq.heappop(self._expirations)
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == exp:
+                del self._entries[key]
+                self.expired_evictions += 1
+
+    def get(self, token: str) -> Optional[dict]:
+        self._evict_expired(time.time())
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if exp is None or self.max_size <= 0:
+            return
+        now = time.time()
+        self._evict_expired(now)
+        if exp <= now:
+            return
+        key = self._key(token)
+        self._entries[key] = (float(exp), claims)
+        self._entries.move_to_end(key)
+        heapq.heappush(self._expirations, (float(exp), key))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.capacity_evictions += 1
+        # Capacity evictions leave stale heap entries behind; rebuild before the heap outgrows the cache
+        if len(self._expirations) > 2 * self.max_size:
+            self._expirations = [(exp, key) for key, (exp, _) in self._entries.items()]
+            heapq.heapify(self._expirations)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._expirations.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "max_size": self.max_size,
+            "size": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "expired_evictions": self.expired_evictions,
+            "capacity_evictions": self.capacity_evictions,
+        }
+
+token_cache = DecodedTokenCache(settings.token_cache_size)
+
+def decode_token_cached(token: str):
+    """Decode a token, reusing previously verified claims until the token expires."""
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        if claims is not None:
+            token_cache.put(token, claims)
+    return claims
@@ -0,0 +1,105 @@
+# app/services/login_buffer.py
+from builtins import Exception, dict, int, len, list, max, range
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from uuid import UUID
+from sqlalchemy import DateTime, column, func, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import UserLoginState
+
+logger = logging.getLogger(__name__)
+
+class LastLoginBuffer:
+    """
+    Write-behind buffer for successful-login timestamps.
+
+    Logins record their timestamp in memory; `flush()` writes every pending timestamp with a
+    single `UPDATE user_login_state ... FROM (VALUES ...)` statement per batch. Buffers are per
+    worker process, so a crash loses at most one flush interval of `last_login_at` values.
+    """
+
+    def __init__(self, max_batch: int = 1000):
+        self.max_batch = max_batch
+        self._pending: Dict[UUID, datetime] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.flushed_total = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, user_id: UUID, last_login_at: datetime) -> None:
+        """Remember the latest login time for a user until the next flush."""
+        current = self._pending.get(user_id)
+        if current is None or last_login_at > current:
+            self._pending[user_id] = last_login_at
+
+    def _restore(self, pending: Dict[UUID, datetime]) -> None:
+        for user_id, last_login_at in pending.items():
+            self.record(user_id, last_login_at)
+
+    @staticmethod
+    def _bulk_update(rows: list):
+        pending = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("last_login_at", DateTime(timezone=True)),
+            name="pending_logins",
+        ).data(rows)
+        return (
+            update(UserLoginState)
+            .where(UserLoginState.user_id == pending.c.id)
+            # GREATEST ignores NULLs and never moves a timestamp backwards
+            .values(last_login_at=func.greatest(UserLoginState.last_login_at, pending.c.last_login_at))
+            .execution_options(synchronize_session=False)
+        )
+
+    async def flush(self, session_factory: Callable[[], AsyncSession]) -> int:
+        """
+        Write all pending timestamps to the database.
+
+        Returns:
+            int: Number of users whose timestamp was written. On failure the timestamps are kept
+            for the next flush and 0 is returned.
+        """
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, {}
+        rows = list(pending.items())
+        try:
+            async with session_factory() as session:
+                for start in range(0, len(rows), self.max_batch):
+                    await session.execute(self._bulk_update(rows[start:start + self.max_batch]))
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Failed to flush {len(rows)} buffered login timestamps: {e}")
+            self._restore(pending)
+            return 0
+        self.flushed_total += len(rows)
+        return len(rows)
+
+    async def _run(self, session_factory: Callable[[], AsyncSession], interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+            await self.flush(session_factory)
+
+    def start(self, session_factory: Callable[[], AsyncSession], interval: float) -> asyncio.Task:
+        """Start flushing periodically on the running event loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(session_factory, interval))
+        return self._task
+
+    async def stop(self, session_factory: Callable[[], AsyncSession]) -> int:
+        """Stop the periodic flush and write whatever is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        return await self.flush(session_factory)
+
+# Per-worker buffer used by UserService when login write-behind is enabled
+last_login_buffer = LastLoginBuffer()
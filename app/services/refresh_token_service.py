@@ -0,0 +1,104 @@
+from builtins import classmethod, str
+from datetime import datetime, timedelta, timezone
+import hashlib
+import logging
+import secrets
+from typing import Optional, Tuple
+from uuid import UUID, uuid4
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import commit_or_flush
+from app.dependencies import get_settings
+from app.models.refresh_token_model import RefreshToken
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+class RefreshTokenService:
+    @staticmethod
+    def _digest(token: str) -> str:
+        # Refresh tokens are 256 random bits, so a fast digest is enough; bcrypt would defeat the purpose
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    @classmethod
+    async def issue(cls, session: AsyncSession, user_id: UUID, family_id: Optional[UUID] = None) -> str:
+        """
+        Create a refresh token for the user and return its opaque value.
+
+        A new family is started unless `family_id` is given (as it is during rotation).
+        """
+        token = secrets.token_urlsafe(32)
+        session.add(RefreshToken(
+            user_id=user_id,
+            family_id=family_id or uuid4(),
+            token_hash=cls._digest(token),
+            expires_at=datetime.now(timezone.utc) + timedelta(minutes=settings.refresh_token_expire_minutes),
+        ))
+        await commit_or_flush(session)
+        return token
+
+    @classmethod
+    async def consume(cls, session: AsyncSession, token: str) -> Optional[Tuple[UUID, UUID]]:
+        """
+        Mark a refresh token as used so it can be exchanged for a new one in the same family.
+
+        The token is consumed with a single conditional UPDATE, so two concurrent refreshes with
+        the same token cannot both succeed. Presenting a token that was already consumed revokes
+        every token in its family.
+
+        Returns:
+            The user id and family id of the token, or None if the token is not valid.
+        """
+        now = datetime.now(timezone.utc)
+        token_hash = cls._digest(token)
+        query = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.token_hash == token_hash,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(used_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.family_id)
+            .execution_options(synchronize_session=False)
+        )
+        consumed = (await session.execute(query)).first()
+        if consumed is None:
+            await session.rollback()
+            await cls._handle_rejected(session, token_hash)
+            return None
+        await session.commit()
+        return consumed.user_id, consumed.family_id
+
+    @classmethod
+    async def _handle_rejected(cls, session: AsyncSession, token_hash: str) -> None:
+        result = await session.execute(
+            select(RefreshToken.family_id, RefreshToken.used_at).where(RefreshToken.token_hash == token_hash)
+        )
+        row = result.first()
+        if row is not None and row.used_at is not None:
+            logger.warning(f"Refresh token reuse detected; revoking token family {row.family_id}")
+            await cls.revoke_family(session, row.family_id)
+
+    @classmethod
+    async def revoke_family(cls, session: AsyncSession, family_id: UUID) -> None:
+        query = (
+            update(RefreshToken)
+            .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(query)
+        await session.commit()
+
+    @classmethod
+    async def revoke_user(cls, session: AsyncSession, user_id: UUID) -> None:
+        """Revoke every refresh token family of the user, in the caller's transaction."""
+        query = (
+            update(RefreshToken)
+            .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(query)
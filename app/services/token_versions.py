@@ -0,0 +1,169 @@
+# app/services/token_versions.py
+from builtins import Exception, dict, int, len, max, set, str
+import asyncio
+import logging
+from typing import Callable, Dict, Optional, Set
+from uuid import UUID
+import asyncpg
+from sqlalchemy import event, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.database import commit_or_flush
+from app.models.user_model import DeletedUser, User
+
+logger = logging.getLogger(__name__)
+
+# NOTIFY channel used to fan revocations out to every worker
+TOKEN_VERSION_CHANNEL = "token_version"
+_DELETED = "deleted"
+
+# Session.info key holding (user_id, version) revocations to apply locally once the session commits
+PENDING_REVOCATIONS = "pending_token_revocations"
+
+class TokenVersionCache:
+    """
+    In-process view of the current `token_version` of users whose tokens were revoked.
+
+    Only users whose version was ever bumped (or who were deleted) have an entry, so checking a
+    token is a dict lookup and never a query. Entries are pushed in through invalidation: the
+    worker that revokes updates its own cache when its transaction commits, and the NOTIFY it
+    queued in that transaction is applied by `listen()` in every other worker. Deletions are also
+    kept as deleted_users tombstones, so `load()` recovers them like bumped versions. Tokens
+    without a `uid` claim predate versioning and are accepted until they expire.
+    """
+
+    def __init__(self):
+        self._versions: Dict[str, int] = {}
+        self._deleted: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.rejected_total = 0
+
+    def __len__(self) -> int:
+        return len(self._versions) + len(self._deleted)
+
+    def advance(self, user_id, version: int) -> None:
+        """Record that tokens older than `version` are revoked. Versions never move backwards."""
+        key = str(user_id)
+        self._versions[key] = max(version, self._versions.get(key, 0))
+
+    def mark_deleted(self, user_id) -> None:
+        """Reject every token of a deleted user."""
+        key = str(user_id)
+        self._versions.pop(key, None)
+        self._deleted.add(key)
+
+    def is_current(self, user_id, version: int) -> bool:
+        key = str(user_id)
+        if key in self._deleted or version < self._versions.get(key, 0):
+            self.rejected_total += 1
+            return False
+        return True
+
+    def clear(self) -> None:
+        self._versions.clear()
+        self._deleted.clear()
+
+    def stats(self) -> dict:
+        return {"tracked_users": len(self._versions), "deleted_users": len(self._deleted), "rejected_total": self.rejected_total}
+
+    @staticmethod
+    def payload(user_id, version: Optional[int]) -> str:
+        """NOTIFY payload for a bumped version, or for a deletion when `version` is None."""
+        return f"{user_id}:{_DELETED if version is None else version}"
+
+    def apply(self, payload: str) -> None:
+        user_id, _, version = payload.partition(":")
+        try:
+            UUID(user_id)
+            if version == _DELETED:
+                self.mark_deleted(user_id)
+            else:
+                self.advance(user_id, int(version))
+        except ValueError:
+            logger.warning(f"Ignoring malformed token version notification: {payload!r}")
+
+    async def publish(self, session: AsyncSession, user_id, version: Optional[int]) -> None:
+        """
+        Revoke tokens in the current transaction: a bumped version, or a deletion when `version` is None.
+
+        The NOTIFY (and the tombstone of a deletion) is part of the transaction, so other workers
+        hear of it only if it commits, and this worker's cache is updated by the after_commit hook
+        below. Like other service writes, a unit-of-work session is only flushed here.
+        """
+        if version is None:
+            await session.execute(insert(DeletedUser).values(user_id=user_id).on_conflict_do_nothing())
+        await session.execute(select(func.pg_notify(TOKEN_VERSION_CHANNEL, self.payload(user_id, version))))
+        session.info.setdefault(PENDING_REVOCATIONS, []).append((user_id, version))
+        await commit_or_flush(session)
+
+    def revoke(self, user_id, version: Optional[int]) -> None:
+        if version is None:
+            self.mark_deleted(user_id)
+        else:
+            self.advance(user_id, version)
+
+    async def load(self, session: AsyncSession) -> int:
+        """Load the versions of all users that have ever been revoked, and all deletions. Returns the number of entries."""
+        result = await session.execute(select(User.id, User.token_version).where(User.token_version > 0))
+        rows = result.all()
+        for user_id, version in rows:
+            self.advance(user_id, version)
+        deleted = (await session.execute(select(DeletedUser.user_id))).scalars().all()
+        for user_id in deleted:
+            self.mark_deleted(user_id)
+        return len(rows) + len(deleted)
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        self.apply(payload)
+
+    async def _listen(self, session_factory: Callable[[], AsyncSession], database_url: str, retry_interval: float) -> None:
+        dsn = make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(TOKEN_VERSION_CHANNEL, self._on_notify)
+                # Reload after subscribing so a revocation published in between is not missed
+                async with session_factory() as session:
+                    await self.load(session)
+                await closed.wait()
+                logger.warning("Token version listener connection closed; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Token version listener failed: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(retry_interval)
+
+    def start(self, session_factory: Callable[[], AsyncSession], database_url: str, retry_interval: float = 5.0) -> asyncio.Task:
+        """Listen for revocations from other workers on a dedicated connection."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._listen(session_factory, database_url, retry_interval))
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Per-worker cache consulted by get_current_user
+token_versions = TokenVersionCache()
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_revocations(session):
+    for user_id, version in session.info.pop(PENDING_REVOCATIONS, ()):
+        token_versions.revoke(user_id, version)
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_revocations(session):
+    session.info.pop(PENDING_REVOCATIONS, None)
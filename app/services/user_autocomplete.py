@@ -0,0 +1,89 @@
+# app/services/user_autocomplete.py
+from builtins import dict, float, int, iter, len, next, range, str, tuple
+import time
+from typing import Dict, List, Tuple
+from uuid import UUID
+from sqlalchemy import func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+
+# (id, nickname, email)
+Suggestion = Tuple[UUID, str, str]
+
+def _like_prefix(prefix: str) -> str:
+    """A LIKE pattern matching strings that start with `prefix`, with its wildcards escaped."""
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+class UserAutocomplete:
+    """
+    Type-ahead suggestions of users whose nickname or email starts with a prefix.
+
+    Matching is case-insensitive on lower(nickname) and lower(email), each backed by a
+    text_pattern_ops btree index, so a lookup is two index range scans whatever the table size.
+    Only id, nickname and email are read, and at most `limit` suggestions are returned.
+
+    Results are cached per prefix for `ttl` seconds. A cached prefix that matched fewer than
+    `limit` users holds every match, so the longer prefixes typed after it are answered by
+    filtering that entry without a query. User writes in this worker drop the cache; writes
+    elsewhere show up once entries expire.
+    """
+
+    def __init__(self, ttl: float = 5.0, limit: int = 10, max_entries: int = 4096):
+        self.configure(ttl, limit)
+        self.max_entries = max_entries
+        self._cache: Dict[str, Tuple[float, List[Suggestion]]] = {}
+        self.hits_total = 0
+        self.misses_total = 0
+
+    def configure(self, ttl: float = 5.0, limit: int = 10) -> None:
+        self.ttl = ttl
+        self.limit = limit
+
+    def invalidate(self) -> None:
+        """Forget cached suggestions after users were created, deleted or renamed."""
+        self._cache.clear()
+
+    async def suggest(self, session: AsyncSession, prefix: str) -> List[Suggestion]:
+        """Up to `limit` (id, nickname, email) tuples of users matching `prefix`, ordered by nickname."""
+        prefix = prefix.lower()
+        now = time.monotonic()
+        cached = self._cached(prefix, now)
+        if cached is not None:
+            self.hits_total += 1
+            return cached
+        self.misses_total += 1
+        pattern = _like_prefix(prefix)
+        query = (
+            select(User.id, User.nickname, User.email)
+            .where(or_(
+                func.lower(User.nickname).like(pattern, escape="\\"),
+                func.lower(User.email).like(pattern, escape="\\"),
+            ))
+            .order_by(User.nickname)
+            .limit(self.limit)
+        )
+        suggestions = [tuple(row) for row in (await session.execute(query)).all()]
+        if len(self._cache) >= self.max_entries:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[prefix] = (now + self.ttl, suggestions)
+        return suggestions
+
+    def _cached(self, prefix: str, now: float):
+        entry = self._cache.get(prefix)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        # A shorter prefix with fewer than `limit` matches already holds every match of this one
+        for length in range(len(prefix) - 1, 0, -1):
+            entry = self._cache.get(prefix[:length])
+            if entry is not None and entry[0] > now and len(entry[1]) < self.limit:
+                return [
+                    suggestion for suggestion in entry[1]
+                    if suggestion[1].lower().startswith(prefix) or suggestion[2].lower().startswith(prefix)
+                ]
+        return None
+
+    def stats(self) -> dict:
+        return {"entries": len(self._cache), "hits_total": self.hits_total, "misses_total": self.misses_total}
+
+# Per-worker suggestions used by GET /users/autocomplete
+user_autocomplete = UserAutocomplete()
@@ -0,0 +1,120 @@
+# app/services/user_counts.py
+from builtins import ValueError, bool, dict, float, int, isinstance, iter, len, next, sorted, str, super, tuple
+import json
+import time
+from typing import Dict, Optional, Tuple
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.user_model import User
+
+EXACT = "exact"
+CACHED = "cached"
+ESTIMATE = "estimate"
+WINDOW = "window"
+STRATEGIES = (EXACT, CACHED, ESTIMATE, WINDOW)
+
+_TABLE_ESTIMATE = text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'users'::regclass")
+
+class Count(int):
+    """A total that also says whether it is exact or a planner estimate."""
+
+    def __new__(cls, value: int, exact: bool = True):
+        count = super().__new__(cls, value)
+        count.exact = exact
+        return count
+
+class UserCountProvider:
+    """
+    Totals for paginated user lists and searches.
+
+    Strategies:
+        exact     count(*) on every call.
+        cached    exact counts kept for `ttl` seconds per distinct query; user writes in this
+                  worker drop the cache, writes elsewhere show up once the entry expires.
+        estimate  the planner's row estimate (pg_class.reltuples for the whole table, EXPLAIN for
+                  filtered queries), falling back to an exact count when the estimate is below
+                  `exact_below`, where counting is cheap anyway.
+        window    exact, but offset pages of a search carry their total as count(*) OVER () in the
+                  page statement (see UserService._counted_page); count() itself counts exactly
+                  for the cases the window cannot cover.
+
+    With `concurrent` set, searches that count with a query run it on a second pooled connection
+    while the page query runs, both reading one exported snapshot (see UserService._counted_page).
+    """
+
+    def __init__(
+        self, strategy: str = EXACT, ttl: float = 30.0, exact_below: int = 100_000, max_entries: int = 1024,
+        concurrent: bool = False,
+    ):
+        self.configure(strategy, ttl, exact_below, concurrent)
+        self.max_entries = max_entries
+        self._cache: Dict[Tuple, Tuple[float, int]] = {}
+
+    def configure(self, strategy: str, ttl: float = 30.0, exact_below: int = 100_000, concurrent: bool = False) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown count strategy {strategy!r}; expected one of {', '.join(STRATEGIES)}")
+        self.strategy = strategy
+        self.ttl = ttl
+        self.exact_below = exact_below
+        self.concurrent = concurrent
+
+    @property
+    def windowed(self) -> bool:
+        """Whether offset pages should compute their total in the page statement."""
+        return self.strategy == WINDOW
+
+    def invalidate(self) -> None:
+        """Forget cached totals after users were created, deleted or changed."""
+        self._cache.clear()
+
+    async def count(self, session: AsyncSession, query=None) -> Count:
+        """Total rows of `query` (a select of User), or of the whole users table when None."""
+        if self.strategy == ESTIMATE:
+            estimate = await self._estimate(session, query)
+            if estimate is not None and estimate >= self.exact_below:
+                return Count(estimate, exact=False)
+        elif self.strategy == CACHED:
+            return Count(await self._cached(session, query))
+        return Count(await self._exact(session, query))
+
+    @staticmethod
+    async def _exact(session: AsyncSession, query) -> int:
+        statement = select(func.count()).select_from(User if query is None else query.subquery())
+        return (await session.execute(statement)).scalar()
+
+    async def _cached(self, session: AsyncSession, query) -> int:
+        key = self._key(session, query)
+        now = time.monotonic()
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+        total = await self._exact(session, query)
+        if key not in self._cache and len(self._cache) >= self.max_entries:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = (now + self.ttl, total)
+        return total
+
+    @staticmethod
+    def _key(session: AsyncSession, query) -> Optional[Tuple]:
+        if query is None:
+            return None
+        compiled = query.compile(dialect=session.get_bind().dialect)
+        return str(compiled), tuple(sorted(compiled.params.items()))
+
+    @staticmethod
+    async def _estimate(session: AsyncSession, query) -> Optional[int]:
+        """The planner's row estimate, or None when the table has never been analyzed."""
+        if query is None:
+            estimate = (await session.execute(_TABLE_ESTIMATE)).scalar()
+            # reltuples is -1 until the first VACUUM or ANALYZE
+            return estimate if estimate is not None and estimate >= 0 else None
+        # Inlined values rather than parameters, and sent as-is so ':' in a value is not read as a bind
+        sql = query.compile(dialect=session.get_bind().dialect, compile_kwargs={"literal_binds": True})
+        connection = await session.connection()
+        plan = (await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+# Per-worker provider used by the list and search endpoints
+user_counts = UserCountProvider()
@@ -0,0 +1,40 @@
+from builtins import classmethod, dict
+import logging
+from typing import Optional
+from uuid import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+# Columns of UserResponse, read straight from users and user_login_state. Kept in step with the
+# ORM path by tests/test_services/test_user_repository.py.
+_USER_RESPONSE_BY_ID = """
+SELECT u.id, u.nickname, u.email, u.first_name, u.last_name, u.bio,
+       u.profile_picture_url, u.github_profile_url, u.linkedin_profile_url,
+       u.role::text AS role, u.is_professional, u.created_at,
+       coalesce(s.is_locked, false) AS is_locked
+FROM users u
+LEFT JOIN user_login_state s ON s.user_id = u.id
+WHERE u.id = $1
+"""
+
+class UserRepository:
+    """
+    Read-only fast path that runs hand-written SQL on the session's connection.
+
+    Statements run through exec_driver_sql, which skips SQL compilation and the ORM (hydration,
+    the identity map and attribute copying) but still goes through SQLAlchemy's asyncpg adapter,
+    cursor and result rows; rows come back as plain dicts shaped like UserResponse. They run
+    inside the transaction the session holds, so they share the engine's pool, read-only mode and
+    replica routing.
+    """
+
+    @classmethod
+    async def get_user_response(cls, session: AsyncSession, user_id: UUID) -> Optional[dict]:
+        """The UserResponse fields of a user, without links, or None if the user does not exist."""
+        connection = await session.connection()
+        # Going through SQLAlchemy's connection starts the session's (READ ONLY on read sessions)
+        # transaction before the query instead of running it in autocommit
+        result = await connection.exec_driver_sql(_USER_RESPONSE_BY_ID, (user_id,))
+        record = result.mappings().first()
+        return dict(record) if record is not None else None
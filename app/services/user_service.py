@@ -1,18 +1,28 @@
-from builtins import Exception, bool, classmethod, int, str
+from builtins import BaseException, Exception, any, bool, classmethod, int, len, list, set, str, sum, zip
+import asyncio
 from datetime import datetime, timezone
 import secrets
 from typing import Optional, Dict, List
 from pydantic import ValidationError
-from sqlalchemy import func, null, update, select
+from sqlalchemy import bindparam, exists, func, literal, null, tuple_, update, select
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import commit_or_flush, snapshot_session
 from app.dependencies import get_email_service, get_settings
-from app.models.user_model import User
+from app.models.user_model import SEARCH_CONFIG, User, UserLoginState
 from app.schemas.user_schemas import UserCreate, UserUpdate
+from app.utils.admission import get_login_admission
 from app.utils.nickname_gen import generate_nickname
-from app.utils.security import generate_verification_token, hash_password, verify_password, validate_password
+from app.utils.pagination import KeysetPage, Page, decode_cursor, encode_cursor
+from app.utils.security import generate_verification_token, hash_password_async, needs_rehash, verify_password_async, validate_password
 from uuid import UUID
 from app.services.email_service import EmailService
+from app.services.login_buffer import last_login_buffer
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.token_versions import token_versions
+from app.services.user_autocomplete import user_autocomplete
+from app.services.user_counts import Count, user_counts
 from app.models.user_model import UserRole
 import logging
 from sqlalchemy import or_, and_
@@ -25,12 +35,57 @@ from app.models.user_model import User, UserRole
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+class AccountLockedError(Exception):
+    """Raised when a login targets an account locked after too many failed attempts."""
+
+    def __init__(self, user_id: UUID):
+        super().__init__(f"Account {user_id} is locked")
+        self.user_id = user_id
+
+# Fields embedded in access tokens; changing one revokes the user's outstanding tokens
+TOKEN_CLAIM_FIELDS = ("role", "email")
+
+# Hot single-row lookups, built once with bound parameters. Executing a prebuilt statement skips
+# statement construction and cache-key generation, and its SQL text never changes, so asyncpg
+# reuses the statement already prepared on each pooled connection.
+USER_LOOKUPS = {
+    "id": select(User).where(User.id == bindparam("value")),
+    "email": select(User).where(User.email == bindparam("value")),
+    "nickname": select(User).where(User.nickname == bindparam("value")),
+}
+LOGIN_LOOKUP = (
+    select(User)
+    .where(or_(User.email == bindparam("identifier"), User.nickname == bindparam("identifier")))
+    .limit(1)
+)
+
+# Ways search_and_filter_users matches username and email
+SUBSTRING_MATCH = "substring"
+FUZZY_MATCH = "fuzzy"
+
+def search_query(q: str):
+    """The tsquery for a web-style search string (quoted phrases, OR, -exclusions) against User.search_vector."""
+    return func.websearch_to_tsquery(SEARCH_CONFIG, q)
+
+def with_text_search(query, q: str):
+    """Restrict `query` to users whose names or bio match `q`, best ranked first."""
+    tsquery = search_query(q)
+    return query.where(User.search_vector.op("@@")(tsquery)).order_by(func.ts_rank(User.search_vector, tsquery).desc())
+
+# Stable ordering for paginated user lists, backed by the ix_users_created_at_id index
+PAGE_ORDER = (User.created_at, User.id)
+
+# Strong references to fire-and-forget tasks so they are not garbage collected mid-flight
+_background_tasks = set()
+
 class UserService:
     @classmethod
-    async def _execute_query(cls, session: AsyncSession, query):
+    async def _execute_query(cls, session: AsyncSession, query, params: Optional[Dict] = None):
         try:
-            result = await session.execute(query)
-            await session.commit()
+            result = await session.execute(query, params)
+            # Reads stay in the caller's transaction; only writes are committed (or flushed in a unit of work)
+            if query.is_dml:
+                await commit_or_flush(session)
             return result
         except SQLAlchemyError as e:
             logger.error(f"Database error: {e}")
@@ -38,22 +93,36 @@ class UserService:
             return None
 
     @classmethod
-    async def _fetch_user(cls, session: AsyncSession, **filters) -> Optional[User]:
-        query = select(User).filter_by(**filters)
-        result = await cls._execute_query(session, query)
+    def hot_statements(cls) -> List[Tuple]:
+        """
+        (statement, parameters) pairs run at pool warm-up so they are prepared before the first request.
+
+        Each is the statement used at runtime, with parameters that match no rows.
+        """
+        return [
+            (USER_LOOKUPS["id"], {"value": UUID(int=0)}),
+            (USER_LOOKUPS["email"], {"value": ""}),
+            (USER_LOOKUPS["nickname"], {"value": ""}),
+            (LOGIN_LOOKUP, {"identifier": ""}),
+            (select(func.count()).select_from(User), None),
+        ]
+
+    @classmethod
+    async def _fetch_user(cls, session: AsyncSession, column: str, value) -> Optional[User]:
+        result = await cls._execute_query(session, USER_LOOKUPS[column], {"value": value})
         return result.scalars().first() if result else None
 
     @classmethod
     async def get_by_id(cls, session: AsyncSession, user_id: UUID) -> Optional[User]:
-        return await cls._fetch_user(session, id=user_id)
+        return await cls._fetch_user(session, "id", user_id)
 
     @classmethod
     async def get_by_nickname(cls, session: AsyncSession, nickname: str) -> Optional[User]:
-        return await cls._fetch_user(session, nickname=nickname)
+        return await cls._fetch_user(session, "nickname", nickname)
 
     @classmethod
     async def get_by_email(cls, session: AsyncSession, email: str) -> Optional[User]:
-        return await cls._fetch_user(session, email=email)
+        return await cls._fetch_user(session, "email", email)
 
     @classmethod
     async def create(cls, session: AsyncSession, user_data: Dict[str, str], email_service: EmailService) -> Optional[User]:
@@ -73,7 +142,7 @@ class UserService:
             except ValueError as e:
                 logger.error(f"Password validation failed: {e}")
                 return None
-            validated_data['hashed_password'] = hash_password(password)
+            validated_data['hashed_password'] = await hash_password_async(password)
 
             # Prepare new user
             new_user = User(**validated_data)
@@ -92,8 +161,9 @@ class UserService:
                 new_user.nickname = new_nickname
 
             logger.info(f"User Role: {new_user.role}")
-            user_count = await cls.count(session)
-            new_user.role = UserRole.ADMIN if user_count == 0 else UserRole.ANONYMOUS
+            # Exact on purpose: a cached or estimated total could be a stale 0 and mint a second admin
+            has_users = (await session.execute(select(exists().select_from(User)))).scalar()
+            new_user.role = UserRole.ANONYMOUS if has_users else UserRole.ADMIN
 
             if new_user.role == UserRole.ADMIN:
                 new_user.email_verified = True
@@ -102,7 +172,9 @@ class UserService:
                 await email_service.send_verification_email(new_user)
 
             session.add(new_user)
-            await session.commit()
+            await commit_or_flush(session)
+            user_counts.invalidate()
+            user_autocomplete.invalidate()
             return new_user
         except ValidationError as e:
             logger.error(f"Validation error during user creation: {e}")
@@ -117,7 +189,7 @@ class UserService:
     
             # Handle password hashing if the password is being updated
             if 'password' in validated_data:
-                validated_data['hashed_password'] = hash_password(validated_data.pop('password'))
+                validated_data['hashed_password'] = await hash_password_async(validated_data.pop('password'))
     
             # Check for duplicate nickname
             if 'nickname' in validated_data:
@@ -126,14 +198,26 @@ class UserService:
                     logger.error(f"Nickname '{validated_data['nickname']}' is already taken.")
                     raise ValueError(f"Nickname '{validated_data['nickname']}' is already taken.")
     
+            revoke_tokens = any(field in validated_data for field in TOKEN_CLAIM_FIELDS)
+            if revoke_tokens:
+                validated_data['token_version'] = User.token_version + 1
+
             # Perform the update
             query = (
                 update(User)
                 .where(User.id == user_id)
                 .values(**validated_data)
+                .returning(User.token_version)
                 .execution_options(synchronize_session="fetch")
             )
-            await cls._execute_query(session, query)
+            result = await cls._execute_query(session, query)
+            user_counts.invalidate()
+            if "nickname" in validated_data or "email" in validated_data:
+                user_autocomplete.invalidate()
+            if result is not None and revoke_tokens:
+                token_version = result.scalar_one_or_none()
+                if token_version is not None:
+                    await cls._revoke_tokens(session, user_id, token_version)
     
             # Retrieve and refresh the updated user object
             updated_user = await cls.get_by_id(session, user_id)
@@ -163,15 +247,114 @@ class UserService:
             logger.info(f"User with ID {user_id} not found.")
             return False
         await session.delete(user)
-        await session.commit()
+        # Records the tombstone and commits (or flushes) it together with the delete
+        await token_versions.publish(session, user_id, None)
+        user_counts.invalidate()
+        user_autocomplete.invalidate()
         return True
 
     @classmethod
-    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10) -> List[User]:
-        query = select(User).offset(skip).limit(limit)
-        result = await cls._execute_query(session, query)
-        logger.debug(f"List of Users {result}")
-        return result.scalars().all() if result else []
+    async def _keyset_page(cls, session: AsyncSession, query, limit: int, cursor: str) -> KeysetPage:
+        """
+        The page of `query` after or before `cursor` in PAGE_ORDER.
+
+        The position is a row comparison on (created_at, id), so the index seeks straight to it
+        and a deep page costs the same as the first. One extra row is fetched to tell whether
+        another page follows in the direction of travel.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        position, backward = decode_cursor(cursor)
+        if position is not None:
+            key = tuple_(*PAGE_ORDER)
+            bound = tuple_(*[literal(value, column.type) for column, value in zip(PAGE_ORDER, position)])
+            query = query.where(key < bound if backward else key > bound)
+        order = [column.desc() for column in PAGE_ORDER] if backward else PAGE_ORDER
+        result = await session.execute(query.order_by(*order).limit(limit + 1))
+        users = list(result.scalars().all())
+        more = len(users) > limit
+        del users[limit:]
+        if backward:
+            users.reverse()
+        # Coming from a cursor position means rows exist on the side we came from
+        has_next = position is not None if backward else more
+        has_prev = more if backward else position is not None
+        return KeysetPage(
+            users,
+            next_cursor=encode_cursor((users[-1].created_at, users[-1].id)) if users and has_next else None,
+            prev_cursor=encode_cursor((users[0].created_at, users[0].id), backward=True) if users and has_prev else None,
+        )
+
+    @classmethod
+    async def _fetch_page(cls, session: AsyncSession, query, skip: int, limit: int, cursor: Optional[str]) -> Page:
+        """
+        A page of `query` in PAGE_ORDER: by offset, or as a KeysetPage when a cursor is given.
+
+        One extra row is fetched to set `has_more`, so callers that skip the count still know
+        whether a next page exists.
+        """
+        if cursor is not None:
+            return await cls._keyset_page(session, query, limit, cursor)
+        result = await session.execute(query.order_by(*PAGE_ORDER).offset(skip).limit(limit + 1))
+        users = result.scalars().all()
+        return Page(users[:limit], has_more=len(users) > limit)
+
+    @classmethod
+    async def _counted_page(
+        cls, session: AsyncSession, query, skip: int, limit: int, cursor: Optional[str], with_total: bool
+    ) -> Tuple[Optional[Count], Page]:
+        """
+        The total of `query` (None unless `with_total`) and a page of it.
+
+        With the window count strategy an offset page carries its total as count(*) OVER (), so
+        the filters are evaluated once, in one statement. The window only sees the rows the page
+        query sees, so keyset pages (filtered by position) and empty pages count separately.
+
+        With concurrent counts the count runs on a second pooled connection alongside the page
+        query, both in one exported snapshot. That needs `session` to still be free to begin its
+        transaction REPEATABLE READ; otherwise the queries run one after the other.
+        """
+        if with_total and cursor is None and user_counts.windowed:
+            total = func.count().over().label("total")
+            result = await session.execute(query.add_columns(total).order_by(*PAGE_ORDER).offset(skip).limit(limit + 1))
+            rows = result.all()
+            if not rows:
+                return await user_counts.count(session, query), Page()
+            users = [row[0] for row in rows]
+            return Count(rows[0].total), Page(users[:limit], has_more=len(users) > limit)
+        if with_total and user_counts.concurrent and not session.in_transaction():
+            async with snapshot_session(session) as count_session:
+                counting = asyncio.ensure_future(user_counts.count(count_session, query))
+                try:
+                    users = await cls._fetch_page(session, query, skip, limit, cursor)
+                    total = await counting
+                except BaseException:
+                    # Never close count_session under a count still running on it
+                    counting.cancel()
+                    await asyncio.gather(counting, return_exceptions=True)
+                    raise
+            return total, users
+        total = await user_counts.count(session, query) if with_total else None
+        return total, await cls._fetch_page(session, query, skip, limit, cursor)
+
+    @classmethod
+    async def list_users(cls, session: AsyncSession, skip: int = 0, limit: int = 10, cursor: Optional[str] = None) -> Page:
+        """
+        A page of users. With a cursor (an empty one starts at the first page) the result is a
+        KeysetPage and `skip` is ignored.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        try:
+            users = await cls._fetch_page(session, select(User), skip, limit, cursor)
+        except SQLAlchemyError as e:
+            logger.error(f"Database error: {e}")
+            await session.rollback()
+            return Page()
+        logger.debug(f"List of Users {users}")
+        return users
 
     @classmethod
     async def register_user(cls, session: AsyncSession, user_data: Dict[str, str], get_email_service) -> Optional[User]:
@@ -179,44 +362,165 @@ class UserService:
     
 
     @classmethod
-    async def login_user(cls, session: AsyncSession, nickname: str, password: str) -> Optional[User]:
-        user = await cls.get_by_nickname(session, nickname=nickname)
+    async def login_user(cls, session: AsyncSession, identifier: str, password: str) -> Optional[User]:
+        """
+        Authenticate a user by email or nickname.
+
+        The user is resolved with a single indexed lookup and the outcome is recorded with one
+        atomic UPDATE, so concurrent failed attempts are never lost.
+
+        Raises:
+            AccountLockedError: If the account is locked.
+        """
+        result = await session.execute(LOGIN_LOOKUP, {"identifier": identifier})
+        user = result.scalars().first()
         if user:
             logger.info(f"User with ID found")
-            if user.email_verified is False:
-                return None
             if user.is_locked:
+                raise AccountLockedError(user.id)
+            if user.email_verified is False:
                 return None
-            if verify_password(password, user.hashed_password):
-                user.failed_login_attempts = 0
-                user.last_login_at = datetime.now(timezone.utc)
-                session.add(user)
-                await session.commit()
+            async with get_login_admission().admit():
+                password_valid = await verify_password_async(password, user.hashed_password)
+            if password_valid:
+                await cls.record_successful_login(session, user)
+                if needs_rehash(user.hashed_password):
+                    cls._schedule_rehash(session, user.id, user.hashed_password, password)
                 return user
             else:
-                user.failed_login_attempts += 1
-                if user.failed_login_attempts >= settings.max_login_attempts:
-                    user.is_locked = True
-                session.add(user)
-                await session.commit()
+                await cls.record_failed_login(session, user)
         return None
 
     @classmethod
-    async def is_account_locked(cls, session: AsyncSession, email: str) -> bool:
-        user = await cls.get_by_email(session, email)
-        return user.is_locked if user else False
+    async def record_successful_login(cls, session: AsyncSession, user: User) -> None:
+        """
+        Reset the failure counter and stamp last_login_at.
+
+        The counter reset is skipped when it is already zero. With login write-behind enabled the
+        timestamp goes to the in-memory buffer, so most logins issue no write at all.
+        """
+        last_login_at = datetime.now(timezone.utc)
+        changes = {}
+        if user.failed_login_attempts:
+            changes["failed_login_attempts"] = 0
+        if settings.login_write_behind_enabled:
+            last_login_buffer.record(user.id, last_login_at)
+        else:
+            changes["last_login_at"] = last_login_at
+        if changes:
+            query = (
+                update(UserLoginState)
+                .where(UserLoginState.user_id == user.id)
+                .values(**changes)
+                .execution_options(synchronize_session=False)
+            )
+            await session.execute(query)
+            await commit_or_flush(session)
+        changes["last_login_at"] = last_login_at
+        for key, value in changes.items():
+            set_committed_value(user.login_state, key, value)
+
+    @classmethod
+    async def record_failed_login(cls, session: AsyncSession, user: User) -> bool:
+        """
+        Atomically increment the failure counter, locking the account once it reaches the limit.
+
+        Locking the account also bumps its token version so tokens issued before the lock stop working.
+
+        Returns:
+            bool: Whether the account is now locked.
+        """
+        was_locked = bool(user.is_locked)
+        attempts = UserLoginState.failed_login_attempts + 1
+        query = (
+            update(UserLoginState)
+            .where(UserLoginState.user_id == user.id)
+            .values(
+                failed_login_attempts=attempts,
+                is_locked=or_(UserLoginState.is_locked, attempts >= settings.max_login_attempts),
+            )
+            .returning(UserLoginState.failed_login_attempts, UserLoginState.is_locked)
+            .execution_options(synchronize_session=False)
+        )
+        failed_login_attempts, is_locked = (await session.execute(query)).one()
+        token_version = None
+        if is_locked and not was_locked:
+            token_version = await cls._bump_token_version(session, user.id)
+            if token_version is not None:
+                await cls._revoke_tokens(session, user.id, token_version)
+            user_counts.invalidate()
+        # Always commit: the attempt must count even though the request itself fails
+        await session.commit()
+        # Keep the in-session object in step with the row without marking it dirty
+        set_committed_value(user.login_state, "failed_login_attempts", failed_login_attempts)
+        set_committed_value(user.login_state, "is_locked", is_locked)
+        if token_version is not None:
+            set_committed_value(user, "token_version", token_version)
+        return is_locked
+
+    @classmethod
+    async def _bump_token_version(cls, session: AsyncSession, user_id: UUID) -> Optional[int]:
+        """Increment the user's token version in the current transaction and return the new value."""
+        query = (
+            update(User)
+            .where(User.id == user_id)
+            .values(token_version=User.token_version + 1)
+            .returning(User.token_version)
+            .execution_options(synchronize_session=False)
+        )
+        return (await session.execute(query)).scalar_one_or_none()
+
+    @classmethod
+    async def _revoke_tokens(cls, session: AsyncSession, user_id: UUID, token_version: int) -> None:
+        """
+        Revoke the user's sessions after their token version was bumped to `token_version`.
+
+        Access tokens are rejected by version; refresh token families are revoked too, so a
+        revoked session cannot mint access tokens carrying the new version.
+        """
+        await RefreshTokenService.revoke_user(session, user_id)
+        await token_versions.publish(session, user_id, token_version)
+
+    @classmethod
+    def _schedule_rehash(cls, session: AsyncSession, user_id: UUID, old_hash: str, password: str) -> asyncio.Task:
+        """Upgrade an outdated password hash in the background without delaying the login response."""
+        task = asyncio.create_task(cls._rehash_password(session.bind, user_id, old_hash, password))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+        return task
 
+    @classmethod
+    async def _rehash_password(cls, bind, user_id: UUID, old_hash: str, password: str) -> bool:
+        try:
+            new_hash = await hash_password_async(password)
+            async with AsyncSession(bind=bind) as session:
+                # Only replace the hash we verified against, so a concurrent password change wins
+                query = (
+                    update(User)
+                    .where(User.id == user_id, User.hashed_password == old_hash)
+                    .values(hashed_password=new_hash)
+                )
+                result = await session.execute(query)
+                await session.commit()
+                return result.rowcount == 1
+        except Exception as e:
+            logger.error(f"Failed to rehash password for user {user_id}: {e}")
+            return False
 
     @classmethod
     async def reset_password(cls, session: AsyncSession, user_id: UUID, new_password: str) -> bool:
-        hashed_password = hash_password(new_password)
+        hashed_password = await hash_password_async(new_password)
         user = await cls.get_by_id(session, user_id)
         if user:
             user.hashed_password = hashed_password
             user.failed_login_attempts = 0  # Resetting failed login attempts
             user.is_locked = False  # Unlocking the user account, if locked
             session.add(user)
-            await session.commit()
+            # Sessions opened before the reset, possibly with the old password, stop working
+            token_version = await cls._bump_token_version(session, user.id)
+            await cls._revoke_tokens(session, user.id, token_version)
+            set_committed_value(user, "token_version", token_version)
+            user_counts.invalidate()
             return True
         return False
 
@@ -228,7 +532,8 @@ class UserService:
             user.verification_token = None  # Clear the token once used
             user.role = UserRole.AUTHENTICATED
             session.add(user)
-            await session.commit()
+            await commit_or_flush(session)
+            user_counts.invalidate()
             return True
         return False
 
@@ -238,12 +543,10 @@ class UserService:
         Count the number of users in the database.
 
         :param session: The AsyncSession instance for database access.
-        :return: The count of users.
+        :return: The count of users, exact or estimated depending on the configured count strategy.
+            Only for list totals; never base a decision on it.
         """
-        query = select(func.count()).select_from(User)
-        result = await session.execute(query)
-        count = result.scalar()
-        return count
+        return await user_counts.count(session)
     
     @classmethod
     async def unlock_user_account(cls, session: AsyncSession, user_id: UUID) -> bool:
@@ -252,7 +555,8 @@ class UserService:
             user.is_locked = False
             user.failed_login_attempts = 0  # Optionally reset failed login attempts
             session.add(user)
-            await session.commit()
+            await commit_or_flush(session)
+            user_counts.invalidate()
             return True
         return False
 
@@ -266,6 +570,10 @@ class UserService:
         is_locked: Optional[bool] = None,
         skip: int = 0,
         limit: int = 10,
+        cursor: Optional[str] = None,
+        with_total: bool = True,
+        match: str = SUBSTRING_MATCH,
+        q: Optional[str] = None,
     ):
         """
         Perform basic user search and filtering.
@@ -278,37 +586,67 @@ class UserService:
             - is_locked: Filter by account lock status.
             - skip: Pagination offset.
             - limit: Pagination limit.
+            - cursor: Keyset pagination cursor; when given, `skip` is ignored and the users are a KeysetPage.
+            - with_total: Count the matching users; when False the total is None and no count query runs.
+            - match: How username and email match: "substring" (ILIKE '%value%') or "fuzzy" (pg_trgm
+              similarity above pg_trgm.similarity_threshold, most similar first). Both use the trigram
+              indexes.
+            - q: Full-text search over first name, last name and bio, best matches first.
+
+        Ranked results (fuzzy matches or `q`) cannot be paged with a cursor.
 
         Returns:
-            Tuple of total count and list of users matching criteria.
+            Tuple of total count (exact or estimated, see user_counts) and the Page of users matching criteria.
+
+        Raises:
+            ValueError: If a cursor is given for a ranked search.
         """
+        if cursor is not None and (match == FUZZY_MATCH or q):
+            raise ValueError("Ranked search results cannot be paged with a cursor")
         query = select(User)
-        if username:
-            query = query.where(User.nickname.ilike(f"%{username}%"))
-        if email:
-            query = query.where(User.email.ilike(f"%{email}%"))
+        if q:
+            query = with_text_search(query, q)
+        if match == FUZZY_MATCH:
+            terms = [(column, value) for column, value in ((User.nickname, username), (User.email, email)) if value]
+            for column, value in terms:
+                # The % operator, unlike a similarity() comparison, can use the GIN trigram index
+                query = query.where(column.op("%")(value))
+            if terms:
+                query = query.order_by(sum(func.similarity(column, value) for column, value in terms).desc())
+        else:
+            if username:
+                query = query.where(User.nickname.ilike(f"%{username}%"))
+            if email:
+                query = query.where(User.email.ilike(f"%{email}%"))
         if role:
             query = query.where(User.role == role)
         if is_locked is not None:
             query = query.where(User.is_locked == is_locked)
 
-        total_users = await session.execute(select(func.count()).select_from(query.subquery()))
-        result = await session.execute(query.offset(skip).limit(limit))
-
-        return total_users.scalar(), result.scalars().all()
+        return await cls._counted_page(session, query, skip, limit, cursor, with_total)
 
     @classmethod
-    async def advanced_search_users(cls, session: AsyncSession, filters: Dict):
+    async def advanced_search_users(cls, session: AsyncSession, filters: Dict, cursor: Optional[str] = None, with_total: bool = True):
         """
         Perform advanced search based on multiple criteria.
 
         Parameters:
             - session: Database session.
             - filters: Dictionary containing filter criteria.
+            - cursor: Keyset pagination cursor; when given, `skip` is ignored and the users are a KeysetPage.
+            - with_total: Count the matching users; when False the total is None and no count query runs.
+
+        A `q` filter searches names and bio by full text and ranks the results, which then cannot be
+        paged with a cursor.
 
         Returns:
-            Tuple of total count and list of users matching criteria.
+            Tuple of total count (exact or estimated, see user_counts) and the Page of users matching criteria.
+
+        Raises:
+            ValueError: If a cursor is given for a full-text search.
         """
+        if cursor is not None and filters.get("q"):
+            raise ValueError("Ranked search results cannot be paged with a cursor")
         query = select(User)
 
         # Apply filters dynamically
@@ -325,8 +663,21 @@ class UserService:
                 query = query.where(User.created_at >= value)
             elif field == "created_to":
                 query = query.where(User.created_at <= value)
+            elif field == "q":
+                query = with_text_search(query, value)
 
-        total_users = await session.execute(select(func.count()).select_from(query.subquery()))
-        result = await session.execute(query.offset(filters.get("skip", 0)).limit(filters.get("limit", 10)))
+        return await cls._counted_page(session, query, filters.get("skip", 0), filters.get("limit", 10), cursor, with_total)
 
-        return total_users.scalar(), result.scalars().all()
+    @classmethod
+    async def search_snippets(cls, session: AsyncSession, q: str, users: List[User]) -> Dict[str, str]:
+        """
+        Highlighted excerpts of the names and bio of `users` where they match `q`, keyed by user id.
+
+        ts_headline reparses the text, so it runs only for the rows of the page, never the whole match.
+        """
+        if not users:
+            return {}
+        document = func.concat_ws(" ", User.first_name, User.last_name, User.bio)
+        headline = func.ts_headline(SEARCH_CONFIG, document, search_query(q), "MaxFragments=2, MaxWords=20, MinWords=5")
+        result = await session.execute(select(User.id, headline).where(User.id.in_([user.id for user in users])))
+        return {str(user_id): snippet for user_id, snippet in result.all()}
@@ -0,0 +1,149 @@
+# app/utils/admission.py
+from builtins import BaseException, Exception, ValueError, bool, dict, float, int, isinstance, len, max, str
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from logging import getLogger
+from typing import Deque, Optional
+
+logger = getLogger(__name__)
+
+class AdmissionRejected(Exception):
+    """Raised when a login cannot be admitted because the verification queue is full or its deadline passed."""
+
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.retry_after = retry_after
+        self.reason = reason
+
+class LoginAdmissionController:
+    """
+    Bounds the number of CPU-bound password verifications running in one worker.
+
+    Up to `max_concurrent` verifications run at once and up to `max_queue` more wait in FIFO
+    order for at most `queue_timeout` seconds. Anything beyond that is rejected immediately so
+    the caller can answer with 429 instead of starving other endpoints.
+    """
+
+    def __init__(self, max_concurrent: int = 4, max_queue: int = 32, queue_timeout: float = 2.0):
+        if max_concurrent < 1 or max_queue < 0 or queue_timeout <= 0:
+            raise ValueError("Invalid login admission limits")
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted_total = 0
+        self.rejected_total = 0
+        self.timed_out_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+        self._service_seconds_total = 0.0
+        self._completed_total = 0
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """Estimates, in whole seconds, how long it takes to drain the current queue."""
+        if self._completed_total:
+            service_seconds = self._service_seconds_total / self._completed_total
+            estimate = (self.queue_depth + 1) * service_seconds / self.max_concurrent
+        else:
+            estimate = self.queue_timeout
+        return max(1, math.ceil(estimate))
+
+    def _release(self):
+        # Hand the slot directly to the oldest live waiter so the in-flight count never dips
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._in_flight -= 1
+
+    async def _acquire(self):
+        if self._in_flight < self.max_concurrent and not self._waiters:
+            self._in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self.rejected_total += 1
+            raise AdmissionRejected(self.retry_after(), "Login verification queue is full")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # A slot was handed over just as we gave up; pass it on
+                self._release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out_total += 1
+                raise AdmissionRejected(self.retry_after(), "Login verification queue deadline exceeded") from e
+            raise
+
+    @asynccontextmanager
+    async def admit(self):
+        """
+        Waits for a verification slot and holds it for the duration of the block.
+
+        Raises:
+            AdmissionRejected: If the queue is full or the slot was not granted before the deadline.
+        """
+        queued_at = time.perf_counter()
+        await self._acquire()
+        admitted_at = time.perf_counter()
+        wait_seconds = admitted_at - queued_at
+        self.admitted_total += 1
+        self._wait_seconds_total += wait_seconds
+        self._wait_seconds_max = max(self._wait_seconds_max, wait_seconds)
+        try:
+            yield
+        finally:
+            self._service_seconds_total += time.perf_counter() - admitted_at
+            self._completed_total += 1
+            self._release()
+
+    def stats(self) -> dict:
+        """Returns queue depth, throughput and wait-time metrics for sizing workers."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "queue_timeout_ms": self.queue_timeout * 1000,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "admitted_total": self.admitted_total,
+            "rejected_total": self.rejected_total,
+            "timed_out_total": self.timed_out_total,
+            "avg_wait_ms": self._wait_seconds_total / self.admitted_total * 1000 if self.admitted_total else 0.0,
+            "max_wait_ms": self._wait_seconds_max * 1000,
+            "avg_service_ms": self._service_seconds_total / self._completed_total * 1000 if self._completed_total else 0.0,
+        }
+
+# Per-worker controller; created lazily or by configure_login_admission()
+_login_admission: Optional[LoginAdmissionController] = None
+
+def configure_login_admission(max_concurrent: int = 4, max_queue: int = 32, queue_timeout: float = 2.0) -> LoginAdmissionController:
+    """Creates the per-worker login admission controller with the given limits."""
+    global _login_admission
+    _login_admission = LoginAdmissionController(max_concurrent, max_queue, queue_timeout)
+    return _login_admission
+
+def get_login_admission() -> LoginAdmissionController:
+    """Returns the login admission controller, creating one with default limits if none was configured."""
+    if _login_admission is None:
+        return configure_login_admission()
+    return _login_admission
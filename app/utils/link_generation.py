@@ -1,20 +1,30 @@
 from builtins import dict, int, max, str
-from typing import List, Callable
-from urllib.parse import urlencode
+from typing import List, Callable, Optional
+from urllib.parse import parse_qsl, urlencode
 from uuid import UUID
 
 from fastapi import Request
 from app.schemas.link_schema import Link
 from app.schemas.pagination_schema import PaginationLink
+from app.utils.pagination import FIRST_PAGE, LAST_PAGE
+
+# Query parameters set by pagination links; every other parameter of the request is carried over
+PAGING_PARAMS = ("skip", "limit", "cursor")
 
 # Utility function to create a link
 def create_link(rel: str, href: str, method: str = "GET", action: str = None) -> Link:
     return Link(rel=rel, href=href, method=method, action=action)
 
 def create_pagination_link(rel: str, base_url: str, params: dict) -> PaginationLink:
-    # Ensure parameters are added in a specific order
-    query_string = f"skip={params['skip']}&limit={params['limit']}"
-    return PaginationLink(rel=rel, href=f"{base_url}?{query_string}")
+    # Parameters keep the order given: skip or cursor first, then limit
+    separator = "&" if "?" in base_url else "?"
+    return PaginationLink(rel=rel, href=f"{base_url}{separator}{urlencode(params)}")
+
+def pagination_base_url(request: Request) -> str:
+    """The request URL with its paging parameters removed, keeping filters such as `username`."""
+    url, _, query = str(request.url).partition("?")
+    kept = [(key, value) for key, value in parse_qsl(query, keep_blank_values=True) if key not in PAGING_PARAMS]
+    return f"{url}?{urlencode(kept)}" if kept else url
 
 def create_user_links(user_id: UUID, request: Request) -> List[Link]:
     """
@@ -30,16 +40,47 @@ def create_user_links(user_id: UUID, request: Request) -> List[Link]:
         for rel, action, method, action_desc in actions
     ]
 
-def generate_pagination_links(request: Request, skip: int, limit: int, total_items: int) -> List[PaginationLink]:
-    base_url = str(request.url)
-    total_pages = (total_items + limit - 1) // limit
+def generate_cursor_links(
+    request: Request, cursor: str, limit: int, next_cursor: Optional[str] = None, prev_cursor: Optional[str] = None
+) -> List[PaginationLink]:
+    """Links for keyset pagination; `next`/`prev` only where the page has a neighbour."""
+    base_url = pagination_base_url(request)
+    links = [
+        create_pagination_link("self", base_url, {'cursor': cursor, 'limit': limit}),
+        create_pagination_link("first", base_url, {'cursor': FIRST_PAGE, 'limit': limit}),
+        create_pagination_link("last", base_url, {'cursor': LAST_PAGE, 'limit': limit}),
+    ]
+    if next_cursor is not None:
+        links.append(create_pagination_link("next", base_url, {'cursor': next_cursor, 'limit': limit}))
+    if prev_cursor is not None:
+        links.append(create_pagination_link("prev", base_url, {'cursor': prev_cursor, 'limit': limit}))
+    return links
+
+def generate_pagination_links(
+    request: Request, skip: int, limit: int, total_items: Optional[int], cursor: Optional[str] = None,
+    next_cursor: Optional[str] = None, prev_cursor: Optional[str] = None, has_more: Optional[bool] = None,
+) -> List[PaginationLink]:
+    """
+    Pagination links for a list response: offset (`skip`) links, or cursor links when the page was
+    requested with a `cursor`.
+
+    `next` follows `has_more` when it is known, which stays accurate when the total is an estimate.
+    Without a total (`total_items` None) there is no `last` link.
+    """
+    if cursor is not None:
+        return generate_cursor_links(request, cursor, limit, next_cursor, prev_cursor)
+    base_url = pagination_base_url(request)
     links = [
         create_pagination_link("self", base_url, {'skip': skip, 'limit': limit}),
         create_pagination_link("first", base_url, {'skip': 0, 'limit': limit}),
-        create_pagination_link("last", base_url, {'skip': max(0, (total_pages - 1) * limit), 'limit': limit})
     ]
+    if total_items is not None:
+        total_pages = (total_items + limit - 1) // limit
+        links.append(create_pagination_link("last", base_url, {'skip': max(0, (total_pages - 1) * limit), 'limit': limit}))
+        if has_more is None:
+            has_more = skip + limit < total_items
 
-    if skip + limit < total_items:
+    if has_more:
         links.append(create_pagination_link("next", base_url, {'skip': skip + limit, 'limit': limit}))
 
     if skip > 0:
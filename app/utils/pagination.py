@@ -0,0 +1,65 @@
+# app/utils/pagination.py
+"""
+Opaque cursors for keyset pagination over the (created_at, id) ordering of users.
+
+A cursor names a position in the ordering and a direction: a forward cursor selects the rows
+after the position, a backward cursor the rows before it. A cursor without a position selects the
+first page (forward) or the last page (backward). Clients treat cursors as opaque strings; an
+empty cursor starts cursor pagination at the first page.
+"""
+from builtins import ValueError, bool, len, list, str, super
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple, Optional, Tuple
+from uuid import UUID
+
+class Cursor(NamedTuple):
+    position: Optional[Tuple[datetime, UUID]]
+    backward: bool
+
+def encode_cursor(position: Optional[Tuple[datetime, UUID]], backward: bool = False) -> str:
+    key = [position[0].isoformat(), str(position[1])] if position is not None else None
+    data = json.dumps([key, "b" if backward else "f"], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str) -> Cursor:
+    """
+    Parse a cursor produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if not cursor:
+        return Cursor(None, False)
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        key, direction = json.loads(data)
+        if direction not in ("f", "b"):
+            raise ValueError(direction)
+        position = None
+        if key is not None:
+            created_at, user_id = key
+            position = (datetime.fromisoformat(created_at), UUID(user_id))
+        return Cursor(position, direction == "b")
+    except (binascii.Error, TypeError, ValueError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+
+FIRST_PAGE = encode_cursor(None)
+LAST_PAGE = encode_cursor(None, backward=True)
+
+class Page(list):
+    """A page of rows and whether more rows follow it."""
+
+    def __init__(self, rows=(), has_more: bool = False):
+        super().__init__(rows)
+        self.has_more = has_more
+
+class KeysetPage(Page):
+    """A page of rows with cursors for the neighbouring pages (None where there is none)."""
+
+    def __init__(self, rows=(), next_cursor: Optional[str] = None, prev_cursor: Optional[str] = None):
+        super().__init__(rows, has_more=next_cursor is not None)
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
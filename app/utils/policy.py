@@ -0,0 +1,156 @@
+# app/utils/policy.py
+"""
+Role/permission policy compiled into integer bitmasks.
+
+Every permission gets one bit and every role is compiled to the OR of the bits it grants, so an
+authorization check is a single AND. The policy comes from DEFAULT_ROLE_PERMISSIONS or from a
+JSON file of the form ``{"roles": {"MANAGER": ["users:read", ...], "ADMIN": ["*"]}}`` and can be
+recompiled at runtime with reload_policy(); checks pick up the new matrix on their next call.
+"""
+from builtins import KeyError, ValueError, bool, dict, frozenset, int, isinstance, len, list, object, open, set, sorted, str
+import itertools
+import json
+from logging import getLogger
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+logger = getLogger(__name__)
+
+USERS_READ = "users:read"
+USERS_CREATE = "users:create"
+USERS_UPDATE = "users:update"
+USERS_DELETE = "users:delete"
+USERS_SEARCH = "users:search"
+INTERNAL_METRICS = "internal:metrics"
+POLICY_RELOAD = "policy:reload"
+
+PERMISSIONS = (USERS_READ, USERS_CREATE, USERS_UPDATE, USERS_DELETE, USERS_SEARCH, INTERNAL_METRICS, POLICY_RELOAD)
+
+# Grants every permission, including ones added to the policy later
+ALL_PERMISSIONS = "*"
+
+DEFAULT_ROLE_PERMISSIONS: Dict[str, List[str]] = {
+    "ANONYMOUS": [],
+    "AUTHENTICATED": [],
+    "MANAGER": [USERS_READ, USERS_CREATE, USERS_UPDATE, USERS_DELETE],
+    "ADMIN": [ALL_PERMISSIONS],
+}
+
+_generations = itertools.count(1)
+
+class CompiledPolicy:
+    """An immutable role -> permission bitmask matrix."""
+
+    def __init__(self, role_permissions: Mapping[str, Iterable[str]]):
+        granted = {role: set(permissions) for role, permissions in role_permissions.items()}
+        names = set(PERMISSIONS)
+        for permissions in granted.values():
+            names |= permissions - {ALL_PERMISSIONS}
+        self.generation = next(_generations)
+        self.permission_bits: Dict[str, int] = {name: 1 << bit for bit, name in enumerate(sorted(names))}
+        everything = (1 << len(self.permission_bits)) - 1
+        self.role_masks: Dict[str, int] = {
+            role: everything if ALL_PERMISSIONS in permissions else self.mask(permissions)
+            for role, permissions in granted.items()
+        }
+
+    def mask(self, permissions: Iterable[str]) -> int:
+        """OR of the bits of `permissions`. Raises ValueError for an unknown permission."""
+        mask = 0
+        for name in permissions:
+            try:
+                mask |= self.permission_bits[name]
+            except KeyError:
+                raise ValueError(f"Unknown permission: {name}") from None
+        return mask
+
+    def role_mask(self, role: str) -> int:
+        return self.role_masks.get(role, 0)
+
+    def permissions_of(self, role: str) -> List[str]:
+        mask = self.role_mask(role)
+        return [name for name, bit in self.permission_bits.items() if mask & bit]
+
+    def summary(self) -> dict:
+        return {
+            "generation": self.generation,
+            "permissions": list(self.permission_bits),
+            "roles": {role: self.permissions_of(role) for role in self.role_masks},
+        }
+
+# Permissions required by declared checks; a reload must keep all of them
+_declared_permissions: set = set()
+_policy: Optional[CompiledPolicy] = None
+_policy_file: Optional[str] = None
+
+def load_role_permissions(path: str) -> Dict[str, List[str]]:
+    """Read and validate the `roles` mapping of a JSON policy file."""
+    with open(path) as policy_file:
+        document = json.load(policy_file)
+    roles = document.get("roles") if isinstance(document, dict) else None
+    if not isinstance(roles, dict) or not all(
+        isinstance(permissions, list) and all(isinstance(name, str) for name in permissions)
+        for permissions in roles.values()
+    ):
+        raise ValueError(f"Policy file {path} must map each role to a list of permission names")
+    return roles
+
+def compile_policy(role_permissions: Mapping[str, Iterable[str]]) -> CompiledPolicy:
+    """
+    Compile a role -> permissions mapping.
+
+    Raises:
+        ValueError: If a permission required by a declared check is unknown to the policy.
+    """
+    policy = CompiledPolicy(role_permissions)
+    missing = _declared_permissions - policy.permission_bits.keys()
+    if missing:
+        raise ValueError(f"Policy does not define permissions required by routes: {', '.join(sorted(missing))}")
+    return policy
+
+def declare_permissions(permissions: Iterable[str]) -> FrozenSet[str]:
+    """Register permissions a route depends on and return them as a frozenset."""
+    declared = frozenset(permissions)
+    _declared_permissions.update(declared)
+    return declared
+
+def configure_policy(path: Optional[str] = None) -> CompiledPolicy:
+    """Compile the policy from `path`, or from DEFAULT_ROLE_PERMISSIONS when no file is given."""
+    global _policy, _policy_file
+    role_permissions = load_role_permissions(path) if path else DEFAULT_ROLE_PERMISSIONS
+    _policy = compile_policy(role_permissions)
+    _policy_file = path
+    logger.info(f"Compiled authorization policy generation {_policy.generation} with {len(_policy.permission_bits)} permissions")
+    return _policy
+
+def reload_policy() -> CompiledPolicy:
+    """
+    Recompile the policy from the configured source and swap it in.
+
+    Raises:
+        ValueError, OSError: If the policy file is unreadable or invalid; the current policy stays active.
+    """
+    return configure_policy(_policy_file)
+
+def get_policy() -> CompiledPolicy:
+    """Returns the compiled policy, compiling the defaults if none was configured."""
+    if _policy is None:
+        return configure_policy()
+    return _policy
+
+class PermissionCheck(object):
+    """Precomputed requirement mask for a set of permissions, refreshed when the policy is reloaded."""
+
+    __slots__ = ("permissions", "_compiled")
+
+    def __init__(self, permissions: Iterable[str]):
+        self.permissions = declare_permissions(permissions)
+        # (policy generation, required mask), swapped as one reference so threadpool callers never see a torn pair
+        self._compiled = (0, 0)
+
+    def allows(self, role: str) -> bool:
+        policy = get_policy()
+        generation, required = self._compiled
+        if generation != policy.generation:
+            required = policy.mask(self.permissions)
+            self._compiled = (policy.generation, required)
+        return policy.role_mask(role) & required == required
@@ -1,41 +1,240 @@
 # app/security.py
-from builtins import Exception, ValueError, bool, int, str
+from builtins import Exception, ValueError, bool, float, int, min, range, str
+from abc import ABC, abstractmethod
+import asyncio
 import secrets
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Dict, Optional, Type
+import argon2
 import bcrypt
 from logging import getLogger
 
 # Set up logging
 logger = getLogger(__name__)
 
-def hash_password(password: str, rounds: int = 12) -> str:
+# Pool used to run bcrypt off the event loop; created lazily or by configure_password_executor()
+_password_executor: Optional[Executor] = None
+
+class PasswordHasher(ABC):
     """
-    Hashes a password using bcrypt with a specified cost factor.
-    
+    Base class for password hashing algorithms registered with register_hasher().
+
+    Subclasses expose a single integer work factor (`cost`) so the same calibration
+    logic can tune any algorithm to a target verify time.
+    """
+    name: str = ""
+    min_cost: int = 1
+    max_cost: int = 1
+
+    @property
+    @abstractmethod
+    def cost(self) -> int:
+        ...
+
+    @abstractmethod
+    def with_cost(self, cost: int) -> "PasswordHasher":
+        ...
+
+    @abstractmethod
+    def hash(self, password: str) -> str:
+        ...
+
+    @abstractmethod
+    def verify(self, password: str, hashed_password: str) -> bool:
+        ...
+
+    @abstractmethod
+    def identify(self, hashed_password: str) -> bool:
+        ...
+
+    @abstractmethod
+    def needs_rehash(self, hashed_password: str) -> bool:
+        ...
+
+    def time_verify(self, samples: int = 2) -> float:
+        """Returns the best observed verify time in milliseconds at the current cost."""
+        hashed = self.hash("calibration-password")
+        best = float("inf")
+        for _ in range(samples):
+            start = time.perf_counter()
+            self.verify("calibration-password", hashed)
+            best = min(best, (time.perf_counter() - start) * 1000)
+        return best
+
+    def calibrate(self, target_ms: float) -> "PasswordHasher":
+        """Returns a copy using the lowest cost whose verify time reaches `target_ms`."""
+        cost = self.min_cost
+        while cost < self.max_cost and self.with_cost(cost).time_verify() < target_ms:
+            cost += 1
+        return self.with_cost(cost)
+
+class BcryptHasher(PasswordHasher):
+    name = "bcrypt"
+    min_cost = 10
+    max_cost = 16
+
+    def __init__(self, rounds: int = 12):
+        self.rounds = rounds
+
+    @property
+    def cost(self) -> int:
+        return self.rounds
+
+    def with_cost(self, cost: int) -> "BcryptHasher":
+        return BcryptHasher(rounds=cost)
+
+    def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+    def identify(self, hashed_password: str) -> bool:
+        return hashed_password.startswith(("$2a$", "$2b$", "$2y$"))
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        # bcrypt hashes look like $2b$12$<salt+digest>; the second field is the cost
+        return int(hashed_password.split("$")[2]) != self.rounds
+
+class Argon2idHasher(PasswordHasher):
+    name = "argon2id"
+    min_cost = 2
+    max_cost = 10
+
+    def __init__(self, time_cost: int = 3, memory_cost: int = 65536, parallelism: int = 1):
+        self.time_cost = time_cost
+        self.memory_cost = memory_cost
+        self.parallelism = parallelism
+
+    @property
+    def cost(self) -> int:
+        return self.time_cost
+
+    def with_cost(self, cost: int) -> "Argon2idHasher":
+        return Argon2idHasher(time_cost=cost, memory_cost=self.memory_cost, parallelism=self.parallelism)
+
+    def _hasher(self) -> argon2.PasswordHasher:
+        return argon2.PasswordHasher(
+            time_cost=self.time_cost,
+            memory_cost=self.memory_cost,
+            parallelism=self.parallelism,
+            type=argon2.Type.ID,
+        )
+
+    def hash(self, password: str) -> str:
+        return self._hasher().hash(password)
+
+    def verify(self, password: str, hashed_password: str) -> bool:
+        try:
+            return self._hasher().verify(hashed_password, password)
+        except argon2.exceptions.VerifyMismatchError:
+            return False
+
+    def identify(self, hashed_password: str) -> bool:
+        return hashed_password.startswith("$argon2id$")
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self._hasher().check_needs_rehash(hashed_password)
+
+_hasher_registry: Dict[str, Type[PasswordHasher]] = {}
+
+def register_hasher(hasher_class: Type[PasswordHasher]) -> Type[PasswordHasher]:
+    """Registers a PasswordHasher subclass under its `name`."""
+    _hasher_registry[hasher_class.name] = hasher_class
+    return hasher_class
+
+register_hasher(BcryptHasher)
+register_hasher(Argon2idHasher)
+
+# Hasher used for new hashes; verification always picks the hasher matching the stored hash
+_current_hasher: PasswordHasher = BcryptHasher()
+
+def configure_password_hasher(algorithm: str = "bcrypt", target_ms: float = 0, **params) -> PasswordHasher:
+    """
+    Selects the algorithm used for new password hashes.
+
     Args:
-        password (str): The plain text password to hash.
-        rounds (int): The cost factor that determines the computational cost of hashing.
+        algorithm (str): Name of a registered hasher, e.g. "bcrypt" or "argon2id".
+        target_ms (float): If positive, calibrate the work factor so a verify takes at least this long.
+        **params: Keyword arguments passed to the hasher constructor.
 
     Returns:
-        str: The hashed password.
+        PasswordHasher: The configured (and possibly calibrated) hasher.
 
     Raises:
-        ValueError: If hashing the password fails.
+        ValueError: If the algorithm is not registered.
+    """
+    global _current_hasher
+    if algorithm not in _hasher_registry:
+        raise ValueError(f"Unknown password hashing algorithm: {algorithm}")
+    hasher = _hasher_registry[algorithm](**params)
+    if target_ms > 0:
+        hasher = hasher.calibrate(target_ms)
+        logger.info("Calibrated %s to cost %s for a %.0f ms verify target", hasher.name, hasher.cost, target_ms)
+    _current_hasher = hasher
+    return hasher
+
+def get_password_hasher() -> PasswordHasher:
+    """Returns the hasher used for new password hashes."""
+    return _current_hasher
+
+def identify_hasher(hashed_password: str) -> PasswordHasher:
     """
+    Returns a hasher able to verify the given hash.
+
+    Raises:
+        ValueError: If no registered hasher recognises the hash format.
+    """
+    if _current_hasher.identify(hashed_password):
+        return _current_hasher
+    for hasher_class in _hasher_registry.values():
+        hasher = hasher_class()
+        if hasher.identify(hashed_password):
+            return hasher
+    raise ValueError("Unrecognised password hash format")
+
+def needs_rehash(hashed_password: str) -> bool:
+    """Returns True if the hash uses a different algorithm or cost than the current hasher."""
+    try:
+        hasher = identify_hasher(hashed_password)
+    except ValueError:
+        return True
+    return hasher.name != _current_hasher.name or _current_hasher.needs_rehash(hashed_password)
+
+def _hash_with(hasher: PasswordHasher, password: str) -> str:
     try:
-        salt = bcrypt.gensalt(rounds=rounds)
-        hashed_password = bcrypt.hashpw(password.encode('utf-8'), salt)
-        return hashed_password.decode('utf-8')
+        return hasher.hash(password)
     except Exception as e:
         logger.error("Failed to hash password: %s", e)
         raise ValueError("Failed to hash password") from e
 
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """
+    Hashes a password with the configured hasher.
+
+    Args:
+        password (str): The plain text password to hash.
+        rounds (int): Optional bcrypt cost factor; when given, bcrypt is used with this cost.
+
+    Returns:
+        str: The hashed password.
+
+    Raises:
+        ValueError: If hashing the password fails.
+    """
+    hasher = BcryptHasher(rounds) if rounds is not None else _current_hasher
+    return _hash_with(hasher, password)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verifies a plain text password against a hashed password.
     
     Args:
         plain_password (str): The plain text password to verify.
-        hashed_password (str): The bcrypt hashed password.
+        hashed_password (str): The hashed password, in any registered format.
 
     Returns:
         bool: True if the password is correct, False otherwise.
@@ -44,11 +243,82 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         ValueError: If the hashed password format is incorrect or the function fails to verify.
     """
     try:
-        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+        return identify_hasher(hashed_password).verify(plain_password, hashed_password)
     except Exception as e:
         logger.error("Error verifying password: %s", e)
         raise ValueError("Authentication process encountered an unexpected error") from e
 
+def configure_password_executor(max_workers: int = 4, use_processes: bool = False) -> Executor:
+    """
+    Creates the bounded pool that runs bcrypt hashing and verification.
+
+    bcrypt releases the GIL while hashing, so a thread pool is usually enough; a process
+    pool isolates the work completely at the cost of pickling each call.
+
+    Args:
+        max_workers (int): Maximum number of concurrent hash operations.
+        use_processes (bool): Use a ProcessPoolExecutor instead of a ThreadPoolExecutor.
+
+    Returns:
+        Executor: The configured executor.
+    """
+    global _password_executor
+    shutdown_password_executor()
+    if use_processes:
+        _password_executor = ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        _password_executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+    return _password_executor
+
+def get_password_executor() -> Executor:
+    """Returns the password hashing pool, creating a default thread pool if none was configured."""
+    if _password_executor is None:
+        return configure_password_executor()
+    return _password_executor
+
+def shutdown_password_executor() -> None:
+    """Shuts down the password hashing pool, waiting for in-flight operations to finish."""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(wait=True)
+        _password_executor = None
+
+async def hash_password_async(password: str, rounds: Optional[int] = None) -> str:
+    """
+    Hashes a password in the password pool so the event loop is not blocked.
+
+    Args:
+        password (str): The plain text password to hash.
+        rounds (int): Optional bcrypt cost factor; when given, bcrypt is used with this cost.
+
+    Returns:
+        str: The hashed password.
+
+    Raises:
+        ValueError: If hashing the password fails.
+    """
+    # Resolve the hasher here so calibrated settings also reach process pool workers
+    hasher = BcryptHasher(rounds) if rounds is not None else _current_hasher
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_executor(), partial(_hash_with, hasher, password))
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    Verifies a password in the password pool so the event loop is not blocked.
+
+    Args:
+        plain_password (str): The plain text password to verify.
+        hashed_password (str): The hashed password, in any registered format.
+
+    Returns:
+        bool: True if the password is correct, False otherwise.
+
+    Raises:
+        ValueError: If the hashed password format is incorrect or the function fails to verify.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_executor(), partial(verify_password, plain_password, hashed_password))
+
 def generate_verification_token():
     return secrets.token_urlsafe(16)  # Generates a secure 16-byte URL-safe token
 
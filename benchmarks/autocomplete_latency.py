@@ -0,0 +1,114 @@
+"""
+Latency of GET /users/autocomplete, with and without the prefix cache.
+
+Seeds the users table up to --users rows, then replays type-ahead sessions through the ASGI app:
+each session types a random nickname one character at a time, sending a request per keystroke
+from the second character on. Reports p50, p99 and max latency per request, first with the cache
+disabled (every keystroke queries the lower() text_pattern_ops indexes), then with the configured
+cache TTL. The target is a p99 under 5 ms.
+
+It creates its own users in the configured database and deletes them afterwards.
+
+Usage:
+    python -m benchmarks.autocomplete_latency --users 1000000 --sessions 500
+"""
+from builtins import dict, int, len, print, range, sorted, str
+import argparse
+import asyncio
+import random
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from httpx import AsyncClient
+from sqlalchemy import delete, text
+
+from app.database import Database
+from app.main import app
+from app.models.user_model import User
+from app.services.jwt_service import create_access_token
+from app.services.user_autocomplete import user_autocomplete
+from settings.config import settings
+
+PREFIX = "acbench_"
+
+# Spread the nicknames out so typed prefixes narrow down the way real ones do
+SEED = f"""
+INSERT INTO users (id, nickname, email, hashed_password, role, email_verified, is_professional, token_version)
+SELECT gen_random_uuid(), '{PREFIX}' || md5(g::text), '{PREFIX}' || g || '@example.com', 'x',
+       'AUTHENTICATED'::"UserRole", false, false, 0
+FROM generate_series(1, :users) AS g
+"""
+
+
+async def seed(users: int):
+    async with Database.get_session_factory()() as session:
+        await session.execute(text(SEED), {"users": users})
+        await session.commit()
+        await session.execute(text("ANALYZE users"))
+        result = await session.execute(
+            text("SELECT nickname FROM users WHERE nickname LIKE :prefix ORDER BY random() LIMIT 1000"),
+            {"prefix": f"{PREFIX}%"},
+        )
+        return [row[0] for row in result]
+
+
+async def cleanup():
+    async with Database.get_session_factory()() as session:
+        await session.execute(delete(User).where(User.nickname.like(f"{PREFIX}%")))
+        await session.commit()
+
+
+async def replay(client, headers, nicknames, sessions: int):
+    """Milliseconds per request over `sessions` type-ahead sessions."""
+    latencies = []
+    for _ in range(sessions):
+        # Everyone shares the benchmark prefix, so typing starts after it
+        nickname = random.choice(nicknames)[len(PREFIX):]
+        for length in range(2, len(nickname) + 1):
+            started = time.perf_counter()
+            response = await client.get("/users/autocomplete", params={"prefix": PREFIX + nickname[:length]}, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+            response.raise_for_status()
+            if len(response.json()["items"]) == 1:
+                break
+    return sorted(latencies)
+
+
+def percentile(latencies, fraction: float) -> float:
+    return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))]
+
+
+async def run(args):
+    Database.initialize(settings.database_url)
+    await cleanup()
+    nicknames = await seed(args.users)
+    token = create_access_token(data={"sub": str(uuid4()), "role": "ADMIN"}, expires_delta=timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+    results = {}
+    try:
+        async with AsyncClient(app=app, base_url="http://benchmark") as client:
+            for name, ttl in (("no cache", 0.0), ("cache", settings.user_autocomplete_cache_ttl_seconds)):
+                user_autocomplete.configure(ttl, settings.user_autocomplete_limit)
+                user_autocomplete.invalidate()
+                await replay(client, headers, nicknames, min(args.sessions, 20))
+                results[name] = await replay(client, headers, nicknames, args.sessions)
+    finally:
+        user_autocomplete.invalidate()
+        await cleanup()
+        await Database.dispose()
+
+    print(f"{'mode':<10}{'requests':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, latencies in results.items():
+        print(f"{name:<10}{len(latencies):>10}{percentile(latencies, 0.5):>10.2f}{percentile(latencies, 0.99):>10.2f}{latencies[-1]:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000, help="Users created for the run")
+    parser.add_argument("--sessions", type=int, default=500, help="Timed type-ahead sessions per mode")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
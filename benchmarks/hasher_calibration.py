@@ -0,0 +1,46 @@
+"""
+Password hasher calibration benchmark.
+
+For each registered hasher and work factor, measures single-core verify time and reports how many
+verifies per second one core can sustain, plus the cost that startup calibration would pick for a
+given target verify time.
+
+Usage:
+    python -m benchmarks.hasher_calibration --target-ms 250 --argon2-memory-cost 65536
+"""
+from builtins import float, int, print, range
+import argparse
+
+from app.utils.security import Argon2idHasher, BcryptHasher
+
+
+def report(hasher_name: str, hashers, samples: int):
+    print(f"{hasher_name}")
+    for hasher in hashers:
+        verify_ms = hasher.time_verify(samples)
+        print(f"  cost={hasher.cost:>2}  verify={verify_ms:8.1f} ms  {1000 / verify_ms:8.1f} verifies/sec/core")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Verify time the calibration aims for")
+    parser.add_argument("--samples", type=int, default=3, help="Verifies timed per setting (best is reported)")
+    parser.add_argument("--bcrypt-max-rounds", type=int, default=14)
+    parser.add_argument("--argon2-max-time-cost", type=int, default=6)
+    parser.add_argument("--argon2-memory-cost", type=int, default=65536, help="argon2id memory cost in KiB")
+    parser.add_argument("--argon2-parallelism", type=int, default=1)
+    args = parser.parse_args()
+
+    bcrypt_hasher = BcryptHasher()
+    argon2_hasher = Argon2idHasher(memory_cost=args.argon2_memory_cost, parallelism=args.argon2_parallelism)
+
+    report("bcrypt", (bcrypt_hasher.with_cost(c) for c in range(BcryptHasher.min_cost, args.bcrypt_max_rounds + 1)), args.samples)
+    report("argon2id", (argon2_hasher.with_cost(c) for c in range(Argon2idHasher.min_cost, args.argon2_max_time_cost + 1)), args.samples)
+
+    for hasher in (bcrypt_hasher, argon2_hasher):
+        calibrated = hasher.calibrate(args.target_ms)
+        print(f"calibrated {calibrated.name} for {args.target_ms:.0f} ms target: cost={calibrated.cost}")
+
+
+if __name__ == "__main__":
+    main()
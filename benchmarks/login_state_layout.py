@@ -0,0 +1,119 @@
+"""
+Login-state table layout benchmark.
+
+Compares login bookkeeping writes against the old layout (login columns inside the wide users
+row) and the new layout (narrow user_login_state table with a reduced fillfactor). For each
+layout it reports login updates per second, WAL bytes written per login, the share of HOT
+updates and how much the table grew.
+
+The benchmark works on its own scratch tables and drops them afterwards.
+
+Usage:
+    python -m benchmarks.login_state_layout --users 20000 --logins 50000
+"""
+from builtins import float, int, len, max, print, range, str
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.models.user_model import LOGIN_STATE_FILLFACTOR
+from settings.config import settings
+
+WIDE_TABLE = """
+CREATE TABLE bench_users_wide (
+    id integer PRIMARY KEY,
+    nickname varchar(50) NOT NULL,
+    email varchar(255) NOT NULL,
+    bio varchar(500),
+    profile_picture_url varchar(255),
+    linkedin_profile_url varchar(255),
+    github_profile_url varchar(255),
+    hashed_password varchar(255) NOT NULL,
+    last_login_at timestamptz,
+    failed_login_attempts integer NOT NULL DEFAULT 0,
+    is_locked boolean NOT NULL DEFAULT false
+)
+"""
+
+NARROW_TABLE = f"""
+CREATE TABLE bench_login_state (
+    id integer PRIMARY KEY,
+    last_login_at timestamptz,
+    failed_login_attempts integer NOT NULL DEFAULT 0,
+    is_locked boolean NOT NULL DEFAULT false
+) WITH (fillfactor = {LOGIN_STATE_FILLFACTOR})
+"""
+
+WIDE_FILL = """
+INSERT INTO bench_users_wide (id, nickname, email, bio, profile_picture_url, linkedin_profile_url,
+                              github_profile_url, hashed_password)
+SELECT g, 'user_' || g, 'user_' || g || '@example.com', repeat('x', 400),
+       'https://example.com/p/' || g || '.jpg', 'https://linkedin.com/in/user' || g,
+       'https://github.com/user' || g, repeat('h', 60)
+FROM generate_series(1, :users) AS g
+"""
+
+NARROW_FILL = "INSERT INTO bench_login_state (id) SELECT g FROM generate_series(1, :users) AS g"
+
+LOGIN_UPDATE = "UPDATE {table} SET last_login_at = now(), failed_login_attempts = 0 WHERE id = :id"
+
+
+async def measure(engine, table: str, ids):
+    async with engine.connect() as conn:
+        size_before = (await conn.execute(text(f"SELECT pg_relation_size('{table}')"))).scalar()
+        lsn_before = (await conn.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar()
+        start = time.perf_counter()
+        for user_id in ids:
+            await conn.execute(text(LOGIN_UPDATE.format(table=table)), {"id": user_id})
+            await conn.commit()
+        elapsed = time.perf_counter() - start
+        wal_bytes = (await conn.execute(text(f"SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), '{lsn_before}')"))).scalar()
+        size_after = (await conn.execute(text(f"SELECT pg_relation_size('{table}')"))).scalar()
+        await conn.execute(text("SELECT pg_stat_force_next_flush()"))
+        await conn.commit()
+    await asyncio.sleep(0.5)
+    async with engine.connect() as conn:
+        updates, hot_updates = (await conn.execute(text(
+            f"SELECT n_tup_upd, n_tup_hot_upd FROM pg_stat_user_tables WHERE relname = '{table}'"
+        ))).one()
+    print(
+        f"{table:>18}: {len(ids) / elapsed:8.0f} logins/sec  "
+        f"{float(wal_bytes) / len(ids):7.0f} WAL bytes/login  "
+        f"{100 * hot_updates / max(updates, 1):5.1f}% HOT  "
+        f"table grew {(size_after - size_before) / 1024:8.0f} KiB"
+    )
+
+
+async def run(args):
+    engine = create_async_engine(settings.database_url)
+    try:
+        async with engine.begin() as conn:
+            for ddl, fill in ((WIDE_TABLE, WIDE_FILL), (NARROW_TABLE, NARROW_FILL)):
+                await conn.execute(text(ddl))
+                await conn.execute(text(fill), {"users": args.users})
+            await conn.execute(text("ANALYZE bench_users_wide"))
+            await conn.execute(text("ANALYZE bench_login_state"))
+
+        ids = [random.randint(1, args.users) for _ in range(args.logins)]
+        await measure(engine, "bench_users_wide", ids)
+        await measure(engine, "bench_login_state", ids)
+    finally:
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP TABLE IF EXISTS bench_users_wide"))
+            await conn.execute(text("DROP TABLE IF EXISTS bench_login_state"))
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20000, help="Rows in each scratch table")
+    parser.add_argument("--logins", type=int, default=50000, help="Login updates applied to each layout")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
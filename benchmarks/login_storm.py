@@ -0,0 +1,79 @@
+"""
+Login storm benchmark.
+
+Measures the latency of concurrent `GET /users/{user_id}` requests while a burst of `POST /login/`
+requests is hitting the same server. Run it once against a build that hashes passwords on the event
+loop and once against a build that uses the password pool, then compare the p50/p99 numbers.
+
+Usage:
+    python -m benchmarks.login_storm --base-url http://localhost:8000 \\
+        --admin-token <jwt> --user-id <uuid> --nickname <nickname> --password <password>
+"""
+from builtins import float, int, len, max, range, round, sorted, str
+import argparse
+import asyncio
+import time
+from typing import List
+
+import httpx
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    index = max(0, int(round(pct / 100 * len(ordered))) - 1)
+    return ordered[index]
+
+
+async def timed_get(client: httpx.AsyncClient, url: str, headers: dict, samples: List[float]):
+    start = time.perf_counter()
+    await client.get(url, headers=headers)
+    samples.append((time.perf_counter() - start) * 1000)
+
+
+async def reader(client: httpx.AsyncClient, url: str, headers: dict, samples: List[float], duration: float):
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        await timed_get(client, url, headers, samples)
+
+
+async def login_storm(client: httpx.AsyncClient, nickname: str, password: str, logins: int):
+    form = {"username": nickname, "password": password}
+    await asyncio.gather(*(client.post("/login/", data=form) for _ in range(logins)))
+
+
+async def run(args):
+    headers = {"Authorization": f"Bearer {args.admin_token}"}
+    url = f"/users/{args.user_id}"
+    limits = httpx.Limits(max_connections=args.readers + args.logins)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=60) as client:
+        baseline: List[float] = []
+        await asyncio.gather(*(reader(client, url, headers, baseline, args.duration) for _ in range(args.readers)))
+
+        storm: List[float] = []
+        await asyncio.gather(
+            login_storm(client, args.nickname, args.password, args.logins),
+            *(reader(client, url, headers, storm, args.duration) for _ in range(args.readers)),
+        )
+
+    for label, samples in (("idle", baseline), ("login storm", storm)):
+        print(
+            f"{label:>12}: {len(samples)} requests, "
+            f"p50={percentile(samples, 50):.1f} ms, p99={percentile(samples, 99):.1f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--admin-token", required=True, help="Access token for an ADMIN or MANAGER user")
+    parser.add_argument("--user-id", required=True, help="User to fetch with GET /users/{user_id}")
+    parser.add_argument("--nickname", required=True, help="Nickname used for the login storm")
+    parser.add_argument("--password", required=True, help="Password used for the login storm")
+    parser.add_argument("--readers", type=int, default=10, help="Concurrent GET /users/{user_id} clients")
+    parser.add_argument("--logins", type=int, default=50, help="Concurrent POST /login/ requests in the storm")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds to sample each phase")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
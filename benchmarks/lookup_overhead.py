@@ -0,0 +1,107 @@
+"""
+Python overhead per single-row user lookup: statement built per call vs. prebuilt statement.
+
+Times the client-side work between calling AsyncSession.execute() and the SQL reaching the
+driver (statement construction, cache-key generation, compiled-cache lookup and parameter
+processing) for the id, email and nickname lookups. The query itself is never sent: the
+cursor is stubbed so only SQLAlchemy's per-call cost is measured. Three variants are compared:
+
+    rebuilt   select(User).filter_by(...) per call, as UserService._fetch_user did before
+    lambda    lambda_stmt() with the value closed over as a bound parameter
+    prebuilt  UserService's USER_LOOKUPS, executed with a parameter dict
+
+and the per-lookup cost is converted into the share of one CPU core spent at the target rate.
+
+Usage:
+    python -m benchmarks.lookup_overhead --lookups 20000 --rate 10000
+"""
+from builtins import Exception, dict, float, int, len, list, min, print, range, str
+import argparse
+import asyncio
+import time
+from uuid import uuid4
+
+from sqlalchemy import event, lambda_stmt, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import Database
+from app.models.user_model import User
+from app.services.user_service import USER_LOOKUPS
+from settings.config import settings
+
+
+class ReachedDriver(Exception):
+    """Raised from before_cursor_execute so the timed call stops before any I/O."""
+
+
+def _stop(*args, **kwargs):
+    raise ReachedDriver()
+
+
+def rebuilt(column, value):
+    return select(User).filter_by(**{column: value}), None
+
+
+def lambda_lookup(column, value):
+    criterion = getattr(User, column)
+    return lambda_stmt(lambda: select(User).where(criterion == value), track_closure_variables=False), None
+
+
+def prebuilt(column, value):
+    return USER_LOOKUPS[column], {"value": value}
+
+
+VARIANTS = {"rebuilt": rebuilt, "lambda": lambda_lookup, "prebuilt": prebuilt}
+
+
+async def time_variant(session: AsyncSession, build, lookups: int) -> float:
+    """Seconds per lookup, best of three rounds."""
+    values = {"id": uuid4(), "email": "bench@example.com", "nickname": "bench_user"}
+    columns = list(values)
+    rounds = []
+    for _ in range(3):
+        started = time.perf_counter()
+        for i in range(lookups):
+            column = columns[i % len(columns)]
+            statement, params = build(column, values[column])
+            try:
+                await session.execute(statement, params)
+            except ReachedDriver:
+                pass
+        rounds.append((time.perf_counter() - started) / lookups)
+    return min(rounds)
+
+
+async def run(args):
+    Database.initialize(settings.database_url)
+    engine = Database._engine
+    try:
+        async with Database.get_session_factory()() as session:
+            # Check out the connection first so its cost is not part of the measurement
+            await session.connection()
+            event.listen(engine.sync_engine, "before_cursor_execute", _stop)
+            try:
+                results = {}
+                for name, build in VARIANTS.items():
+                    await time_variant(session, build, min(args.lookups, 1000))
+                    results[name] = await time_variant(session, build, args.lookups)
+            finally:
+                event.remove(engine.sync_engine, "before_cursor_execute", _stop)
+    finally:
+        await engine.dispose()
+
+    baseline = results["rebuilt"]
+    print(f"{'variant':<10}{'us/lookup':>12}{'speedup':>10}{f'CPU @ {args.rate}/s':>16}")
+    for name, seconds in results.items():
+        print(f"{name:<10}{seconds * 1e6:>12.1f}{baseline / seconds:>9.1f}x{seconds * args.rate:>15.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=20000, help="Timed lookups per variant and round")
+    parser.add_argument("--rate", type=int, default=10000, help="Lookup rate used to express the cost as CPU share")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+CPU per GET /users/{user_id}: ORM path vs. the hand-written SQL fast path (UserRepository).
+
+Measures process CPU time (time.process_time), so time spent waiting on Postgres is excluded and
+only the work done in the application process counts. Two levels are reported:
+
+    lookup    fetching one user and building the response object, on an open session
+    request   the full request through the ASGI app, including auth, routing and serialization
+
+It creates its own users in the configured database and deletes them afterwards.
+
+Usage:
+    python -m benchmarks.read_fast_path --users 100 --lookups 5000 --requests 2000
+"""
+from builtins import dict, int, len, print, range, str
+import argparse
+import asyncio
+import time
+from datetime import timedelta
+from uuid import uuid4
+
+from httpx import AsyncClient
+from sqlalchemy import delete
+
+from app.database import Database
+from app.main import app
+from app.models.user_model import User, UserRole
+from app.routers import user_routes
+from app.schemas.user_schemas import UserResponse
+from app.services.jwt_service import create_access_token
+from app.services.user_repository import UserRepository
+from app.services.user_service import UserService
+from settings.config import settings
+
+PREFIX = "fpbench_"
+
+
+async def seed(users: int):
+    async with Database.get_session_factory()() as session:
+        rows = [
+            User(nickname=f"{PREFIX}{i}", email=f"{PREFIX}{i}@example.com", hashed_password="x", role=UserRole.AUTHENTICATED)
+            for i in range(users)
+        ]
+        session.add_all(rows)
+        await session.commit()
+        return [row.id for row in rows]
+
+
+async def cleanup():
+    async with Database.get_session_factory()() as session:
+        await session.execute(delete(User).where(User.nickname.like(f"{PREFIX}%")))
+        await session.commit()
+
+
+async def orm_lookup(session, user_id):
+    user = await UserService.get_by_id(session, user_id)
+    return UserResponse.model_construct(
+        id=user.id, nickname=user.nickname, first_name=user.first_name, last_name=user.last_name, bio=user.bio,
+        profile_picture_url=user.profile_picture_url, github_profile_url=user.github_profile_url,
+        linkedin_profile_url=user.linkedin_profile_url, role=user.role, email=user.email,
+        last_login_at=user.last_login_at, created_at=user.created_at, updated_at=user.updated_at,
+    )
+
+
+async def fast_lookup(session, user_id):
+    return await UserRepository.get_user_response(session, user_id)
+
+
+async def cpu_per_lookup(lookup, user_ids, lookups: int) -> float:
+    """CPU seconds per lookup, each in a fresh read session as a request would use."""
+    factory, _ = Database.get_read_session_factory()
+    started = time.process_time()
+    for i in range(lookups):
+        async with factory() as session:
+            await lookup(session, user_ids[i % len(user_ids)])
+    return (time.process_time() - started) / lookups
+
+
+async def cpu_per_request(client, headers, user_ids, requests: int) -> float:
+    started = time.process_time()
+    for i in range(requests):
+        response = await client.get(f"/users/{user_ids[i % len(user_ids)]}", headers=headers)
+        response.raise_for_status()
+    return (time.process_time() - started) / requests
+
+
+async def run(args):
+    Database.initialize(settings.database_url)
+    await cleanup()
+    user_ids = await seed(args.users)
+    token = create_access_token(data={"sub": str(uuid4()), "role": "ADMIN"}, expires_delta=timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+    results = {}
+    try:
+        for name, lookup in (("orm", orm_lookup), ("fast", fast_lookup)):
+            await cpu_per_lookup(lookup, user_ids, min(args.lookups, 500))
+            results[("lookup", name)] = await cpu_per_lookup(lookup, user_ids, args.lookups)
+        async with AsyncClient(app=app, base_url="http://benchmark") as client:
+            for name, enabled in (("orm", False), ("fast", True)):
+                user_routes.settings.user_read_fast_path_enabled = enabled
+                await cpu_per_request(client, headers, user_ids, min(args.requests, 200))
+                results[("request", name)] = await cpu_per_request(client, headers, user_ids, args.requests)
+    finally:
+        user_routes.settings.user_read_fast_path_enabled = False
+        await cleanup()
+        await Database.dispose()
+
+    print(f"{'level':<10}{'orm us':>10}{'fast us':>10}{'ratio':>8}   (CPU per operation)")
+    for level in ("lookup", "request"):
+        orm, fast = results[(level, "orm")], results[(level, "fast")]
+        print(f"{level:<10}{orm * 1e6:>10.0f}{fast * 1e6:>10.0f}{orm / fast:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100, help="Users created for the run")
+    parser.add_argument("--lookups", type=int, default=5000, help="Timed lookups per variant")
+    parser.add_argument("--requests", type=int, default=2000, help="Timed requests per variant")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
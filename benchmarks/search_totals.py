@@ -0,0 +1,109 @@
+"""
+Search totals: count and page queries one after the other, concurrently, or as one statement.
+
+Seeds the users table up to --users rows and runs UserService.search_and_filter_users in three
+modes, reporting the mean wall time per search for a few filters:
+
+    sequential   the exact strategy: count query, then page query, on one connection
+    concurrent   both queries at once on two pooled connections sharing a snapshot
+    window       the window strategy: count(*) OVER () in the page statement
+
+The window strategy falls back to a separate count when the page is empty, so the last filter
+shows that cost as well.
+
+It creates its own users in the configured database and deletes them afterwards; seeding a
+million rows takes a while.
+
+Usage:
+    python -m benchmarks.search_totals --users 1000000 --searches 50
+"""
+from builtins import dict, print, range
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import delete, text
+
+from app.database import Database
+from app.models.user_model import User
+from app.services.user_counts import EXACT, WINDOW, user_counts
+from app.services.user_service import UserService
+from settings.config import settings
+
+PREFIX = "stbench_"
+
+SEED = f"""
+INSERT INTO users (id, nickname, email, first_name, hashed_password, role, email_verified, is_professional, token_version)
+SELECT gen_random_uuid(), '{PREFIX}' || g, '{PREFIX}' || g || '@example.com', 'first' || (g % 1000), 'x',
+       CASE WHEN g % 10 = 0 THEN 'MANAGER' ELSE 'AUTHENTICATED' END::"UserRole", false, false, 0
+FROM generate_series(1, :users) AS g
+"""
+
+MODES = {
+    "sequential": dict(strategy=EXACT),
+    "concurrent": dict(strategy=EXACT, concurrent=True),
+    "window": dict(strategy=WINDOW),
+}
+
+SEARCHES = {
+    "role=MANAGER, page 1": dict(role="MANAGER", skip=0, limit=10),
+    "role=MANAGER, page 500": dict(role="MANAGER", skip=5000, limit=10),
+    "username=stbench_12": dict(username=f"{PREFIX}12", skip=0, limit=10),
+    "past the last page": dict(role="MANAGER", skip=10_000_000, limit=10),
+}
+
+
+async def seed(users: int):
+    async with Database.get_session_factory()() as session:
+        await session.execute(text(SEED), {"users": users})
+        await session.commit()
+        await session.execute(text("ANALYZE users"))
+
+
+async def cleanup():
+    async with Database.get_session_factory()() as session:
+        await session.execute(delete(User).where(User.nickname.like(f"{PREFIX}%")))
+        await session.commit()
+
+
+async def seconds_per_search(filters: dict, searches: int) -> float:
+    """Wall seconds per search, each in a fresh read session as a request would use."""
+    factory, _ = Database.get_read_session_factory()
+    async with factory() as session:
+        await UserService.search_and_filter_users(session, **filters)
+    started = time.perf_counter()
+    for _ in range(searches):
+        async with factory() as session:
+            await UserService.search_and_filter_users(session, **filters)
+    return (time.perf_counter() - started) / searches
+
+
+async def run(args):
+    Database.initialize(settings.database_url)
+    await cleanup()
+    await seed(args.users)
+    results = {}
+    try:
+        for mode, options in MODES.items():
+            user_counts.configure(**options)
+            for name, filters in SEARCHES.items():
+                results[(name, mode)] = await seconds_per_search(filters, args.searches)
+    finally:
+        user_counts.configure(EXACT)
+        await cleanup()
+        await Database.dispose()
+
+    print(f"{'search':<26}" + "".join(f"{mode + ' ms':>16}" for mode in MODES))
+    for name in SEARCHES:
+        print(f"{name:<26}" + "".join(f"{results[(name, mode)] * 1e3:>16.1f}" for mode in MODES))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000, help="Users created for the run")
+    parser.add_argument("--searches", type=int, default=50, help="Timed searches per filter and mode")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
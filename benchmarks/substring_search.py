@@ -0,0 +1,133 @@
+"""
+Substring and fuzzy search latency with and without pg_trgm GIN indexes.
+
+For each table size it fills a scratch table shaped like the searched users columns, then times
+the search predicates /users-search uses:
+
+    substring   nickname ILIKE '%term%'              (match=substring)
+    fuzzy       nickname % 'term', by similarity     (match=fuzzy)
+
+first with only the btree indexes the users table had before (a leading wildcard cannot use
+them, so these are sequential scans), then after building the GIN trigram indexes.
+
+The benchmark works on its own scratch table and drops it afterwards. The 10M row size takes
+several minutes to fill and index.
+
+Usage:
+    python -m benchmarks.substring_search --sizes 100000 1000000 10000000 --searches 20
+"""
+from builtins import dict, int, len, list, print, range, str
+import argparse
+import asyncio
+import random
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from settings.config import settings
+
+TABLE = """
+CREATE TABLE bench_users_search (
+    id integer PRIMARY KEY,
+    nickname varchar(50) NOT NULL,
+    email varchar(255) NOT NULL
+)
+"""
+
+ADJECTIVES = ("clever", "brave", "quiet", "swift", "bold", "lucky")
+ANIMALS = ("fox", "owl", "lynx", "otter", "hawk", "panda", "wolf")
+
+# Nicknames shaped like generate_nickname() output: adjective_animal_number
+FILL = f"""
+INSERT INTO bench_users_search (id, nickname, email)
+SELECT g, n, n || '@example.com'
+FROM (
+    SELECT g, (ARRAY{list(ADJECTIVES)})[1 + g % {len(ADJECTIVES)}] || '_' ||
+              (ARRAY{list(ANIMALS)})[1 + g % {len(ANIMALS)}] || '_' || g AS n
+    FROM generate_series(1, :rows) AS g
+) AS names
+"""
+
+BTREE_INDEXES = [
+    "CREATE UNIQUE INDEX ON bench_users_search (nickname)",
+    "CREATE UNIQUE INDEX ON bench_users_search (email)",
+]
+
+TRIGRAM_INDEXES = [
+    "CREATE INDEX ON bench_users_search USING gin (nickname gin_trgm_ops)",
+    "CREATE INDEX ON bench_users_search USING gin (email gin_trgm_ops)",
+]
+
+SEARCHES = {
+    "substring": "SELECT id FROM bench_users_search WHERE nickname ILIKE :pattern ORDER BY id LIMIT 10",
+    "fuzzy": (
+        "SELECT id FROM bench_users_search WHERE nickname % :term "
+        "ORDER BY similarity(nickname, :term) DESC, id LIMIT 10"
+    ),
+}
+
+
+def search_terms(rows: int, count: int):
+    """Nicknames of random rows, as an admin would type them."""
+    ids = random.sample(range(1, rows + 1), count)
+    return [f"{ADJECTIVES[i % len(ADJECTIVES)]}_{ANIMALS[i % len(ANIMALS)]}_{i}" for i in ids]
+
+
+async def ms_per_search(conn, name: str, terms) -> float:
+    started = time.perf_counter()
+    for term in terms:
+        await conn.execute(text(SEARCHES[name]), {"pattern": f"%{term}%", "term": term})
+    return (time.perf_counter() - started) / len(terms) * 1000
+
+
+async def measure(engine, rows: int, searches: int) -> dict:
+    results = {}
+    terms = search_terms(rows, searches)
+    async with engine.connect() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(text("DROP TABLE IF EXISTS bench_users_search"))
+        await conn.execute(text(TABLE))
+        await conn.execute(text(FILL), {"rows": rows})
+        for statement in BTREE_INDEXES:
+            await conn.execute(text(statement))
+        await conn.execute(text("ANALYZE bench_users_search"))
+        await conn.commit()
+        for name in SEARCHES:
+            results[(name, "btree")] = await ms_per_search(conn, name, terms)
+        for statement in TRIGRAM_INDEXES:
+            await conn.execute(text(statement))
+        await conn.execute(text("ANALYZE bench_users_search"))
+        await conn.commit()
+        for name in SEARCHES:
+            results[(name, "trigram")] = await ms_per_search(conn, name, terms)
+        await conn.execute(text("DROP TABLE bench_users_search"))
+        await conn.commit()
+    return results
+
+
+async def run(args):
+    engine = create_async_engine(settings.database_url)
+    try:
+        print(f"{'rows':>10}  {'search':<10}{'btree ms':>12}{'trigram ms':>12}{'speedup':>10}")
+        for rows in args.sizes:
+            results = await measure(engine, rows, args.searches)
+            for name in SEARCHES:
+                before, after = results[(name, "btree")], results[(name, "trigram")]
+                print(f"{rows:>10}  {name:<10}{before:>12.2f}{after:>12.2f}{before / after:>9.1f}x")
+    finally:
+        async with engine.connect() as conn:
+            await conn.execute(text("DROP TABLE IF EXISTS bench_users_search"))
+            await conn.commit()
+        await engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000], help="Table sizes to measure")
+    parser.add_argument("--searches", type=int, default=20, help="Timed searches per size, predicate and index set")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
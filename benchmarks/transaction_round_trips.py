@@ -0,0 +1,157 @@
+"""
+Database round trips per endpoint: commit-after-every-statement vs. one transaction per request.
+
+Drives GET /users/{id}, GET /users/, GET /users-search, PUT /users/{id} and POST /users/ through
+the ASGI app and counts the round trips each request makes: statements plus BEGIN, COMMIT and ROLLBACK.
+The baseline reproduces the previous behaviour, where every service query committed and request
+sessions were plain sessions; the current mode uses READ ONLY transactions for reads and one
+unit of work per write request.
+
+It creates its own users in the configured database and deletes them afterwards.
+
+Usage:
+    python -m benchmarks.transaction_round_trips --users 50 --requests 200
+"""
+from builtins import classmethod, dict, int, len, print, range, str
+import argparse
+import asyncio
+from contextlib import contextmanager
+from datetime import timedelta
+from uuid import uuid4
+
+from httpx import AsyncClient
+from sqlalchemy import delete, event
+
+from app.database import Database
+from app.dependencies import get_db, get_email_service, get_read_db
+from app.main import app
+from app.models.user_model import User, UserRole
+from app.services.jwt_service import create_access_token
+from app.services.user_service import UserService
+from settings.config import settings
+
+PREFIX = "rtbench_"
+
+
+class RoundTripCounter:
+    def __init__(self):
+        self.count = 0
+
+    def _hit(self, *args, **kwargs):
+        self.count += 1
+
+    @contextmanager
+    def counting(self, engine):
+        events = ("before_cursor_execute", "begin", "commit", "rollback")
+        for name in events:
+            event.listen(engine, name, self._hit)
+        try:
+            yield self
+        finally:
+            for name in events:
+                event.remove(engine, name, self._hit)
+
+
+class NoEmailService:
+    async def send_verification_email(self, user):
+        pass
+
+
+async def legacy_get_db():
+    """The request session as it was: no unit of work, reads on the primary."""
+    async with Database.get_session_factory()() as session:
+        yield session
+
+
+@contextmanager
+def legacy_mode():
+    """Commit after every statement issued through UserService._execute_query, as before."""
+    original = UserService.__dict__["_execute_query"]
+
+    async def execute_and_commit(cls, session, query, params=None):
+        result = await session.execute(query, params)
+        await session.commit()
+        return result
+
+    UserService._execute_query = classmethod(execute_and_commit)
+    app.dependency_overrides[get_db] = legacy_get_db
+    app.dependency_overrides[get_read_db] = legacy_get_db
+    try:
+        yield
+    finally:
+        UserService._execute_query = original
+        del app.dependency_overrides[get_db]
+        del app.dependency_overrides[get_read_db]
+
+
+async def seed(users: int):
+    async with Database.get_session_factory()() as session:
+        rows = [
+            User(nickname=f"{PREFIX}{i}", email=f"{PREFIX}{i}@example.com", hashed_password="x", role=UserRole.AUTHENTICATED)
+            for i in range(users)
+        ]
+        session.add_all(rows)
+        await session.commit()
+        return [row.id for row in rows]
+
+
+async def cleanup():
+    async with Database.get_session_factory()() as session:
+        await session.execute(delete(User).where(User.nickname.like(f"{PREFIX}%")))
+        await session.commit()
+
+
+async def measure(client, headers, user_ids, requests: int) -> dict:
+    engine = Database._engine.sync_engine
+    endpoints = {
+        "GET /users/{id}": lambda i: client.get(f"/users/{user_ids[i % len(user_ids)]}", headers=headers),
+        "GET /users/": lambda i: client.get("/users/?skip=0&limit=10", headers=headers),
+        "GET /users-search": lambda i: client.get(f"/users-search?username={PREFIX}1", headers=headers),
+        "PUT /users/{id}": lambda i: client.put(f"/users/{user_ids[i % len(user_ids)]}", json={"bio": f"bio {uuid4()}"}, headers=headers),
+        "POST /users/": lambda i: client.post("/users/", json={
+            "nickname": f"{PREFIX}{uuid4().hex[:12]}", "email": f"{PREFIX}{uuid4().hex}@example.com",
+            "password": "Secure*1234", "role": "AUTHENTICATED",
+        }, headers=headers),
+    }
+    results = {}
+    for name, send in endpoints.items():
+        counter = RoundTripCounter()
+        with counter.counting(engine):
+            for i in range(requests):
+                response = await send(i)
+                response.raise_for_status()
+        results[name] = counter.count / requests
+    return results
+
+
+async def run(args):
+    Database.initialize(settings.database_url)
+    await cleanup()
+    user_ids = await seed(args.users)
+    token = create_access_token(data={"sub": str(uuid4()), "role": "ADMIN"}, expires_delta=timedelta(minutes=30))
+    headers = {"Authorization": f"Bearer {token}"}
+    app.dependency_overrides[get_email_service] = NoEmailService
+    try:
+        async with AsyncClient(app=app, base_url="http://benchmark") as client:
+            with legacy_mode():
+                before = await measure(client, headers, user_ids, args.requests)
+            after = await measure(client, headers, user_ids, args.requests)
+    finally:
+        app.dependency_overrides.clear()
+        await cleanup()
+        await Database.dispose()
+
+    print(f"{'endpoint':<20}{'before':>10}{'after':>10}{'saved':>10}   (round trips per request)")
+    for name in before:
+        print(f"{name:<20}{before[name]:>10.1f}{after[name]:>10.1f}{before[name] - after[name]:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50, help="Users created for the run")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint and mode")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
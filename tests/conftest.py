@@ -31,7 +31,7 @@ from faker import Faker
 from app.main import app
 from app.database import Base, Database
 from app.models.user_model import User, UserRole
-from app.dependencies import get_db, get_settings
+from app.dependencies import get_db, get_read_db, get_settings
 from app.utils.security import hash_password
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
@@ -59,6 +59,7 @@ def email_service():
 async def async_client(db_session):
     async with AsyncClient(app=app, base_url="http://testserver") as client:
         app.dependency_overrides[get_db] = lambda: db_session
+        app.dependency_overrides[get_read_db] = lambda: db_session
         try:
             yield client
         finally:
@@ -82,6 +83,13 @@ async def setup_database():
          await conn.run_sync(Base.metadata.drop_all)
     await engine.dispose()
 
+@pytest.fixture
+async def real_engine():
+    """For tests that go through the application's Database engine rather than db_session."""
+    yield Database
+    # Pooled asyncpg connections are bound to this test's event loop
+    await Database.dispose()
+
 @pytest.fixture(scope="function")
 async def db_session(setup_database):
     async with AsyncSessionScoped() as session:
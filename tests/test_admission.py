@@ -0,0 +1,77 @@
+# test_admission.py
+import asyncio
+import pytest
+from app.utils.admission import AdmissionRejected, LoginAdmissionController, configure_login_admission, get_login_admission
+
+pytestmark = pytest.mark.asyncio
+
+async def test_admit_within_limit():
+    controller = LoginAdmissionController(max_concurrent=2, max_queue=0, queue_timeout=1)
+    async with controller.admit():
+        assert controller.in_flight == 1
+    assert controller.in_flight == 0
+    assert controller.stats()["admitted_total"] == 1
+
+async def test_reject_when_queue_full():
+    controller = LoginAdmissionController(max_concurrent=1, max_queue=0, queue_timeout=1)
+    async with controller.admit():
+        with pytest.raises(AdmissionRejected) as exc_info:
+            async with controller.admit():
+                pass
+    assert exc_info.value.retry_after >= 1
+    assert controller.stats()["rejected_total"] == 1
+
+async def test_queued_login_runs_after_release():
+    controller = LoginAdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1)
+    order = []
+
+    async def login(name, hold):
+        async with controller.admit():
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    first = asyncio.create_task(login("first", 0.05))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(login("second", 0))
+    await asyncio.sleep(0)
+    assert controller.queue_depth == 1
+    await asyncio.gather(first, second)
+
+    stats = controller.stats()
+    assert order == ["first", "second"]
+    assert stats["in_flight"] == 0 and stats["queue_depth"] == 0
+    assert stats["max_wait_ms"] > 0
+
+async def test_queue_deadline_exceeded():
+    controller = LoginAdmissionController(max_concurrent=1, max_queue=1, queue_timeout=0.01)
+    async with controller.admit():
+        with pytest.raises(AdmissionRejected):
+            async with controller.admit():
+                pass
+        assert controller.queue_depth == 0
+    stats = controller.stats()
+    assert stats["timed_out_total"] == 1
+    assert stats["in_flight"] == 0
+
+async def test_cancelled_waiter_frees_its_place():
+    controller = LoginAdmissionController(max_concurrent=1, max_queue=1, queue_timeout=1)
+    async with controller.admit():
+        async def waiting_login():
+            async with controller.admit():
+                pass
+        waiter = asyncio.create_task(waiting_login())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.queue_depth == 0
+    assert controller.in_flight == 0
+
+def test_invalid_limits():
+    with pytest.raises(ValueError):
+        LoginAdmissionController(max_concurrent=0)
+
+def test_configure_login_admission():
+    controller = configure_login_admission(max_concurrent=3, max_queue=5, queue_timeout=0.5)
+    assert get_login_admission() is controller
+    assert controller.stats()["queue_timeout_ms"] == 500
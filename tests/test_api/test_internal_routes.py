@@ -0,0 +1,62 @@
+import pytest
+
+@pytest.mark.asyncio
+async def test_login_admission_stats(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/internal/login-admission", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["queue_depth"] == 0
+    assert "avg_wait_ms" in data
+
+@pytest.mark.asyncio
+async def test_login_admission_stats_requires_admin(async_client, manager_token):
+    headers = {"Authorization": f"Bearer {manager_token}"}
+    response = await async_client.get("/internal/login-admission", headers=headers)
+    assert response.status_code == 403
+
+@pytest.mark.asyncio
+async def test_token_cache_stats(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    await async_client.get("/internal/token-cache", headers=headers)
+    response = await async_client.get("/internal/token-cache", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["hits"] >= 1
+    assert 0 <= data["hit_rate"] <= 1
+
+@pytest.mark.asyncio
+async def test_token_version_stats(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/internal/token-versions", headers=headers)
+    assert response.status_code == 200
+    assert set(response.json()) == {"tracked_users", "deleted_users", "rejected_total"}
+
+@pytest.mark.asyncio
+async def test_autocomplete_stats(async_client, admin_token):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/internal/autocomplete", headers=headers)
+    assert response.status_code == 200
+    assert set(response.json()) == {"entries", "hits_total", "misses_total"}
+
+@pytest.mark.asyncio
+async def test_policy_reload(async_client, admin_token, manager_token):
+    response = await async_client.post("/internal/policy/reload", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403
+
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    before = (await async_client.get("/internal/policy", headers=headers)).json()
+    response = await async_client.post("/internal/policy/reload", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["generation"] > before["generation"]
+    assert response.json()["roles"] == before["roles"]
+
+@pytest.mark.asyncio
+async def test_pool_stats(async_client, admin_token):
+    response = await async_client.get("/internal/pool", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    data = response.json()
+    # conftest initializes Database with the default pool of 5 connections plus 10 overflow
+    assert data["pool_size"] == 5
+    assert data["max_overflow"] == 10
+    assert data["max_connections"] == 15
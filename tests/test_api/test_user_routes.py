@@ -8,7 +8,7 @@ from fastapi import HTTPException
 from datetime import timedelta
 from faker import Faker
 from app.models.user_model import User, UserRole
-from app.services.user_service import UserService
+from app.services.user_service import AccountLockedError, UserService
 from app.services.jwt_service import decode_token, create_access_token
 from app.dependencies import get_settings
 from app.schemas.user_schemas import UserResponse, UserListResponse
@@ -16,6 +16,7 @@ from app.schemas.pagination_schema import EnhancedPagination
 from fastapi.testclient import TestClient
 from app.dependencies import get_settings
 from app.routers.user_routes import login
+from app.utils.admission import AdmissionRejected
 from faker import Faker
 import os
 import logging
@@ -202,7 +203,7 @@ async def test_create_user_invalid_input(async_client, admin_token):
 async def test_login_account_locked(mocker):
     """Test login failure due to account being locked."""
     mock_session = AsyncMock()
-    mocker.patch("app.services.user_service.UserService.is_account_locked", return_value=True)
+    mocker.patch("app.services.user_service.UserService.login_user", side_effect=AccountLockedError(uuid4()))
 
     form_data = AsyncMock(username="locked_user", password="password")
 
@@ -218,14 +219,13 @@ async def test_login_success(async_client, mocker, db_session, verified_user):
     form_data = {"username": verified_user.nickname, "password": "CorrectPassword123!"}
     
     # Mock UserService methods
-    mocker.patch("app.services.user_service.UserService.is_account_locked", return_value=False)
     mocker.patch("app.services.user_service.UserService.login_user", return_value=verified_user)
 
     # Calculate expected token expiry
     settings = get_settings()  # Use get_settings to fetch settings
     expires_delta = timedelta(minutes=settings.access_token_expire_minutes)
     expected_token = create_access_token(
-        data={"sub": verified_user.email, "role": str(verified_user.role.name)},
+        data={"sub": verified_user.email, "role": str(verified_user.role.name), "uid": str(verified_user.id), "ver": verified_user.token_version},
         expires_delta=expires_delta
     )
 
@@ -244,7 +244,6 @@ async def test_login_success(async_client, mocker, db_session, verified_user):
 async def test_login_incorrect_credentials(mocker):
     """Test login failure due to incorrect credentials."""
     mock_session = AsyncMock()
-    mocker.patch("app.services.user_service.UserService.is_account_locked", return_value=False)
     mocker.patch("app.services.user_service.UserService.login_user", return_value=None)
 
     form_data = AsyncMock(username="wrong_user", password="wrong_password")
@@ -259,7 +258,7 @@ async def test_login_incorrect_credentials(mocker):
 async def test_login_unexpected_error(mocker):
     """Test login failure due to an unexpected error."""
     mock_session = AsyncMock()
-    mocker.patch("app.services.user_service.UserService.is_account_locked", side_effect=Exception("Unexpected error"))
+    mocker.patch("app.services.user_service.UserService.login_user", side_effect=Exception("Unexpected error"))
 
     form_data = AsyncMock(username="test@example.com", password="password")
 
@@ -270,6 +269,21 @@ async def test_login_unexpected_error(mocker):
     assert exc_info.value.detail == "An unexpected error occurred."
 
 
+@pytest.mark.asyncio
+async def test_login_rejected_by_admission_control(mocker):
+    """Test that a full verification queue returns 429 with Retry-After."""
+    mock_session = AsyncMock()
+    mocker.patch("app.services.user_service.UserService.login_user", side_effect=AdmissionRejected(3, "Login verification queue is full"))
+
+    form_data = AsyncMock(username="busy_user", password="password")
+
+    with pytest.raises(HTTPException) as exc_info:
+        await login(form_data, session=mock_session)
+
+    assert exc_info.value.status_code == 429
+    assert exc_info.value.headers["Retry-After"] == "3"
+
+
 @pytest.mark.asyncio
 async def test_list_users_with_results(async_client, admin_token, users_with_same_role_50_users):
     headers = {"Authorization": f"Bearer {admin_token}"}
@@ -521,3 +535,67 @@ async def test_create_user_success(async_client, admin_token):
         assert response_data["email"] == user_data["email"]
         assert response_data["nickname"] == user_data["nickname"]
         assert response_data["role"] == user_data["role"]
+
+@pytest.mark.asyncio
+async def test_list_users_cursor_pagination_links(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/?cursor=&limit=20", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["page"] is None
+    links = {link["rel"]: link["href"] for link in data["links"]}
+    assert set(links) == {"self", "first", "last", "next"}
+
+    seen = [item["id"] for item in data["items"]]
+    while "next" in links:
+        data = (await async_client.get(links["next"], headers=headers)).json()
+        links = {link["rel"]: link["href"] for link in data["links"]}
+        seen += [item["id"] for item in data["items"]]
+        assert "prev" in links
+    assert len(seen) == len(set(seen)) == data["total"]
+
+@pytest.mark.asyncio
+async def test_list_users_invalid_cursor(async_client, admin_token):
+    response = await async_client.get("/users/?cursor=garbage", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_list_users_reports_estimated_total(async_client, admin_token, db_session, monkeypatch):
+    from app.services.user_counts import user_counts
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    assert (await async_client.get("/users/", headers=headers)).json()["total_exact"] is True
+    await db_session.execute(text("ANALYZE users"))
+    monkeypatch.setattr(user_counts, "strategy", "estimate")
+    monkeypatch.setattr(user_counts, "exact_below", 0)
+    response = await async_client.get("/users/", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["total_exact"] is False
+
+@pytest.mark.asyncio
+async def test_list_users_without_count(async_client, admin_token, users_with_same_role_50_users, mocker):
+    count = mocker.spy(UserService, "count")
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users/?skip=40&limit=10&count=none", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] is None and data["total_exact"] is None
+    assert data["has_more"] is True
+    assert {link["rel"] for link in data["links"]} == {"self", "first", "next", "prev"}
+    count.assert_not_called()
+
+    data = (await async_client.get("/users/?skip=50&limit=10&count=none", headers=headers)).json()
+    assert data["has_more"] is False
+    assert {link["rel"] for link in data["links"]} == {"self", "first", "prev"}
+
+@pytest.mark.asyncio
+async def test_search_users_without_count(async_client, admin_token, users_with_same_role_50_users):
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    response = await async_client.get("/users-search?role=AUTHENTICATED&limit=30&count=none", headers=headers)
+    data = response.json()
+    assert response.status_code == 200
+    assert data["total"] is None and data["has_more"] is True and len(data["items"]) == 30
+    response = await async_client.post(
+        "/users-advanced-search?count=none", json={"role": "AUTHENTICATED", "skip": 30, "limit": 30}, headers=headers
+    )
+    data = response.json()
+    assert data["total"] is None and data["has_more"] is False and len(data["items"]) == 20
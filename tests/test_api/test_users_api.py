@@ -1,11 +1,13 @@
 from builtins import str
+from uuid import uuid4
 import pytest
 from httpx import AsyncClient
+from app.database import Database, request_db_usage
 from app.main import app
 from app.models.user_model import User, UserRole
 from app.utils.nickname_gen import generate_nickname
 from app.utils.security import hash_password
-from app.services.jwt_service import decode_token  # Import your FastAPI app
+from app.services.jwt_service import create_access_token, decode_token  # Import your FastAPI app
 
 # Example of a test function using the async_client fixture
 @pytest.mark.asyncio
@@ -105,6 +107,69 @@ async def test_login_success(async_client, verified_user):
     assert decoded_token is not None, "Failed to decode token"
     assert decoded_token["role"] == "AUTHENTICATED", "The user role should be AUTHENTICATED"
 
+@pytest.mark.asyncio
+async def test_refresh_token_rotation(async_client, verified_user):
+    form_data = {
+        "username": verified_user.nickname,
+        "password": "MySuperPassword$1234"
+    }
+    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    refresh_token = response.json()["refresh_token"]
+    assert refresh_token
+
+    response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200
+    data = response.json()
+    assert decode_token(data["access_token"])["sub"] == verified_user.email
+    assert data["refresh_token"] != refresh_token
+
+    # The old token is single use; replaying it also revokes the newly issued one
+    response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+    response = await async_client.post("/token/refresh", json={"refresh_token": data["refresh_token"]})
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_refresh_token_rejected_for_locked_user(async_client, verified_user, db_session):
+    form_data = {
+        "username": verified_user.nickname,
+        "password": "MySuperPassword$1234"
+    }
+    response = await async_client.post("/login/", data=urlencode(form_data), headers={"Content-Type": "application/x-www-form-urlencoded"})
+    refresh_token = response.json()["refresh_token"]
+
+    verified_user.is_locked = True
+    await db_session.commit()
+
+    response = await async_client.post("/token/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_role_change_revokes_issued_tokens(async_client, manager_user, admin_token):
+    manager_token = create_access_token(data={
+        "sub": manager_user.email, "role": manager_user.role.name, "uid": str(manager_user.id), "ver": manager_user.token_version
+    })
+    manager_headers = {"Authorization": f"Bearer {manager_token}"}
+    response = await async_client.get("/users/", headers=manager_headers)
+    assert response.status_code == 200
+
+    response = await async_client.put(f"/users/{manager_user.id}", json={"role": "AUTHENTICATED"}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+
+    response = await async_client.get("/users/", headers=manager_headers)
+    assert response.status_code == 401
+
+@pytest.mark.asyncio
+async def test_delete_revokes_issued_tokens(async_client, manager_user, admin_token):
+    manager_token = create_access_token(data={
+        "sub": manager_user.email, "role": manager_user.role.name, "uid": str(manager_user.id), "ver": manager_user.token_version
+    })
+    response = await async_client.delete(f"/users/{manager_user.id}", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 204
+
+    response = await async_client.get("/users/", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 401
+
 @pytest.mark.asyncio
 async def test_login_user_not_found(async_client):
     form_data = {
@@ -268,4 +333,41 @@ async def test_create_user_invalid_data(async_client, admin_token):
     headers = {"Authorization": f"Bearer {admin_token}"}
     invalid_user_data = {"email": "not-an-email", "password": "short"}
     response = await async_client.post("/users/", json=invalid_user_data, headers=headers)
-    assert response.status_code == 422  # Validation Error
\ No newline at end of file
+    assert response.status_code == 422  # Validation Error
+
+@pytest.mark.asyncio
+async def test_auth_is_resolved_before_a_session_is_opened(real_engine, async_client, user_token, admin_token, mocker):
+    # Run the real session dependencies so the usage counter sees what they actually did
+    app.dependency_overrides.clear()
+    write_factory = mocker.spy(Database, "get_session_factory")
+    read_factory = mocker.spy(Database, "get_read_session_factory")
+    usage_before = request_db_usage.stats()
+
+    response = await async_client.get("/users/", headers={"Authorization": "Bearer not-a-token"})
+    assert response.status_code == 401
+    response = await async_client.delete(f"/users/{uuid4()}", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 403
+    write_factory.assert_not_called()
+    read_factory.assert_not_called()
+
+    usage = request_db_usage.stats()
+    assert usage["requests_total"] == usage_before["requests_total"] + 2
+    assert usage["requests_without_db"] == usage_before["requests_without_db"] + 2
+
+    response = await async_client.get("/users/", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    usage = request_db_usage.stats()
+    assert usage["requests_total"] == usage_before["requests_total"] + 3
+    assert usage["requests_without_db"] == usage_before["requests_without_db"] + 2
+
+@pytest.mark.asyncio
+async def test_retrieve_user_fast_path_matches_orm_response(async_client, admin_user, admin_token, monkeypatch):
+    from app.routers import user_routes
+    headers = {"Authorization": f"Bearer {admin_token}"}
+    orm_response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    monkeypatch.setattr(user_routes.settings, "user_read_fast_path_enabled", True)
+    fast_response = await async_client.get(f"/users/{admin_user.id}", headers=headers)
+    assert fast_response.status_code == 200
+    assert fast_response.json() == orm_response.json()
+    missing = await async_client.get(f"/users/{uuid4()}", headers=headers)
+    assert missing.status_code == 404
@@ -0,0 +1,24 @@
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ed25519
+from app.services import jwt_service
+from app.services.jwt_service import KeyRing
+
+@pytest.mark.asyncio
+async def test_jwks_lists_public_keys(async_client, mocker):
+    key_ring = KeyRing("EdDSA")
+    key_ring.add_key("2026-10", private_key=ed25519.Ed25519PrivateKey.generate(), active=True)
+    mocker.patch.object(jwt_service, "_key_ring", key_ring)
+
+    response = await async_client.get("/.well-known/jwks.json")
+
+    assert response.status_code == 200
+    assert "max-age" in response.headers["cache-control"]
+    keys = response.json()["keys"]
+    assert [key["kid"] for key in keys] == ["2026-10"]
+    assert keys[0]["kty"] == "OKP" and "d" not in keys[0]
+
+@pytest.mark.asyncio
+async def test_jwks_empty_for_hmac(async_client):
+    response = await async_client.get("/.well-known/jwks.json")
+    assert response.status_code == 200
+    assert response.json() == {"keys": []}
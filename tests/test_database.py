@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database import Database, InstrumentedQueuePool
+from app.dependencies import get_db, get_read_db
+from app.services.user_service import UserService
+from settings.config import settings
+
+@pytest.fixture
+async def small_engine():
+    engine = create_async_engine(
+        settings.database_url, poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=0, pool_timeout=0.1
+    )
+    yield engine
+    await engine.dispose()
+
+async def test_pool_counts_checkouts_and_timeouts(small_engine):
+    pool = small_engine.sync_engine.pool
+    async with small_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+        assert pool.stats()["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            async with small_engine.connect():
+                pass
+    stats = pool.stats()
+    assert stats["checkouts_total"] == 1
+    assert stats["timeouts_total"] == 1
+    assert stats["checked_out"] == 0
+    assert stats["max_connections"] == 1
+    assert stats["max_wait_ms"] >= 0
+
+async def test_unbounded_overflow_has_no_connection_limit():
+    engine = create_async_engine(settings.database_url, poolclass=InstrumentedQueuePool, pool_size=2, max_overflow=-1)
+    try:
+        stats = engine.sync_engine.pool.stats()
+        assert stats["max_overflow"] == -1
+        assert stats["max_connections"] is None
+    finally:
+        await engine.dispose()
+
+async def test_warm_up_opens_and_primes_connections(real_engine):
+    opened = await Database.warm_up(2, UserService.hot_statements())
+    stats = Database.pool_stats()
+    assert opened == 2
+    assert stats["checked_in"] >= 2
+    assert stats["checked_out"] == 0
+
+async def test_unit_of_work_commits_once_when_handler_returns(real_engine, db_session, verified_user):
+    dependency = get_db()
+    session = await dependency.__anext__()
+    await UserService.update(session, verified_user.id, {"bio": "Written in one unit of work"})
+    assert session.in_transaction()
+
+    await db_session.refresh(verified_user)
+    assert verified_user.bio != "Written in one unit of work"
+
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+    await db_session.refresh(verified_user)
+    assert verified_user.bio == "Written in one unit of work"
+
+async def test_unit_of_work_rolls_back_on_error(real_engine, db_session, verified_user):
+    dependency = get_db()
+    session = await dependency.__anext__()
+    await UserService.update(session, verified_user.id, {"bio": "Never committed"})
+    with pytest.raises(HTTPException) as exc_info:
+        await dependency.athrow(HTTPException(status_code=404))
+    assert exc_info.value.status_code == 404
+
+    await db_session.refresh(verified_user)
+    assert verified_user.bio != "Never committed"
+
+async def test_read_session_keeps_one_read_only_transaction(real_engine, verified_user, mocker):
+    request = mocker.Mock(headers={}, cookies={})
+    dependency = get_read_db(request)
+    session = await dependency.__anext__()
+    assert await UserService.get_by_id(session, verified_user.id) is not None
+    assert await UserService.count(session) == 1
+    # No commit between reads: both ran in the same transaction
+    assert session.in_transaction()
+    with pytest.raises(exc.DBAPIError, match="read-only transaction"):
+        await session.execute(text("UPDATE users SET bio = 'x'"))
+    await dependency.aclose()
+
+async def test_session_checks_out_a_connection_only_on_first_use(real_engine, mocker):
+    request = mocker.Mock()
+    request.state = SimpleNamespace()
+    dependency = get_db(request)
+    session = await dependency.__anext__()
+    assert Database.pool_stats()["checked_out"] == 0
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+    assert not hasattr(request.state, "used_db")
+
+    dependency = get_db(request)
+    session = await dependency.__anext__()
+    await session.execute(text("SELECT 1"))
+    assert Database.pool_stats()["checked_out"] == 1
+    with pytest.raises(StopAsyncIteration):
+        await dependency.__anext__()
+    assert request.state.used_db is True
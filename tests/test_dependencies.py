@@ -6,7 +6,7 @@ from app.dependencies import (
     get_email_service,
     get_db,
     get_current_user,
-    require_role,
+    require_permission,
 )
 from app.utils.template_manager import TemplateManager
 from app.services.email_service import EmailService
@@ -39,24 +39,29 @@ async def test_get_current_user_invalid_token(mocker):
     assert exc_info.value.detail == "Could not validate credentials"
 
 
-@pytest.mark.asyncio
-async def test_require_role_valid(mocker):
-    mock_user = {"user_id": "user_id", "role": "ADMIN"}
-    mocker.patch("app.dependencies.get_current_user", return_value=mock_user)
+def test_require_permission_uses_policy():
+    checker = require_permission("users:read")
+    manager = {"user_id": "user_id", "role": "MANAGER"}
+    assert checker(current_user=manager) == manager
 
-    role_checker = require_role(["ADMIN", "MANAGER"])
-    result = role_checker(current_user=mock_user)  # Pass the mocked user explicitly
-    assert result == mock_user
+    with pytest.raises(HTTPException) as exc_info:
+        require_permission("users:read", "users:search")(current_user=manager)
+    assert exc_info.value.status_code == 403
 
+    # Roles the policy does not know hold no permissions
+    with pytest.raises(HTTPException) as exc_info:
+        checker(current_user={"user_id": "user_id", "role": "USER"})
+    assert exc_info.value.status_code == 403
+    assert exc_info.value.detail == "Operation not permitted"
 
-@pytest.mark.asyncio
-async def test_require_role_invalid(mocker):
-    mock_user = {"user_id": "user_id", "role": "USER"}
-    mocker.patch("app.dependencies.get_current_user", return_value=mock_user)
+def test_get_current_user_reuses_request_state(mocker):
+    request = mocker.Mock()
+    request.state.auth = None
+    decode = mocker.patch("app.dependencies.decode_token_cached", return_value={"sub": "user_id", "role": "ADMIN"})
 
-    role_checker = require_role(["ADMIN", "MANAGER"])
-    with pytest.raises(HTTPException) as exc_info:
-        role_checker(current_user=mock_user)  # Pass the mocked user explicitly
+    first = get_current_user("token", request)
+    second = get_current_user("token", request)
 
-    assert exc_info.value.status_code == 403
-    assert exc_info.value.detail == "Operation not permitted"
\ No newline at end of file
+    assert first == second == {"user_id": "user_id", "role": "ADMIN"}
+    assert request.state.auth == first
+    assert decode.call_count == 1
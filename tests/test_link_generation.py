@@ -49,3 +49,23 @@ def test_generate_pagination_links(mock_request):
     assert len(links) >= 4
     expected_self_url = "http://testserver/users?limit=5&skip=10"
     assert normalize_url(str(links[0].href)) == normalize_url(expected_self_url), "Self link should match expected URL"
+
+def test_pagination_links_keep_filters_and_replace_paging_params(mock_request):
+    mock_request.url = "http://testserver/users-search?username=john&skip=10&limit=5"
+    links = generate_pagination_links(mock_request, 10, 5, 50)
+    next_link = next(link for link in links if link.rel == "next")
+    assert parse_qs(urlparse(str(next_link.href)).query) == {"username": ["john"], "skip": ["15"], "limit": ["5"]}
+
+def test_generate_cursor_pagination_links(mock_request):
+    links = generate_pagination_links(mock_request, 0, 5, 50, cursor="abc", next_cursor="def")
+    by_rel = {link.rel: parse_qs(urlparse(str(link.href)).query) for link in links}
+    assert sorted(by_rel) == ["first", "last", "next", "self"]
+    assert by_rel["self"] == {"cursor": ["abc"], "limit": ["5"]}
+    assert by_rel["next"] == {"cursor": ["def"], "limit": ["5"]}
+    assert "skip" not in by_rel["first"]
+
+def test_generate_pagination_links_without_total(mock_request):
+    links = generate_pagination_links(mock_request, 0, 5, None, has_more=True)
+    assert [link.rel for link in links] == ["self", "first", "next"]
+    links = generate_pagination_links(mock_request, 5, 5, None, has_more=False)
+    assert [link.rel for link in links] == ["self", "first", "prev"]
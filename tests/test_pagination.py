@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.utils.pagination import FIRST_PAGE, LAST_PAGE, Cursor, KeysetPage, decode_cursor, encode_cursor
+
+def test_cursor_round_trip():
+    position = (datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc), uuid4())
+    assert decode_cursor(encode_cursor(position)) == Cursor(position, False)
+    assert decode_cursor(encode_cursor(position, backward=True)) == Cursor(position, True)
+
+def test_cursor_is_url_safe():
+    cursor = encode_cursor((datetime.now(timezone.utc), uuid4()), backward=True)
+    assert all(c.isalnum() or c in "-_" for c in cursor)
+
+def test_edge_cursors():
+    assert decode_cursor("") == Cursor(None, False)
+    assert decode_cursor(FIRST_PAGE) == Cursor(None, False)
+    assert decode_cursor(LAST_PAGE) == Cursor(None, True)
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor", "e30", encode_cursor(None)[:-3], "WzEsMl0"])
+def test_malformed_cursor(cursor):
+    with pytest.raises(ValueError, match="Invalid pagination cursor"):
+        decode_cursor(cursor)
+
+def test_keyset_page_is_a_list():
+    page = KeysetPage([1, 2], next_cursor="n")
+    assert page == [1, 2]
+    assert page.next_cursor == "n"
+    assert page.prev_cursor is None
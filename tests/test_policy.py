@@ -0,0 +1,65 @@
+import json
+import pytest
+from app.utils import policy
+from app.utils.policy import (
+    ALL_PERMISSIONS, USERS_DELETE, USERS_READ, USERS_SEARCH, CompiledPolicy, PermissionCheck,
+    configure_policy, get_policy, reload_policy,
+)
+
+@pytest.fixture
+def restore_policy():
+    yield
+    configure_policy()
+
+def test_default_policy_matches_route_roles():
+    compiled = get_policy()
+    assert set(compiled.permissions_of("MANAGER")) == {"users:read", "users:create", "users:update", "users:delete"}
+    assert compiled.role_mask("ADMIN") == (1 << len(compiled.permission_bits)) - 1
+    assert compiled.role_mask("AUTHENTICATED") == 0
+    assert compiled.role_mask("NO_SUCH_ROLE") == 0
+
+def test_each_permission_gets_one_bit():
+    compiled = CompiledPolicy({"ADMIN": [ALL_PERMISSIONS]})
+    bits = list(compiled.permission_bits.values())
+    assert len(set(bits)) == len(bits)
+    assert all(bit & (bit - 1) == 0 for bit in bits)
+
+def test_check_requires_every_permission():
+    check = PermissionCheck([USERS_READ, USERS_SEARCH])
+    assert check.allows("ADMIN")
+    assert not check.allows("MANAGER")
+    assert PermissionCheck([USERS_READ]).allows("MANAGER")
+
+def test_unknown_permission_rejected():
+    with pytest.raises(ValueError):
+        CompiledPolicy({"ADMIN": []}).mask(["users:teleport"])
+
+def test_reload_from_file(tmp_path, restore_policy):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps({"roles": {"ADMIN": ["*"], "MANAGER": [USERS_READ]}}))
+    check = PermissionCheck([USERS_DELETE])
+    configure_policy(str(path))
+    assert not check.allows("MANAGER")
+
+    path.write_text(json.dumps({"roles": {"ADMIN": ["*"], "MANAGER": [USERS_READ, USERS_DELETE, "reports:read"]}}))
+    reloaded = reload_policy()
+    assert "reports:read" in reloaded.permission_bits
+    # The check recompiles its mask against the new generation
+    assert check.allows("MANAGER")
+
+def test_invalid_reload_keeps_current_policy(tmp_path, restore_policy):
+    path = tmp_path / "policy.json"
+    path.write_text(json.dumps({"roles": {"ADMIN": ["*"]}}))
+    current = configure_policy(str(path))
+    path.write_text(json.dumps({"roles": {"ADMIN": "everything"}}))
+    with pytest.raises(ValueError):
+        reload_policy()
+    assert get_policy() is current
+
+def test_policy_must_cover_declared_permissions(restore_policy):
+    PermissionCheck(["reports:export"])
+    try:
+        with pytest.raises(ValueError):
+            configure_policy()
+    finally:
+        policy._declared_permissions.discard("reports:export")
@@ -0,0 +1,89 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+from app.database import Database, Replica, ReplicaSet, parse_lsn
+from app.dependencies import LAST_WRITE_LSN_COOKIE, LAST_WRITE_LSN_HEADER, get_db, last_write_lsn
+from app.main import app
+from settings.config import settings
+
+@pytest.fixture
+async def replicas():
+    # Without real streaming replicas, the primary stands in: it reports its own WAL position and no lag
+    members = [Replica(settings.database_url, create_async_engine(settings.database_url)) for _ in range(2)]
+    replica_set = ReplicaSet(members)
+    yield replica_set
+    await replica_set.close()
+
+def test_parse_lsn():
+    assert parse_lsn("0/0") == 0
+    assert parse_lsn("16/B374D848") == (0x16 << 32) + 0xB374D848
+    assert parse_lsn("1/0") > parse_lsn("0/FFFFFFFF")
+
+def test_unknown_selection_rejected():
+    with pytest.raises(ValueError):
+        ReplicaSet([], selection="random")
+
+async def test_round_robin_over_healthy_replicas(replicas):
+    assert await replicas.check() == 2
+    first, second = replicas.choose(), replicas.choose()
+    assert {first, second} == set(replicas.replicas)
+    assert replicas.choose() is first
+
+async def test_least_connections(replicas):
+    await replicas.check()
+    replicas.selection = "least_connections"
+    busy, idle = replicas.replicas
+    async with busy.engine.connect():
+        assert replicas.choose() is idle
+
+async def test_lagging_or_failed_replicas_fall_back_to_primary(replicas):
+    await replicas.check()
+    replicas.max_lag_seconds = -1
+    await replicas.check()
+    assert replicas.choose() is None
+    assert replicas.primary_fallbacks_total == 1
+
+async def test_read_your_writes_requires_caught_up_replica(replicas):
+    await replicas.check()
+    ahead = max(replica.replay_lsn for replica in replicas.replicas) + 1
+    assert replicas.choose(min_lsn=ahead) is None
+    assert replicas.choose(min_lsn=replicas.replicas[0].replay_lsn) is not None
+
+def test_last_write_lsn_from_header_or_cookie(mocker):
+    request = mocker.Mock()
+    request.headers = {LAST_WRITE_LSN_HEADER: "0/10"}
+    request.cookies = {LAST_WRITE_LSN_COOKIE: '"0/20"'}
+    assert last_write_lsn(request) == 0x10
+    request.headers = {}
+    assert last_write_lsn(request) == 0x20
+    request.cookies = {LAST_WRITE_LSN_COOKIE: "garbage"}
+    assert last_write_lsn(request) is None
+
+async def test_write_responses_carry_last_write_lsn(real_engine, async_client, admin_user, admin_token, mocker):
+    # The real get_db marks requests that committed a write
+    del app.dependency_overrides[get_db]
+    await Database.configure_replicas([settings.database_url])
+    try:
+        headers = {"Authorization": f"Bearer {admin_token}"}
+        response = await async_client.put(f"/users/{admin_user.id}", json={"bio": "Now on replicas"}, headers=headers)
+        assert response.status_code == 200
+        lsn = response.headers[LAST_WRITE_LSN_HEADER]
+        assert parse_lsn(lsn) > 0
+        assert response.cookies[LAST_WRITE_LSN_COOKIE].strip('"') == lsn
+
+        response = await async_client.get("/users/", headers=headers)
+        assert LAST_WRITE_LSN_HEADER not in response.headers
+
+        # A POST that only reads makes no extra round trip
+        current_wal_lsn = mocker.spy(Database, "current_wal_lsn")
+        response = await async_client.post("/users-advanced-search", json={}, headers=headers)
+        assert response.status_code == 200
+        assert LAST_WRITE_LSN_HEADER not in response.headers
+        current_wal_lsn.assert_not_called()
+
+        # The write is committed, so failing to read the position must not fail the response
+        mocker.patch.object(Database, "current_wal_lsn", side_effect=OSError("primary unreachable"))
+        response = await async_client.put(f"/users/{admin_user.id}", json={"bio": "Still saved"}, headers=headers)
+        assert response.status_code == 200
+        assert LAST_WRITE_LSN_HEADER not in response.headers
+    finally:
+        await Database.close_replicas()
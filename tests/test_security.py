@@ -1,7 +1,24 @@
 # test_security.py
-from builtins import RuntimeError, ValueError, isinstance, str
+from builtins import RuntimeError, TypeError, ValueError, isinstance, str
+import asyncio
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import pytest
-from app.utils.security import hash_password, verify_password
+from app.utils.security import (
+    Argon2idHasher,
+    BcryptHasher,
+    PasswordHasher,
+    configure_password_executor,
+    configure_password_hasher,
+    get_password_executor,
+    get_password_hasher,
+    hash_password,
+    hash_password_async,
+    identify_hasher,
+    needs_rehash,
+    shutdown_password_executor,
+    verify_password,
+    verify_password_async,
+)
 
 def test_hash_password():
     """Test that hashing password returns a bcrypt hashed string."""
@@ -65,3 +82,98 @@ def test_hash_password_internal_error(monkeypatch):
     with pytest.raises(ValueError):
         hash_password("test")
 
+
+@pytest.mark.asyncio
+async def test_hash_password_async():
+    """Test that hashing in the password pool returns a verifiable bcrypt hash."""
+    hashed = await hash_password_async("secure_password", rounds=4)
+    assert hashed.startswith('$2b$04$')
+    assert await verify_password_async("secure_password", hashed) is True
+    assert await verify_password_async("incorrect_password", hashed) is False
+
+@pytest.mark.asyncio
+async def test_verify_password_async_invalid_hash():
+    """Test that verification errors propagate from the password pool."""
+    with pytest.raises(ValueError):
+        await verify_password_async("secure_password", "invalid_hash_format")
+
+@pytest.mark.asyncio
+async def test_hash_password_async_does_not_block_event_loop():
+    """Test that other coroutines keep running while a hash is computed."""
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    task = asyncio.create_task(ticker())
+    await hash_password_async("secure_password", rounds=12)
+    task.cancel()
+    assert ticks > 1
+
+def test_configure_password_executor_process_pool():
+    """Test that a process pool can be configured and replaced."""
+    executor = configure_password_executor(max_workers=1, use_processes=True)
+    try:
+        assert isinstance(executor, ProcessPoolExecutor)
+        assert get_password_executor() is executor
+    finally:
+        shutdown_password_executor()
+    assert isinstance(get_password_executor(), ThreadPoolExecutor)
+
+@pytest.fixture
+def restore_password_hasher():
+    """Restore the default bcrypt hasher after a test reconfigures it."""
+    yield
+    configure_password_hasher("bcrypt")
+
+def test_argon2id_hash_and_verify(restore_password_hasher):
+    """Test hashing and verifying with argon2id as the configured algorithm."""
+    configure_password_hasher("argon2id", time_cost=2, memory_cost=1024)
+    hashed = hash_password("secure_password")
+    assert hashed.startswith("$argon2id$")
+    assert verify_password("secure_password", hashed) is True
+    assert verify_password("incorrect_password", hashed) is False
+
+def test_verify_password_across_algorithms(restore_password_hasher):
+    """Test that existing bcrypt hashes still verify after switching to argon2id."""
+    bcrypt_hash = hash_password("secure_password", rounds=4)
+    configure_password_hasher("argon2id", time_cost=2, memory_cost=1024)
+    assert verify_password("secure_password", bcrypt_hash) is True
+    assert isinstance(identify_hasher(bcrypt_hash), BcryptHasher)
+
+def test_needs_rehash(restore_password_hasher):
+    """Test that a hash needs rehashing when the algorithm or cost changes."""
+    configure_password_hasher("bcrypt", rounds=4)
+    hashed = hash_password("secure_password")
+    assert needs_rehash(hashed) is False
+    configure_password_hasher("bcrypt", rounds=5)
+    assert needs_rehash(hashed) is True
+    configure_password_hasher("argon2id", time_cost=2, memory_cost=1024)
+    assert needs_rehash(hashed) is True
+    assert needs_rehash(hash_password("secure_password")) is False
+
+def test_configure_unknown_hasher():
+    """Test that configuring an unregistered algorithm fails."""
+    with pytest.raises(ValueError):
+        configure_password_hasher("md5")
+
+def test_incomplete_hasher_fails_on_instantiation():
+    """Test that a hasher missing part of the interface cannot be created."""
+    class HashOnlyHasher(PasswordHasher):
+        name = "hash-only"
+
+        def hash(self, password: str) -> str:
+            return password
+
+    with pytest.raises(TypeError):
+        HashOnlyHasher()
+
+def test_calibrate_password_hasher(restore_password_hasher):
+    """Test that calibration picks the lowest cost meeting a trivial target."""
+    hasher = configure_password_hasher("bcrypt", target_ms=0.001)
+    assert hasher.cost == BcryptHasher.min_cost
+    assert get_password_hasher() is hasher
+    assert Argon2idHasher(memory_cost=1024).calibrate(0.001).cost == Argon2idHasher.min_cost
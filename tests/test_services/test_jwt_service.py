@@ -0,0 +1,139 @@
+from builtins import ValueError, len, range, str
+import time
+from datetime import timedelta
+import jwt
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec, ed25519
+from app.dependencies import get_settings
+from app.services import jwt_service
+from app.services.jwt_service import DecodedTokenCache, KeyRing, configure_key_ring, create_access_token, decode_token_cached
+
+def test_cache_hit_after_first_decode():
+    cache = DecodedTokenCache(max_size=10)
+    token = create_access_token(data={"sub": "user-id", "role": "admin"}, expires_delta=timedelta(minutes=5))
+    assert cache.get(token) is None
+    cache.put(token, jwt_service.decode_token(token))
+    assert cache.get(token)["role"] == "ADMIN"
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_cache_evicts_at_expiry(monkeypatch):
+    cache = DecodedTokenCache(max_size=10)
+    now = time.time()
+    cache.put("token", {"sub": "user-id", "role": "ADMIN", "exp": now + 60})
+    monkeypatch.setattr(jwt_service.time, "time", lambda: now + 61)
+    assert cache.get("token") is None
+    assert len(cache) == 0
+    assert cache.stats()["expired_evictions"] == 1
+
+def test_cache_skips_expired_and_expiryless_claims():
+    cache = DecodedTokenCache(max_size=10)
+    cache.put("expired", {"sub": "user-id", "exp": time.time() - 1})
+    cache.put("no-exp", {"sub": "user-id"})
+    assert len(cache) == 0
+
+def test_cache_is_bounded_lru():
+    cache = DecodedTokenCache(max_size=2)
+    exp = time.time() + 60
+    cache.put("a", {"sub": "a", "exp": exp})
+    cache.put("b", {"sub": "b", "exp": exp})
+    cache.get("a")
+    cache.put("c", {"sub": "c", "exp": exp})
+    assert cache.get("b") is None
+    assert cache.get("a")["sub"] == "a"
+    assert cache.stats()["capacity_evictions"] == 1
+
+def test_cache_rebuilds_expiration_heap():
+    cache = DecodedTokenCache(max_size=2)
+    exp = time.time() + 60
+    for i in range(10):
+        cache.put(str(i), {"sub": str(i), "exp": exp})
+    assert len(cache) == 2
+    assert len(cache._expirations) <= 4
+
+def test_decode_token_cached_decodes_once(mocker):
+    token = create_access_token(data={"sub": "user-id", "role": "ADMIN"}, expires_delta=timedelta(minutes=5))
+    mocker.patch.object(jwt_service, "token_cache", DecodedTokenCache(max_size=10))
+    decode = mocker.spy(jwt_service, "decode_token")
+    assert decode_token_cached(token)["sub"] == "user-id"
+    assert decode_token_cached(token)["sub"] == "user-id"
+    assert decode.call_count == 1
+
+def test_decode_token_cached_rejects_invalid_token():
+    assert decode_token_cached("not-a-token") is None
+
+@pytest.fixture
+def restore_key_ring():
+    """Rebuild the default key ring from settings after a test replaces it."""
+    yield
+    settings = get_settings()
+    configure_key_ring(settings.jwt_algorithm, settings.jwt_secret_key, settings.jwt_keys_dir, settings.jwt_active_kid)
+
+def write_private_key(path, private_key):
+    path.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ))
+
+@pytest.mark.parametrize("algorithm, private_key", [
+    ("EdDSA", ed25519.Ed25519PrivateKey.generate()),
+    ("ES256", ec.generate_private_key(ec.SECP256R1())),
+])
+def test_key_ring_signs_with_kid(algorithm, private_key):
+    key_ring = KeyRing(algorithm)
+    key_ring.add_key("2026-10", private_key=private_key, active=True)
+    token = key_ring.sign({"sub": "user-id"})
+    assert jwt.get_unverified_header(token)["kid"] == "2026-10"
+    assert key_ring.verify(token)["sub"] == "user-id"
+    jwk = key_ring.jwks()["keys"][0]
+    assert jwk["kid"] == "2026-10" and jwk["alg"] == algorithm and "d" not in jwk
+
+def test_key_ring_rotation_overlap():
+    key_ring = KeyRing("EdDSA")
+    key_ring.add_key("old", private_key=ed25519.Ed25519PrivateKey.generate(), active=True)
+    old_token = key_ring.sign({"sub": "user-id"})
+    key_ring.add_key("new", private_key=ed25519.Ed25519PrivateKey.generate(), active=True)
+    new_token = key_ring.sign({"sub": "user-id"})
+
+    assert jwt.get_unverified_header(new_token)["kid"] == "new"
+    assert key_ring.verify(old_token)["sub"] == "user-id"
+    assert {key["kid"] for key in key_ring.jwks()["keys"]} == {"old", "new"}
+
+def test_key_ring_rejects_unknown_kid():
+    signer = KeyRing("EdDSA")
+    signer.add_key("other", private_key=ed25519.Ed25519PrivateKey.generate(), active=True)
+    verifier = KeyRing("EdDSA")
+    verifier.add_key("ours", private_key=ed25519.Ed25519PrivateKey.generate(), active=True)
+    with pytest.raises(jwt.InvalidKeyError):
+        verifier.verify(signer.sign({"sub": "user-id"}))
+
+def test_key_ring_rejects_wrong_key_type():
+    with pytest.raises(ValueError):
+        KeyRing("EdDSA").add_key("ec", private_key=ec.generate_private_key(ec.SECP256R1()))
+
+def test_hmac_key_ring_publishes_no_keys():
+    key_ring = KeyRing("HS256")
+    key_ring.add_key("default", private_key="secret", active=True)
+    assert key_ring.verify(key_ring.sign({"sub": "user-id"}))["sub"] == "user-id"
+    assert key_ring.jwks() == {"keys": []}
+
+def test_configure_key_ring_from_directory(tmp_path, restore_key_ring):
+    retired = ed25519.Ed25519PrivateKey.generate()
+    (tmp_path / "2026-01.pem").write_bytes(retired.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    ))
+    write_private_key(tmp_path / "2026-04.pem", ed25519.Ed25519PrivateKey.generate())
+    write_private_key(tmp_path / "2026-07.pem", ed25519.Ed25519PrivateKey.generate())
+    jwt_service.token_cache.put("stale", {"sub": "user-id", "exp": time.time() + 60})
+
+    key_ring = configure_key_ring("EdDSA", keys_dir=str(tmp_path))
+
+    assert key_ring.active_kid == "2026-07"
+    assert len(jwt_service.token_cache) == 0
+    token = create_access_token(data={"sub": "user-id", "role": "admin"})
+    assert jwt.get_unverified_header(token)["kid"] == "2026-07"
+    assert jwt_service.decode_token(token)["role"] == "ADMIN"
+    retired_token = jwt.encode({"sub": "user-id"}, retired, algorithm="EdDSA", headers={"kid": "2026-01"})
+    assert jwt_service.decode_token(retired_token)["sub"] == "user-id"
+    assert len(key_ring.jwks()["keys"]) == 3
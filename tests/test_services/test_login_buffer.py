@@ -0,0 +1,80 @@
+from builtins import Exception, len
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.services import user_service
+from app.services.login_buffer import LastLoginBuffer, last_login_buffer
+from app.services.user_service import UserService
+from tests.conftest import AsyncTestingSessionLocal
+
+pytestmark = pytest.mark.asyncio
+
+async def test_record_keeps_latest_timestamp(user):
+    buffer = LastLoginBuffer()
+    now = datetime.now(timezone.utc)
+    buffer.record(user.id, now)
+    buffer.record(user.id, now - timedelta(minutes=5))
+    assert len(buffer) == 1
+    assert buffer._pending[user.id] == now
+
+async def test_flush_writes_all_pending_in_bulk(db_session, user, verified_user):
+    buffer = LastLoginBuffer(max_batch=1)
+    now = datetime.now(timezone.utc)
+    buffer.record(user.id, now)
+    buffer.record(verified_user.id, now - timedelta(minutes=1))
+
+    assert await buffer.flush(AsyncTestingSessionLocal) == 2
+    assert len(buffer) == 0
+
+    await db_session.refresh(user)
+    await db_session.refresh(verified_user)
+    assert user.last_login_at == now
+    assert verified_user.last_login_at == now - timedelta(minutes=1)
+
+async def test_flush_never_moves_timestamp_backwards(db_session, user):
+    now = datetime.now(timezone.utc)
+    user.last_login_at = now
+    await db_session.commit()
+
+    buffer = LastLoginBuffer()
+    buffer.record(user.id, now - timedelta(hours=1))
+    await buffer.flush(AsyncTestingSessionLocal)
+
+    await db_session.refresh(user)
+    assert user.last_login_at == now
+
+async def test_flush_failure_keeps_pending(user):
+    def broken_session_factory():
+        raise Exception("database unavailable")
+
+    buffer = LastLoginBuffer()
+    buffer.record(user.id, datetime.now(timezone.utc))
+    assert await buffer.flush(broken_session_factory) == 0
+    assert len(buffer) == 1
+
+async def test_stop_flushes_pending(db_session, user):
+    buffer = LastLoginBuffer()
+    buffer.start(AsyncTestingSessionLocal, interval=60)
+    buffer.record(user.id, datetime.now(timezone.utc))
+    assert await buffer.stop(AsyncTestingSessionLocal) == 1
+
+    await db_session.refresh(user)
+    assert user.last_login_at is not None
+
+async def test_login_with_write_behind_buffers_timestamp(db_session, verified_user, monkeypatch):
+    monkeypatch.setattr(user_service.settings, "login_write_behind_enabled", True)
+    executed = []
+    original_execute = db_session.execute
+
+    async def tracking_execute(statement, *args, **kwargs):
+        executed.append(statement.is_dml)
+        return await original_execute(statement, *args, **kwargs)
+
+    monkeypatch.setattr(db_session, "execute", tracking_execute)
+    try:
+        logged_in_user = await UserService.login_user(db_session, verified_user.nickname, "MySuperPassword$1234")
+        assert logged_in_user.last_login_at is not None
+        assert verified_user.id in last_login_buffer._pending
+        # Counter was already zero and the timestamp was buffered, so no UPDATE was issued
+        assert executed == [False]
+    finally:
+        last_login_buffer._pending.clear()
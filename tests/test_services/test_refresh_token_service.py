@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import select
+from app.models.refresh_token_model import RefreshToken
+from app.services.refresh_token_service import RefreshTokenService
+
+pytestmark = pytest.mark.asyncio
+
+async def test_issue_stores_only_digest(db_session, verified_user):
+    token = await RefreshTokenService.issue(db_session, verified_user.id)
+    stored = (await db_session.execute(select(RefreshToken))).scalars().one()
+    assert stored.token_hash != token
+    assert stored.token_hash == RefreshTokenService._digest(token)
+    assert stored.user_id == verified_user.id
+
+async def test_consume_once(db_session, verified_user):
+    token = await RefreshTokenService.issue(db_session, verified_user.id)
+    consumed = await RefreshTokenService.consume(db_session, token)
+    assert consumed is not None
+    assert consumed[0] == verified_user.id
+
+async def test_reuse_revokes_family(db_session, verified_user):
+    first = await RefreshTokenService.issue(db_session, verified_user.id)
+    user_id, family_id = await RefreshTokenService.consume(db_session, first)
+    second = await RefreshTokenService.issue(db_session, user_id, family_id)
+
+    # Replaying the consumed token is treated as theft: the whole family stops working
+    assert await RefreshTokenService.consume(db_session, first) is None
+    assert await RefreshTokenService.consume(db_session, second) is None
+    tokens = (await db_session.execute(select(RefreshToken).where(RefreshToken.family_id == family_id))).scalars().all()
+    assert all(token.revoked_at is not None for token in tokens)
+
+async def test_expired_token_rejected(db_session, verified_user):
+    token = await RefreshTokenService.issue(db_session, verified_user.id)
+    stored = (await db_session.execute(select(RefreshToken))).scalars().one()
+    stored.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    await db_session.commit()
+    assert await RefreshTokenService.consume(db_session, token) is None
+
+async def test_unknown_token_rejected(db_session):
+    assert await RefreshTokenService.consume(db_session, "not-a-refresh-token") is None
+
+async def test_revoke_user_revokes_every_family(db_session, verified_user):
+    tokens = [await RefreshTokenService.issue(db_session, verified_user.id) for _ in range(2)]
+    await RefreshTokenService.revoke_user(db_session, verified_user.id)
+    await db_session.commit()
+    for token in tokens:
+        assert await RefreshTokenService.consume(db_session, token) is None
@@ -0,0 +1,86 @@
+import asyncio
+import uuid
+import pytest
+from app.database import UNIT_OF_WORK
+from app.services.token_versions import TokenVersionCache, token_versions
+from app.services.user_service import UserService
+from settings.config import settings
+from tests.conftest import AsyncTestingSessionLocal
+
+def test_versions_only_move_forward():
+    cache = TokenVersionCache()
+    user_id = uuid.uuid4()
+    assert cache.is_current(user_id, 0)
+    cache.advance(user_id, 2)
+    cache.advance(user_id, 1)
+    assert not cache.is_current(user_id, 1)
+    assert cache.is_current(user_id, 2)
+    assert cache.rejected_total == 1
+
+def test_deleted_user_rejected_at_any_version():
+    cache = TokenVersionCache()
+    user_id = uuid.uuid4()
+    cache.advance(user_id, 3)
+    cache.mark_deleted(user_id)
+    assert not cache.is_current(user_id, 3)
+    assert cache.stats()["deleted_users"] == 1
+
+def test_apply_notification_payloads():
+    cache = TokenVersionCache()
+    user_id, deleted_id = uuid.uuid4(), uuid.uuid4()
+    cache.apply(TokenVersionCache.payload(user_id, 4))
+    cache.apply(TokenVersionCache.payload(deleted_id, None))
+    cache.apply("garbage")
+    assert not cache.is_current(user_id, 3)
+    assert not cache.is_current(deleted_id, 0)
+    assert len(cache) == 2
+
+async def test_lock_bumps_token_version(db_session, verified_user):
+    version = verified_user.token_version
+    for _ in range(settings.max_login_attempts):
+        await UserService.record_failed_login(db_session, verified_user)
+    assert verified_user.is_locked
+    assert verified_user.token_version == version + 1
+    assert not token_versions.is_current(verified_user.id, version)
+
+async def test_load_reads_bumped_versions(db_session, verified_user):
+    await UserService.update(db_session, verified_user.id, {"role": "MANAGER"})
+    cache = TokenVersionCache()
+    assert await cache.load(db_session) == 1
+    assert not cache.is_current(verified_user.id, 0)
+    assert cache.is_current(verified_user.id, 1)
+
+async def test_load_reads_deleted_users(db_session, verified_user):
+    assert await UserService.delete(db_session, verified_user.id)
+    cache = TokenVersionCache()
+    assert await cache.load(db_session) == 1
+    assert not cache.is_current(verified_user.id, 0)
+
+async def test_revocation_waits_for_the_unit_of_work_to_commit(verified_user):
+    async with AsyncTestingSessionLocal() as session:
+        session.info[UNIT_OF_WORK] = True
+        await UserService.update(session, verified_user.id, {"role": "MANAGER"})
+        # Flushed, not committed: a later failure can still roll the revocation back
+        assert session.in_transaction()
+        assert token_versions.is_current(verified_user.id, 0)
+        await session.rollback()
+        assert token_versions.is_current(verified_user.id, 0)
+
+        await UserService.update(session, verified_user.id, {"role": "MANAGER"})
+        await session.commit()
+        assert not token_versions.is_current(verified_user.id, 0)
+
+async def test_listener_applies_notifications_from_other_workers(db_session):
+    cache = TokenVersionCache()
+    cache.start(AsyncTestingSessionLocal, settings.database_url, retry_interval=0.1)
+    try:
+        user_id = uuid.uuid4()
+        # Keep publishing until the listener has subscribed
+        for _ in range(50):
+            await TokenVersionCache().publish(db_session, user_id, 1)
+            await asyncio.sleep(0.05)
+            if not cache.is_current(user_id, 0):
+                break
+        assert not cache.is_current(user_id, 0)
+    finally:
+        await cache.stop()
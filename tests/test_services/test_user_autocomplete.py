@@ -0,0 +1,49 @@
+import pytest
+from app.models.user_model import User, UserRole
+from app.services.user_autocomplete import UserAutocomplete, user_autocomplete
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.asyncio
+
+@pytest.fixture
+async def named_users(db_session):
+    for nickname, email in (("Alice_1", "alice@example.com"), ("alina", "lina@example.com"), ("bob", "al_b@example.com"), ("a%b", "x@example.com")):
+        db_session.add(User(nickname=nickname, email=email, hashed_password="x", role=UserRole.AUTHENTICATED))
+    await db_session.commit()
+
+async def test_prefix_matches_nickname_or_email_case_insensitively(db_session, named_users):
+    autocomplete = UserAutocomplete(ttl=60, limit=10)
+    assert [nickname for _, nickname, _ in await autocomplete.suggest(db_session, "AL")] == ["Alice_1", "alina", "bob"]
+    # LIKE wildcards in the prefix match literally
+    assert [nickname for _, nickname, _ in await autocomplete.suggest(db_session, "a%")] == ["a%b"]
+    assert [nickname for _, nickname, _ in await autocomplete.suggest(db_session, "al_")] == ["bob"]
+
+async def test_hard_limit(db_session, named_users):
+    autocomplete = UserAutocomplete(ttl=60, limit=2)
+    assert len(await autocomplete.suggest(db_session, "a")) == 2
+
+async def test_longer_prefixes_are_narrowed_from_the_cache(db_session, named_users, mocker):
+    autocomplete = UserAutocomplete(ttl=60, limit=10)
+    await autocomplete.suggest(db_session, "al")
+    execute = mocker.spy(db_session, "execute")
+    assert [nickname for _, nickname, _ in await autocomplete.suggest(db_session, "ali")] == ["Alice_1", "alina"]
+    assert await autocomplete.suggest(db_session, "al") != []
+    execute.assert_not_called()
+    assert autocomplete.stats() == {"entries": 1, "hits_total": 2, "misses_total": 1}
+
+async def test_full_shorter_prefix_is_not_narrowed(db_session, named_users):
+    autocomplete = UserAutocomplete(ttl=60, limit=1)
+    await autocomplete.suggest(db_session, "a")
+    # "a" hit the limit, so it may not hold every match of "ali"
+    assert [nickname for _, nickname, _ in await autocomplete.suggest(db_session, "ali")] == ["Alice_1"]
+    assert autocomplete.stats()["misses_total"] == 2
+
+async def test_user_writes_invalidate_the_shared_cache(db_session, user):
+    user_autocomplete.invalidate()
+    try:
+        prefix = user.nickname[:3]
+        assert await user_autocomplete.suggest(db_session, prefix)
+        assert await UserService.delete(db_session, user.id)
+        assert await user_autocomplete.suggest(db_session, prefix) == []
+    finally:
+        user_autocomplete.invalidate()
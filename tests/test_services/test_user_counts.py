@@ -0,0 +1,129 @@
+import asyncio
+from datetime import datetime, timezone
+import pytest
+from sqlalchemy import select, text
+from app.database import Database
+from app.models.user_model import User, UserRole
+from app.services.user_counts import UserCountProvider, user_counts
+from app.services.user_service import UserService
+
+pytestmark = pytest.mark.asyncio
+
+async def test_exact_count(db_session, users_with_same_role_50_users, admin_user):
+    provider = UserCountProvider("exact")
+    total = await provider.count(db_session)
+    assert total == 51 and total.exact
+    assert await provider.count(db_session, select(User).where(User.role == UserRole.ADMIN)) == 1
+
+async def test_cached_count_until_invalidated(db_session, user, admin_user, mocker):
+    provider = UserCountProvider("cached", ttl=60)
+    query = select(User).where(User.role == UserRole.ADMIN)
+    assert await provider.count(db_session) == 2
+    assert await provider.count(db_session, query) == 1
+    await db_session.delete(user)
+    await db_session.commit()
+    assert await provider.count(db_session) == 2
+    provider.invalidate()
+    total = await provider.count(db_session)
+    assert total == 1 and total.exact
+    # Expired entries are counted again
+    mocker.patch("app.services.user_counts.time.monotonic", return_value=1e12)
+    await db_session.delete(admin_user)
+    await db_session.commit()
+    assert await provider.count(db_session, query) == 0
+
+async def test_user_writes_invalidate_the_shared_cache(db_session, user, monkeypatch):
+    monkeypatch.setattr(user_counts, "strategy", "cached")
+    try:
+        assert await UserService.count(db_session) == 1
+        assert await UserService.delete(db_session, user.id)
+        assert await UserService.count(db_session) == 0
+    finally:
+        user_counts.invalidate()
+
+async def test_role_and_lock_changes_invalidate_the_shared_cache(db_session, locked_user, monkeypatch):
+    monkeypatch.setattr(user_counts, "strategy", "cached")
+    anonymous = User(
+        nickname="pending_user", email="pending@example.com", hashed_password="x",
+        role=UserRole.ANONYMOUS, verification_token="token",
+    )
+    db_session.add(anonymous)
+    await db_session.commit()
+    authenticated = select(User).where(User.role == UserRole.AUTHENTICATED)
+    locked = select(User).where(User.is_locked == True)
+    try:
+        assert await user_counts.count(db_session, authenticated) == 1
+        assert await user_counts.count(db_session, locked) == 1
+        assert await UserService.verify_email_with_token(db_session, anonymous.id, "token")
+        assert await user_counts.count(db_session, authenticated) == 2
+        assert await UserService.reset_password(db_session, locked_user.id, "NewPassword123!")
+        assert await user_counts.count(db_session, locked) == 0
+    finally:
+        user_counts.invalidate()
+
+async def test_estimate_for_large_results(db_session, users_with_same_role_50_users):
+    provider = UserCountProvider("estimate", exact_below=0)
+    await db_session.execute(text("ANALYZE users"))
+    total = await provider.count(db_session)
+    assert not total.exact
+    assert total == 50
+    # Filtered queries use the plan's row estimate; values containing ':' are inlined safely
+    query = select(User).where(User.created_at >= datetime(2000, 1, 1, tzinfo=timezone.utc), User.nickname.ilike("%:x%"))
+    assert not (await provider.count(db_session, query)).exact
+
+async def test_estimate_counts_exactly_below_threshold(db_session, users_with_same_role_50_users):
+    provider = UserCountProvider("estimate", exact_below=1000)
+    total = await provider.count(db_session, select(User).where(User.role == UserRole.AUTHENTICATED))
+    assert total == 50 and total.exact
+
+def test_unknown_strategy():
+    with pytest.raises(ValueError):
+        UserCountProvider("approximate")
+
+async def test_window_total_comes_with_the_page(db_session, users_with_same_role_50_users, monkeypatch, mocker):
+    monkeypatch.setattr(user_counts, "strategy", "window")
+    exact = mocker.spy(UserCountProvider, "_exact")
+    total, users = await UserService.search_and_filter_users(db_session, role="AUTHENTICATED", skip=40, limit=20)
+    assert total == 50 and total.exact
+    assert len(users) == 10 and not users.has_more
+    exact.assert_not_called()
+    # Nothing on the page to read the window from, so it counts separately
+    total, users = await UserService.advanced_search_users(db_session, {"role": "AUTHENTICATED", "skip": 60, "limit": 20})
+    assert total == 50 and len(users) == 0
+    exact.assert_called_once()
+
+async def test_concurrent_count_shares_the_page_snapshot(real_engine, db_session, users_with_same_role_50_users, monkeypatch):
+    monkeypatch.setattr(user_counts, "concurrent", True)
+    factory, _ = Database.get_read_session_factory()
+    async with factory() as session:
+        total, users = await UserService.search_and_filter_users(session, role=UserRole.AUTHENTICATED, skip=40, limit=20)
+        assert total == 50 and len(users) == 10
+        isolation = (await session.execute(text("SHOW transaction_isolation"))).scalar()
+        assert isolation == "repeatable read"
+        # Already in a transaction: nothing to share a snapshot with, so it counts in line
+        total, users = await UserService.search_and_filter_users(session, role=UserRole.AUTHENTICATED, limit=20)
+        assert total == 50 and len(users) == 20
+
+async def test_concurrent_count_is_cancelled_when_the_page_query_fails(real_engine, monkeypatch):
+    monkeypatch.setattr(user_counts, "concurrent", True)
+    counting = []
+
+    async def slow_count(session, query=None):
+        counting.append("started")
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            counting.append("cancelled")
+            raise
+
+    async def failing_page(session, query, skip, limit, cursor):
+        await asyncio.sleep(0)
+        raise OSError("page query failed")
+
+    monkeypatch.setattr(user_counts, "count", slow_count)
+    monkeypatch.setattr(UserService, "_fetch_page", failing_page)
+    factory, _ = Database.get_read_session_factory()
+    async with factory() as session:
+        with pytest.raises(OSError):
+            await UserService.search_and_filter_users(session, role=UserRole.AUTHENTICATED)
+    assert counting == ["started", "cancelled"]
@@ -0,0 +1,30 @@
+from uuid import uuid4
+import pytest
+from sqlalchemy import text
+from app.dependencies import get_read_db
+from app.schemas.user_schemas import UserResponse
+from app.services.user_repository import UserRepository
+
+pytestmark = pytest.mark.asyncio
+
+async def test_get_user_response_matches_orm_user(db_session, locked_user):
+    user_data = await UserRepository.get_user_response(db_session, locked_user.id)
+    assert set(user_data) == set(UserResponse.model_fields) - {"links"}
+    assert user_data.pop("role") == locked_user.role.name
+    for field, value in user_data.items():
+        assert value == getattr(locked_user, field), field
+
+async def test_get_user_response_missing_user(db_session):
+    assert await UserRepository.get_user_response(db_session, uuid4()) is None
+
+async def test_get_user_response_runs_in_the_session_transaction(real_engine, user, mocker):
+    dependency = get_read_db(mocker.Mock(headers={}, cookies={}))
+    session = await dependency.__anext__()
+    try:
+        assert await UserRepository.get_user_response(session, user.id) is not None
+        # The raw query opened the session's READ ONLY transaction instead of running in autocommit
+        raw = await (await session.connection()).get_raw_connection()
+        assert raw.driver_connection.is_in_transaction()
+        assert (await session.execute(text("SHOW transaction_read_only"))).scalar() == "on"
+    finally:
+        await dependency.aclose()
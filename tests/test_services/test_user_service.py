@@ -1,15 +1,21 @@
-from builtins import range
+from builtins import all, float, len, range, sorted
+import asyncio
 import pytest
 from sqlalchemy import select
 from app.dependencies import get_settings
 from app.models.user_model import User, UserRole
-from app.services.user_service import UserService
+from app.services import user_service
+from app.services.refresh_token_service import RefreshTokenService
+from app.services.token_versions import token_versions
+from app.services.user_service import AccountLockedError, UserService
 from app.utils.nickname_gen import generate_nickname
+from app.utils.pagination import LAST_PAGE
 from app.utils.security import validate_password
-from app.utils.security import hash_password, verify_password
+from app.utils.security import hash_password, needs_rehash, verify_password
 from sqlalchemy.ext.asyncio import AsyncSession
 from unittest.mock import AsyncMock
 from app.services.email_service import EmailService
+from tests.conftest import AsyncTestingSessionLocal
 
 
 pytestmark = pytest.mark.asyncio
@@ -26,6 +32,15 @@ async def test_create_user_with_valid_data(db_session, email_service):
     assert user is not None
     assert user.email == user_data["email"]
 
+async def test_first_user_role_ignores_a_stale_cached_count(db_session, email_service, user, monkeypatch):
+    # Another worker's cache can still say the table is empty
+    monkeypatch.setattr(user_service.user_counts, "strategy", "cached")
+    monkeypatch.setattr(user_service.user_counts, "_cache", {None: (float("inf"), 0)})
+    user_data = {"email": "second_user@example.com", "password": "ValidPassword123!", "role": UserRole.AUTHENTICATED.name}
+    created = await UserService.create(db_session, user_data, email_service)
+    assert created is not None
+    assert created.role == UserRole.ANONYMOUS
+
 # Test creating a user with invalid data
 async def test_create_user_with_invalid_data(db_session, email_service):
     user_data = {
@@ -67,6 +82,25 @@ async def test_get_by_email_user_does_not_exist(db_session):
     retrieved_user = await UserService.get_by_email(db_session, "non_existent_email@example.com")
     assert retrieved_user is None
 
+# Test that lookups execute the prebuilt statements with bound parameters instead of building new ones
+async def test_lookups_reuse_prebuilt_statements(db_session, user):
+    executed = []
+    original_execute = db_session.execute
+
+    async def spy(statement, params=None, **kwargs):
+        executed.append((statement, params))
+        return await original_execute(statement, params, **kwargs)
+
+    db_session.execute = spy
+    assert (await UserService.get_by_email(db_session, user.email)).id == user.id
+    assert await UserService.get_by_email(db_session, "other@example.com") is None
+    assert (await UserService.get_by_nickname(db_session, user.nickname)).id == user.id
+    assert executed == [
+        (user_service.USER_LOOKUPS["email"], {"value": user.email}),
+        (user_service.USER_LOOKUPS["email"], {"value": "other@example.com"}),
+        (user_service.USER_LOOKUPS["nickname"], {"value": user.nickname}),
+    ]
+
 # Test updating a user with valid data
 async def test_update_user_valid_data(db_session, user):
     new_email = "updated_email@example.com"
@@ -98,6 +132,39 @@ async def test_list_users_with_pagination(db_session, users_with_same_role_50_us
     assert len(users_page_2) == 10
     assert users_page_1[0].id != users_page_2[0].id
 
+# Test walking all users with keyset cursors, forwards and back, in (created_at, id) order
+async def test_list_users_with_cursor_pagination(db_session, users_with_same_role_50_users):
+    expected = await UserService.list_users(db_session, skip=0, limit=100)
+    assert [(u.created_at, u.id) for u in expected] == sorted((u.created_at, u.id) for u in expected)
+
+    pages, cursor = [], ""
+    while cursor is not None:
+        page = await UserService.list_users(db_session, limit=15, cursor=cursor)
+        pages.append(page)
+        cursor = page.next_cursor
+    assert [len(page) for page in pages] == [15, 15, 15, 5]
+    assert [u.id for page in pages for u in page] == [u.id for u in expected]
+    assert pages[0].prev_cursor is None
+
+    previous = await UserService.list_users(db_session, limit=15, cursor=pages[2].prev_cursor)
+    assert [u.id for u in previous] == [u.id for u in pages[1]]
+    last = await UserService.list_users(db_session, limit=15, cursor=LAST_PAGE)
+    assert [u.id for u in last] == [u.id for u in expected[-15:]]
+    assert last.next_cursor is None
+
+# Test that cursor pages of a search only contain matching users
+async def test_search_users_with_cursor_keeps_filters(db_session, users_with_same_role_50_users, admin_user):
+    total, page = await UserService.search_and_filter_users(db_session, role=UserRole.AUTHENTICATED, limit=30, cursor="")
+    assert total == 50
+    assert len(page) == 30 and page.next_cursor is not None
+    total, page = await UserService.search_and_filter_users(db_session, role=UserRole.AUTHENTICATED, limit=30, cursor=page.next_cursor)
+    assert len(page) == 20 and page.next_cursor is None
+    assert all(user.role == UserRole.AUTHENTICATED for user in page)
+
+async def test_list_users_rejects_malformed_cursor(db_session):
+    with pytest.raises(ValueError):
+        await UserService.list_users(db_session, cursor="garbage")
+
 # Test registering a user with valid data
 async def test_register_user_with_valid_data(db_session, email_service):
     user_data = {
@@ -128,6 +195,44 @@ async def test_login_user_successful(db_session, verified_user):
     logged_in_user = await UserService.login_user(db_session, user_data["email"], user_data["password"])
     assert logged_in_user is not None
 
+# Test that an outdated password hash is upgraded in the background after login
+async def test_login_user_rehashes_outdated_hash(db_session, verified_user):
+    outdated_hash = hash_password("MySuperPassword$1234", rounds=4)
+    verified_user.hashed_password = outdated_hash
+    await db_session.commit()
+
+    logged_in_user = await UserService.login_user(db_session, verified_user.nickname, "MySuperPassword$1234")
+    assert logged_in_user is not None
+    await asyncio.gather(*user_service._background_tasks)
+
+    await db_session.refresh(verified_user)
+    assert verified_user.hashed_password != outdated_hash
+    assert not needs_rehash(verified_user.hashed_password)
+    assert verify_password("MySuperPassword$1234", verified_user.hashed_password)
+
+# Test that users can log in with their email as well as their nickname
+async def test_login_user_by_email(db_session, verified_user):
+    logged_in_user = await UserService.login_user(db_session, verified_user.email, "MySuperPassword$1234")
+    assert logged_in_user is not None
+    assert logged_in_user.id == verified_user.id
+    assert logged_in_user.last_login_at is not None
+
+# Test that concurrent failed logins are all counted
+async def test_record_failed_login_concurrently(db_session, verified_user):
+    async def fail_once():
+        async with AsyncTestingSessionLocal() as session:
+            user = await UserService.get_by_id(session, verified_user.id)
+            return await UserService.record_failed_login(session, user)
+
+    max_login_attempts = get_settings().max_login_attempts
+    attempts = max_login_attempts + 2
+    results = await asyncio.gather(*(fail_once() for _ in range(attempts)))
+
+    await db_session.refresh(verified_user)
+    assert verified_user.failed_login_attempts == attempts
+    assert verified_user.is_locked is True
+    assert results.count(False) == max_login_attempts - 1
+
 # Test user login with incorrect email
 async def test_login_user_incorrect_email(db_session):
     user = await UserService.login_user(db_session, "nonexistentuser@noway.com", "Password123!")
@@ -144,8 +249,8 @@ async def test_account_lock_after_failed_logins(db_session, verified_user):
     for _ in range(max_login_attempts):
         await UserService.login_user(db_session, verified_user.nickname, "wrongpassword")
     
-    is_locked = await UserService.is_account_locked(db_session, verified_user.email)
-    assert is_locked, "The account should be locked after the maximum number of failed login attempts."
+    await db_session.refresh(verified_user)
+    assert verified_user.is_locked, "The account should be locked after the maximum number of failed login attempts."
 
 # Test resetting a user's password
 async def test_reset_password(db_session, user):
@@ -153,6 +258,21 @@ async def test_reset_password(db_session, user):
     reset_success = await UserService.reset_password(db_session, user.id, new_password)
     assert reset_success is True
 
+async def test_reset_password_revokes_existing_sessions(db_session, user):
+    refresh_token = await RefreshTokenService.issue(db_session, user.id)
+    version = user.token_version
+    assert await UserService.reset_password(db_session, user.id, "NewPassword123!") is True
+    assert user.token_version == version + 1
+    assert not token_versions.is_current(user.id, version)
+    assert await RefreshTokenService.consume(db_session, refresh_token) is None
+
+async def test_account_lock_revokes_refresh_tokens(db_session, verified_user):
+    refresh_token = await RefreshTokenService.issue(db_session, verified_user.id)
+    for _ in range(get_settings().max_login_attempts):
+        await UserService.record_failed_login(db_session, verified_user)
+    assert verified_user.is_locked
+    assert await RefreshTokenService.consume(db_session, refresh_token) is None
+
 # Test verifying a user's email
 async def test_verify_email_with_token(db_session, user):
     token = "valid_token_example"  # This should be set in your user setup if it depends on a real token
@@ -325,8 +445,8 @@ def test_invalid_password_verification():
 @pytest.mark.asyncio
 async def test_login_user_locked_account(db_session, locked_user):
     """Test login fails for locked accounts."""
-    result = await UserService.login_user(db_session, locked_user.nickname, "correctpassword")
-    assert result is None, "Login should fail for locked accounts"
+    with pytest.raises(AccountLockedError):
+        await UserService.login_user(db_session, locked_user.nickname, "correctpassword")
 
 @pytest.mark.asyncio
 async def test_reset_password_for_nonexistent_user(db_session):
@@ -385,11 +505,6 @@ async def test_update_nonexistent_user(db_session):
     updated_user = await UserService.update(db_session, non_existent_user_id, update_data)
     assert updated_user is None, "Updating a non-existent user should fail"
 @pytest.mark.asyncio
-async def test_is_account_locked(db_session, locked_user):
-    """Test checking if a locked account is detected."""
-    is_locked = await UserService.is_account_locked(db_session, locked_user.email)
-    assert is_locked is True, "Locked account should return True"
-@pytest.mark.asyncio
 async def test_reset_password_for_locked_account(db_session, locked_user):
     """Test resetting the password of a locked account."""
     new_password = "NewPassword123!"
@@ -1,7 +1,8 @@
 import pytest
 from httpx import AsyncClient
 from datetime import datetime
-from app.models.user_model import UserRole
+from app.models.user_model import User, UserRole
+from app.services.user_autocomplete import user_autocomplete
 
 BASE_URL = "/users-search"
 ADVANCED_SEARCH_URL = "/users-advanced-search"
@@ -150,8 +151,8 @@ async def test_advanced_search_with_filters(async_client: AsyncClient, admin_tok
     assert "links" in data
     assert "filters" in data
 
-    # Validate filters are returned as part of the response
-    assert data["filters"] == search_criteria
+    # Validate filters are returned as part of the response; the unused full-text query echoes as null
+    assert data["filters"] == {**search_criteria, "q": None}
 
     # Validate pagination links structure
     assert len(data["links"]) > 0
@@ -303,3 +304,69 @@ async def test_advanced_search_invalid_filters(async_client: AsyncClient, admin_
     data = response.json()
     assert "detail" in data
     assert any(error["loc"] == ["body", "email"] for error in data["detail"])
+
+@pytest.mark.asyncio
+async def test_basic_search_fuzzy_ranks_by_similarity(async_client: AsyncClient, admin_token: str, db_session):
+    for nickname in ("jonathan_b", "johnathan", "zeta_user"):
+        db_session.add(User(nickname=nickname, email=f"{nickname}@example.com", hashed_password="x", role=UserRole.AUTHENTICATED))
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    response = await async_client.get(f"{BASE_URL}?username=jonathan&match=fuzzy", headers=headers)
+    assert response.status_code == 200
+    nicknames = [item["nickname"] for item in response.json()["items"]]
+    assert nicknames[0] == "jonathan_b"
+    assert "johnathan" in nicknames and "zeta_user" not in nicknames
+    # A misspelling is no substring, so only the fuzzy mode finds it
+    response = await async_client.get(f"{BASE_URL}?username=jonathna", headers=headers)
+    assert response.json()["total"] == 0
+
+    response = await async_client.get(f"{BASE_URL}?username=jonathan&match=fuzzy&cursor=", headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_full_text_search_ranks_names_over_bio(async_client: AsyncClient, admin_token: str, db_session):
+    people = [
+        ("ada_l", "Ada", "Lovelace", "Wrote the first program for the analytical engine."),
+        ("grace_h", "Grace", "Hopper", "Built compilers; admired Ada Lovelace's programs."),
+        ("alan_t", "Alan", "Turing", "Worked on computability."),
+    ]
+    for nickname, first_name, last_name, bio in people:
+        db_session.add(User(
+            nickname=nickname, email=f"{nickname}@example.com", first_name=first_name, last_name=last_name,
+            bio=bio, hashed_password="x", role=UserRole.AUTHENTICATED,
+        ))
+    await db_session.commit()
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    response = await async_client.get(f"{BASE_URL}?q=lovelace&highlight=true", headers=headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["nickname"] for item in data["items"]] == ["ada_l", "grace_h"]
+    assert "<b>Lovelace</b>" in data["snippets"][data["items"][0]["id"]]
+
+    # Stemming matches "programs" to "program"; "-compilers" excludes Grace
+    response = await async_client.post(ADVANCED_SEARCH_URL, json={"q": "programs -compilers"}, headers=headers)
+    data = response.json()
+    assert [item["nickname"] for item in data["items"]] == ["ada_l"]
+    assert data["snippets"] is None
+    assert data["filters"]["q"] == "programs -compilers"
+
+    response = await async_client.post(f"{ADVANCED_SEARCH_URL}?cursor=", json={"q": "programs"}, headers=headers)
+    assert response.status_code == 400
+
+@pytest.mark.asyncio
+async def test_autocomplete_returns_only_lookup_fields(async_client: AsyncClient, admin_token: str, manager_token: str, admin_user):
+    # Fixture users get new ids in every test, so drop suggestions cached by earlier ones
+    user_autocomplete.invalidate()
+    response = await async_client.get(
+        f"/users/autocomplete?prefix={admin_user.nickname[:2].upper()}", headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert items == [{"id": str(admin_user.id), "nickname": admin_user.nickname, "email": admin_user.email}]
+
+    response = await async_client.get("/users/autocomplete?prefix=", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 422
+    response = await async_client.get("/users/autocomplete?prefix=a", headers={"Authorization": f"Bearer {manager_token}"})
+    assert response.status_code == 403